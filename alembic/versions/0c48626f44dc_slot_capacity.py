@@ -0,0 +1,39 @@
+"""slot capacity
+
+Revision ID: 0c48626f44dc
+Revises: 91b80ab86369
+Create Date: 2026-10-19 21:02:11.417305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0c48626f44dc'
+down_revision: Union[str, Sequence[str], None] = '91b80ab86369'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('appointment_slots', 'appointment_slots_archive'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('capacity', sa.Integer(), server_default='1', nullable=False))
+            batch_op.add_column(sa.Column('booked_count', sa.Integer(), server_default='0', nullable=False))
+
+    # existing single-place slots: one place taken per active booking
+    for table, appointments in (('appointment_slots', 'appointments'), ('appointment_slots_archive', 'appointments_archive')):
+        op.execute(f"""UPDATE {table} SET booked_count = (
+            SELECT COUNT(*) FROM {appointments} a WHERE a.slot_id = {table}.id AND a.status IN ('PENDING', 'CONFIRMED'))""")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # plain ALTER TABLE ... DROP COLUMN: a batch table rebuild would lose the R*Tree triggers
+    # on appointment_slots
+    for table in ('appointment_slots_archive', 'appointment_slots'):
+        op.drop_column(table, 'booked_count')
+        op.drop_column(table, 'capacity')
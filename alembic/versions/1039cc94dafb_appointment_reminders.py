@@ -0,0 +1,37 @@
+"""appointment reminders
+
+Revision ID: 1039cc94dafb
+Revises: c5368c129b8a
+Create Date: 2026-10-19 19:14:37.902615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '1039cc94dafb'
+down_revision: Union[str, Sequence[str], None] = 'c5368c129b8a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('appointments', 'appointments_archive'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('reminders_sent', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.create_index('ix_appointments_status_start', ['status', 'start_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.drop_index('ix_appointments_status_start')
+
+    for table in ('appointments_archive', 'appointments'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('reminders_sent')
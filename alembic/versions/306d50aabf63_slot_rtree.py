@@ -0,0 +1,50 @@
+"""appointment slots rtree (sqlite only)
+
+Revision ID: 306d50aabf63
+Revises: 59949c89f0d8
+Create Date: 2026-10-19 11:40:27.502113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '306d50aabf63'
+down_revision: Union[str, Sequence[str], None] = '59949c89f0d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EPOCH = "CAST(strftime('%s', {}) AS INTEGER)"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS appointment_slots_rtree USING rtree(id, doctor_min, doctor_max, start_epoch, end_epoch)")
+    op.execute(f"""CREATE TRIGGER IF NOT EXISTS appointment_slots_rtree_ai AFTER INSERT ON appointment_slots BEGIN
+        INSERT INTO appointment_slots_rtree VALUES (new.id, new.doctor_id, new.doctor_id, {EPOCH.format('new.start_at')}, {EPOCH.format('new.end_at')});
+    END""")
+    op.execute(f"""CREATE TRIGGER IF NOT EXISTS appointment_slots_rtree_au AFTER UPDATE OF doctor_id, start_at, end_at ON appointment_slots BEGIN
+        UPDATE appointment_slots_rtree SET doctor_min = new.doctor_id, doctor_max = new.doctor_id,
+            start_epoch = {EPOCH.format('new.start_at')}, end_epoch = {EPOCH.format('new.end_at')}
+        WHERE id = old.id;
+    END""")
+    op.execute("""CREATE TRIGGER IF NOT EXISTS appointment_slots_rtree_ad AFTER DELETE ON appointment_slots BEGIN
+        DELETE FROM appointment_slots_rtree WHERE id = old.id;
+    END""")
+    op.execute(f"""INSERT OR REPLACE INTO appointment_slots_rtree
+        SELECT id, doctor_id, doctor_id, {EPOCH.format('start_at')}, {EPOCH.format('end_at')} FROM appointment_slots""")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS appointment_slots_rtree_ad")
+    op.execute("DROP TRIGGER IF EXISTS appointment_slots_rtree_au")
+    op.execute("DROP TRIGGER IF EXISTS appointment_slots_rtree_ai")
+    op.execute("DROP TABLE IF EXISTS appointment_slots_rtree")
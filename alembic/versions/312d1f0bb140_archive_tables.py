@@ -0,0 +1,64 @@
+"""archive tables for slots and appointments
+
+Revision ID: 312d1f0bb140
+Revises: 73b5bc9b88fe
+Create Date: 2026-10-19 14:21:37.604419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '312d1f0bb140'
+down_revision: Union[str, Sequence[str], None] = '73b5bc9b88fe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('appointment_slots_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('doctor_id', sa.Integer(), nullable=False),
+    sa.Column('start_at', sa.DateTime(), nullable=False),
+    sa.Column('end_at', sa.DateTime(), nullable=False),
+    sa.Column('is_available', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctor_profiles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('appointment_slots_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_appointment_slots_archive_doctor_id'), ['doctor_id'], unique=False)
+
+    op.create_table('appointments_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('doctor_id', sa.Integer(), nullable=False),
+    sa.Column('patient_user_id', sa.Integer(), nullable=False),
+    sa.Column('slot_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('canceled_by', sa.String(length=10), nullable=True),
+    sa.Column('notes', sa.String(length=500), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctor_profiles.id'], ),
+    sa.ForeignKeyConstraint(['patient_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('appointments_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_appointments_archive_doctor_id'), ['doctor_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_appointments_archive_patient_user_id'), ['patient_user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('appointments_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_appointments_archive_patient_user_id'))
+        batch_op.drop_index(batch_op.f('ix_appointments_archive_doctor_id'))
+
+    op.drop_table('appointments_archive')
+    with op.batch_alter_table('appointment_slots_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_appointment_slots_archive_doctor_id'))
+
+    op.drop_table('appointment_slots_archive')
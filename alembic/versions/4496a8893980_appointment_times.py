@@ -0,0 +1,47 @@
+"""appointment start/end copied from slots
+
+Revision ID: 4496a8893980
+Revises: 312d1f0bb140
+Create Date: 2026-10-19 15:02:11.380946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '4496a8893980'
+down_revision: Union[str, Sequence[str], None] = '312d1f0bb140'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _backfill(table: str, column: str) -> str:
+    return f"""UPDATE {table} SET {column} = COALESCE(
+        (SELECT s.{column} FROM appointment_slots s WHERE s.id = {table}.slot_id),
+        (SELECT s.{column} FROM appointment_slots_archive s WHERE s.id = {table}.slot_id))"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('appointments', 'appointments_archive'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('start_at', sa.DateTime(), nullable=True))
+            batch_op.add_column(sa.Column('end_at', sa.DateTime(), nullable=True))
+        op.execute(_backfill(table, 'start_at'))
+        op.execute(_backfill(table, 'end_at'))
+
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.create_index('ix_appointments_patient_end_start', ['patient_user_id', 'end_at', 'start_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('appointments', schema=None) as batch_op:
+        batch_op.drop_index('ix_appointments_patient_end_start')
+
+    for table in ('appointments_archive', 'appointments'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('end_at')
+            batch_op.drop_column('start_at')
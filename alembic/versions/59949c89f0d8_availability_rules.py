@@ -0,0 +1,45 @@
+"""availability rules
+
+Revision ID: 59949c89f0d8
+Revises: 09bf3bdba83e
+Create Date: 2026-10-19 09:12:04.118205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '59949c89f0d8'
+down_revision: Union[str, Sequence[str], None] = '09bf3bdba83e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('availability_rules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('doctor_id', sa.Integer(), nullable=False),
+    sa.Column('weekday', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.Column('slot_minutes', sa.Integer(), nullable=False),
+    sa.Column('valid_from', sa.Date(), nullable=False),
+    sa.Column('valid_until', sa.Date(), nullable=True),
+    sa.Column('materialized_until', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctor_profiles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('availability_rules', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_availability_rules_doctor_id'), ['doctor_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('availability_rules', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_availability_rules_doctor_id'))
+
+    op.drop_table('availability_rules')
@@ -0,0 +1,29 @@
+"""appointment slots doctor/available/start index
+
+Revision ID: 73b5bc9b88fe
+Revises: 306d50aabf63
+Create Date: 2026-10-19 13:05:51.730442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '73b5bc9b88fe'
+down_revision: Union[str, Sequence[str], None] = '306d50aabf63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('appointment_slots', schema=None) as batch_op:
+        batch_op.create_index('ix_appointment_slots_doctor_available_start', ['doctor_id', 'is_available', 'start_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('appointment_slots', schema=None) as batch_op:
+        batch_op.drop_index('ix_appointment_slots_doctor_available_start')
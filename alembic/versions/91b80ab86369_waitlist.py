@@ -0,0 +1,50 @@
+"""waitlist
+
+Revision ID: 91b80ab86369
+Revises: 1039cc94dafb
+Create Date: 2026-10-19 20:26:05.117482
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '91b80ab86369'
+down_revision: Union[str, Sequence[str], None] = '1039cc94dafb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('waitlist_entries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('doctor_id', sa.Integer(), nullable=False),
+    sa.Column('patient_user_id', sa.Integer(), nullable=False),
+    sa.Column('window_start', sa.DateTime(), nullable=False),
+    sa.Column('window_end', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('slot_id', sa.Integer(), nullable=True),
+    sa.Column('hold_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('appointment_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctor_profiles.id'], ),
+    sa.ForeignKeyConstraint(['patient_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('waitlist_entries', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_waitlist_entries_doctor_id'), ['doctor_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_waitlist_entries_patient_user_id'), ['patient_user_id'], unique=False)
+        batch_op.create_index('ix_waitlist_entries_status_hold', ['status', 'hold_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('waitlist_entries', schema=None) as batch_op:
+        batch_op.drop_index('ix_waitlist_entries_status_hold')
+        batch_op.drop_index(batch_op.f('ix_waitlist_entries_patient_user_id'))
+        batch_op.drop_index(batch_op.f('ix_waitlist_entries_doctor_id'))
+
+    op.drop_table('waitlist_entries')
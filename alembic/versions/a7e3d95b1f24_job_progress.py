@@ -0,0 +1,29 @@
+"""job progress
+
+Revision ID: a7e3d95b1f24
+Revises: 0c48626f44dc
+Create Date: 2026-10-19 22:31:48.560193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'a7e3d95b1f24'
+down_revision: Union[str, Sequence[str], None] = '0c48626f44dc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('progress', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_column('progress')
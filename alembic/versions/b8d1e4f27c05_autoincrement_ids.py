@@ -0,0 +1,73 @@
+"""autoincrement slot and appointment ids
+
+Revision ID: b8d1e4f27c05
+Revises: e2c84f5a90d3
+Create Date: 2026-10-20 09:12:44.730518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'b8d1e4f27c05'
+down_revision: Union[str, Sequence[str], None] = 'e2c84f5a90d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EPOCH = "CAST(strftime('%s', {}) AS INTEGER)"
+
+# archived rows keep their ids, so a plain INTEGER PRIMARY KEY (max(rowid) + 1) could hand an
+# archived id out again; AUTOINCREMENT never reuses one
+TABLES = (('appointment_slots', 'appointment_slots_archive'), ('appointments', 'appointments_archive'))
+
+
+def _rtree_triggers() -> None:
+    # the table rebuild drops the R*Tree triggers on appointment_slots (see 306d50aabf63)
+    op.execute(f"""CREATE TRIGGER IF NOT EXISTS appointment_slots_rtree_ai AFTER INSERT ON appointment_slots BEGIN
+        INSERT INTO appointment_slots_rtree VALUES (new.id, new.doctor_id, new.doctor_id, {EPOCH.format('new.start_at')}, {EPOCH.format('new.end_at')});
+    END""")
+    op.execute(f"""CREATE TRIGGER IF NOT EXISTS appointment_slots_rtree_au AFTER UPDATE OF doctor_id, start_at, end_at ON appointment_slots BEGIN
+        UPDATE appointment_slots_rtree SET doctor_min = new.doctor_id, doctor_max = new.doctor_id,
+            start_epoch = {EPOCH.format('new.start_at')}, end_epoch = {EPOCH.format('new.end_at')}
+        WHERE id = old.id;
+    END""")
+    op.execute("""CREATE TRIGGER IF NOT EXISTS appointment_slots_rtree_ad AFTER DELETE ON appointment_slots BEGIN
+        DELETE FROM appointment_slots_rtree WHERE id = old.id;
+    END""")
+
+
+def _has_rtree() -> bool:
+    return op.get_bind().exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'appointment_slots_rtree'"
+    ).first() is not None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    rtree = _has_rtree()
+    for table, archive in TABLES:
+        with op.batch_alter_table(table, recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+            pass
+        # continue after the highest id handed out so far, archived ones included
+        op.execute(f"DELETE FROM sqlite_sequence WHERE name = '{table}'")
+        op.execute(f"""INSERT INTO sqlite_sequence (name, seq) SELECT '{table}', COALESCE(MAX(id), 0)
+            FROM (SELECT id FROM {table} UNION ALL SELECT id FROM {archive})""")
+    if rtree:
+        _rtree_triggers()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    rtree = _has_rtree()
+    for table, _ in TABLES:
+        with op.batch_alter_table(table, recreate='always', table_kwargs={'sqlite_autoincrement': False}):
+            pass
+    if rtree:
+        _rtree_triggers()
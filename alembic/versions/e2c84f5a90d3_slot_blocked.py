@@ -0,0 +1,36 @@
+"""slot blocked
+
+Revision ID: e2c84f5a90d3
+Revises: a7e3d95b1f24
+Create Date: 2026-10-19 23:40:12.208716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e2c84f5a90d3'
+down_revision: Union[str, Sequence[str], None] = 'a7e3d95b1f24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('appointment_slots', 'appointment_slots_archive'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('blocked', sa.Integer(), server_default='0', nullable=False))
+
+    # a closed slot with free places was closed by the doctor
+    for table in ('appointment_slots', 'appointment_slots_archive'):
+        op.execute(f"UPDATE {table} SET blocked = 1 WHERE is_available = 0 AND booked_count < capacity")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # plain ALTER TABLE ... DROP COLUMN: a batch table rebuild would lose the R*Tree triggers
+    # on appointment_slots
+    for table in ('appointment_slots_archive', 'appointment_slots'):
+        op.drop_column(table, 'blocked')
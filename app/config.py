@@ -1,6 +1,75 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./app.db"
 
+    # background jobs
+    scheduler_enabled: bool = True
+    # with several app processes on one database only the lease holder runs periodic tasks;
+    # a dead leader is replaced once its lease (renewed every lease/3 seconds) expires
+    leader_election_enabled: bool = True
+    leader_lease_seconds: int = 15
+
+    # availability rules are materialized into concrete slots only this far ahead
+    slot_horizon_days: int = 56
+    horizon_extend_interval_seconds: int = 24 * 60 * 60
+
+    # per-process in-memory slot index; only consistent with a single app process
+    availability_index_enabled: bool = False
+
+    # public slot listings: default page size and widest window one request may ask for
+    slot_listing_default_limit: int = 100
+    slot_listing_max_limit: int = 500
+    slot_listing_max_days: int = 90
+
+    # month calendar counts are cached per doctor-month for at most this long
+    calendar_cache_ttl_seconds: int = 300
+    # same bound for cached doctor agendas (day/week)
+    agenda_cache_ttl_seconds: int = 300
+
+    # finished appointments (and past slots nothing active points at) move to the archive
+    # tables in batches once they are this old
+    archive_after_days: int = 30
+    archive_batch_size: int = 500
+    archive_interval_seconds: int = 3600
+
+    # Idempotency-Key responses are replayed for this long; a duplicate arriving while the
+    # first request runs waits up to idempotency_wait_seconds, and a request that never
+    # finished gives up its key after idempotency_lock_seconds
+    idempotency_ttl_seconds: int = 24 * 60 * 60
+    idempotency_wait_seconds: float = 10
+    idempotency_lock_seconds: int = 60
+
+    # CONFIRMED appointments whose slot has ended are swept into this status
+    past_appointment_policy: Literal["COMPLETED", "NO_SHOW"] = "COMPLETED"
+    sweep_batch_size: int = 500
+    sweep_interval_seconds: int = 15 * 60
+
+    # "tomorrow" / "in 1 hour" reminders for CONFIRMED appointments; each process keeps the
+    # reminders of appointments starting within reminder_window_hours in memory
+    reminders_enabled: bool = True
+    reminder_window_hours: int = 48
+    reminder_tick_seconds: float = 30
+
+    # a slot freed by a cancellation is held this long for the matched waitlist patient
+    waitlist_hold_minutes: int = 15
+
+    # durable job queue in the app database; 0 workers leaves queued jobs for another process
+    job_workers: int = 2
+    job_worker_mode: Literal["thread", "process"] = "thread"
+    job_poll_seconds: float = 1.0
+    job_lease_seconds: int = 5 * 60
+    job_max_attempts: int = 5
+    job_backoff_seconds: float = 10
+
+    # account / doctor deletion: rows per DELETE chunk, and the dependent-row count above
+    # which the admin endpoints queue a job instead of deleting inline
+    deletion_chunk_size: int = 500
+    deletion_inline_limit: int = 2000
+
+    # mirror slot intervals into an R*Tree virtual table when running on SQLite
+    slot_rtree_enabled: bool = True
+
 settings = Settings()
@@ -0,0 +1,160 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.core.security import decode_access_token
+from app.db import SessionLocal, get_db
+from app.models.idempotency_key import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+POLL_SECONDS = 0.05
+
+
+def request_hash(method: str, path: str, body: bytes, query: str = "") -> str:
+    # the query string is part of the request, e.g. new_slot_id on reschedule
+    target = f"{path}?{query}" if query else path
+    return hashlib.sha256(method.encode() + b" " + target.encode() + b"\n" + body).hexdigest()
+
+
+def reserve(db: Session, user_id: int, key: str, digest: str, now: Optional[datetime] = None) -> Optional[IdempotencyKey]:
+    # None: the caller now owns the key and must complete() or release() it;
+    # otherwise the record of whoever got there first
+    now = now or datetime.utcnow()
+    for _ in range(3):
+        db.add(IdempotencyKey(
+            user_id=user_id,
+            key=key,
+            request_hash=digest,
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.idempotency_lock_seconds),
+        ))
+        try:
+            db.commit()
+            return None
+        except IntegrityError:
+            db.rollback()
+
+        record = db.query(IdempotencyKey).filter(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key).first()
+        if record is None:
+            continue
+        if record.expires_at > now:
+            return record
+        db.delete(record)
+        db.commit()
+    raise HTTPException(status_code=409, detail="Idempotency-Key is contended, retry")
+
+
+def complete(db: Session, user_id: int, key: str, response: Response) -> None:
+    db.rollback()
+    db.query(IdempotencyKey).filter(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key).update({
+        IdempotencyKey.status_code: response.status_code,
+        IdempotencyKey.media_type: response.media_type,
+        IdempotencyKey.body: bytes(response.body),
+        IdempotencyKey.expires_at: datetime.utcnow() + timedelta(seconds=settings.idempotency_ttl_seconds),
+    })
+    db.commit()
+
+
+def release(db: Session, user_id: int, key: str) -> None:
+    db.rollback()
+    db.query(IdempotencyKey).filter(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key).delete()
+    db.commit()
+
+
+def replay(record: IdempotencyKey) -> Response:
+    return Response(
+        content=record.body,
+        status_code=record.status_code,
+        media_type=record.media_type,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def purge_expired(db: Session, now: Optional[datetime] = None) -> int:
+    n = db.query(IdempotencyKey).filter(IdempotencyKey.expires_at <= (now or datetime.utcnow())).delete()
+    db.commit()
+    return n
+
+
+def run_idempotency_purge() -> int:
+    db = SessionLocal()
+    try:
+        return purge_expired(db)
+    finally:
+        db.close()
+
+
+def _user_id(request: Request) -> Optional[int]:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    sub = decode_access_token(token)
+    return int(sub) if sub else None
+
+
+async def _claim(db: Session, user_id: int, key: str, digest: str) -> Optional[Response]:
+    # returns the response to send instead of running the endpoint, or None once we own the key
+    deadline = time.monotonic() + settings.idempotency_wait_seconds
+    while True:
+        record = await run_in_threadpool(reserve, db, user_id, key, digest)
+        if record is None:
+            return None
+        if record.request_hash != digest:
+            return JSONResponse({"detail": "Idempotency-Key was already used for a different request"}, status_code=422)
+        if record.status_code is not None:
+            return replay(record)
+        if time.monotonic() >= deadline:
+            return JSONResponse({"detail": "A request with this Idempotency-Key is still in progress"}, status_code=409)
+        await asyncio.sleep(POLL_SECONDS)
+        db.expire_all()
+
+
+class IdempotentRoute(APIRoute):
+    # POSTs carrying an Idempotency-Key run at most once per (user, key); repeats get the stored
+    # response without running the endpoint, concurrent repeats wait for the first to finish
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route(request: Request) -> Response:
+            key = request.headers.get(HEADER)
+            user_id = _user_id(request) if key and request.method == "POST" else None
+            if user_id is None:
+                return await handler(request)
+
+            digest = request_hash(request.method, request.url.path, await request.body(), request.url.query)
+            # same session source as the endpoints, so dependency overrides apply here too
+            sessions = request.app.dependency_overrides.get(get_db, get_db)()
+            db = next(sessions)
+            try:
+                early = await _claim(db, user_id, key, digest)
+                if early is not None:
+                    return early
+
+                try:
+                    response = await handler(request)
+                except HTTPException as exc:
+                    response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+                except Exception:
+                    await run_in_threadpool(release, db, user_id, key)
+                    raise
+
+                if response.status_code >= 500:
+                    await run_in_threadpool(release, db, user_id, key)
+                else:
+                    await run_in_threadpool(complete, db, user_id, key, response)
+                return response
+            finally:
+                sessions.close()
+
+        return route
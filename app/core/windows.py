@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.config import settings
+
+# from/to query windows shared by the slot listings, searches and range operations
+
+
+def _parse_dt(value: str, name: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"{name} must be ISO datetime like 2026-02-10T10:30:00")
+
+
+def resolve_window(
+    from_value: Optional[str],
+    to_value: Optional[str],
+    from_name: str = "from",
+    to_name: str = "to",
+) -> tuple[datetime, datetime]:
+    return check_window(
+        _parse_dt(from_value, from_name) if from_value else None,
+        _parse_dt(to_value, to_name) if to_value else None,
+    )
+
+
+def check_window(start: Optional[datetime], end: Optional[datetime]) -> tuple[datetime, datetime]:
+    max_window = timedelta(days=settings.slot_listing_max_days)
+
+    start = start or datetime.utcnow()
+    if end is None:
+        return start, start + max_window
+
+    if end <= start:
+        raise HTTPException(status_code=422, detail="to must be after from")
+    if end - start > max_window:
+        raise HTTPException(status_code=422, detail=f"Window must not exceed {settings.slot_listing_max_days} days")
+    return start, end
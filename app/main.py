@@ -1,5 +1,9 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from app.config import settings
+
 from app.routers.auth import router as auth_router
 from app.routers.users import router as users_router
 from app.routers.admin import router as admin_router
@@ -10,11 +14,53 @@ from app.routers.doctor_slots import router as slots_router
 from app.routers.public_slots import router as public_slots_router
 from app.routers.appointments import router as appointments_router
 from app.routers.doctor_appointments import router as doctor_appointments_router
+from app.routers.doctor_agenda import router as doctor_agenda_router
 from app.routers.reviews import router as reviews_router
 from app.routers.notifications import router as notifications_router
+from app.routers.availability_rules import router as availability_rules_router
+from app.routers.slot_search import router as slot_search_router
+from app.routers.waitlist import router as waitlist_router
 from app.routers import favorites
+from app.core.idempotency import run_idempotency_purge
+from app.services.archival import run_archival
+from app.services.jobs import pool as job_pool
+from app.services.leader import leader
+from app.services.reminders import reminder_wheel
+from app.services.scheduler import scheduler
+import app.services.job_handlers  # noqa: F401  registers job kinds
+from app.services.slot_horizon import run_horizon_extension
+from app.services.slot_partitions import run_partition_maintenance
+from app.services.sweeper import run_sweeper
+from app.services.waitlist import run_waitlist_expiry
+from app.startup import run_auto_seed
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    run_auto_seed()
+    scheduler.add("extend_slot_horizon", settings.horizon_extend_interval_seconds, run_horizon_extension)
+    scheduler.add("ensure_slot_partitions", settings.horizon_extend_interval_seconds, run_partition_maintenance)
+    scheduler.add("archive_expired", settings.archive_interval_seconds, run_archival)
+    scheduler.add("sweep_past_appointments", settings.sweep_interval_seconds, run_sweeper)
+    scheduler.add("purge_idempotency_keys", 60 * 60, run_idempotency_purge)
+    scheduler.add("expire_waitlist", 60, run_waitlist_expiry)
+    if settings.scheduler_enabled:
+        if settings.leader_election_enabled:
+            scheduler.gate = leader.is_leader
+            leader.start()
+        scheduler.start()
+        if settings.reminders_enabled:
+            # not leader-gated: every process follows its own changes, sending is exactly-once
+            reminder_wheel.start()
+    job_pool.start()
+    yield
+    job_pool.stop()
+    reminder_wheel.stop()
+    scheduler.stop()
+    leader.stop()
+
 
-app = FastAPI(title="Doctors Booking API")
+app = FastAPI(title="Doctors Booking API", lifespan=lifespan)
 
 # auth + users
 app.include_router(auth_router)
@@ -34,11 +80,15 @@ app.include_router(specialties_router)
 
 # slots
 app.include_router(slots_router)
+app.include_router(availability_rules_router)
 app.include_router(public_slots_router)
+app.include_router(slot_search_router)
 
 # appointments
 app.include_router(appointments_router)
 app.include_router(doctor_appointments_router)
+app.include_router(doctor_agenda_router)
+app.include_router(waitlist_router)
 
 # notifications
 app.include_router(notifications_router)
@@ -5,4 +5,10 @@ from .appointment_slot import AppointmentSlot
 from .appointment import Appointment
 from .review import Review
 from .notification import Notification
-from .favorite import Favorite
\ No newline at end of file
+from .favorite import Favorite
+from .availability_rule import AvailabilityRule
+from .archive import AppointmentSlotArchive, AppointmentArchive
+from .idempotency_key import IdempotencyKey
+from .job import Job
+from .leader_lease import LeaderLease
+from .waitlist import WaitlistEntry
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, event, inspect, select
 from datetime import datetime
 from app.db import Base
+from app.models.appointment_slot import AppointmentSlot
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    # ids are never reused once a row is deleted or archived (see services/archival)
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True)
     doctor_id = Column(Integer, ForeignKey("doctor_profiles.id"), nullable=False, index=True)
@@ -12,4 +15,38 @@ class Appointment(Base):
     status = Column(String(20), nullable=False, default="PENDING")
     canceled_by = Column(String(10), nullable=True)
     notes = Column(String(500), nullable=False, default="")
-    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # copied from the slot so a patient's bookings can be range-checked without a join
+    start_at = Column(DateTime, nullable=True)
+    end_at = Column(DateTime, nullable=True)
+
+    # bit per reminder already sent (see services/reminders.py); cleared when the slot changes
+    reminders_sent = Column(Integer, nullable=False, default=0, server_default="0")
+
+Index("ix_appointments_patient_end_start", Appointment.patient_user_id, Appointment.end_at, Appointment.start_at)
+Index("ix_appointments_status_start", Appointment.status, Appointment.start_at)
+
+
+def _copy_slot_times(connection, target):
+    row = connection.execute(
+        select(AppointmentSlot.start_at, AppointmentSlot.end_at).where(AppointmentSlot.id == target.slot_id)
+    ).first()
+    if row is not None:
+        target.start_at, target.end_at = row
+
+
+@event.listens_for(Appointment, "before_insert")
+def _times_on_insert(mapper, connection, target):
+    if target.start_at is None:
+        _copy_slot_times(connection, target)
+
+
+@event.listens_for(Appointment, "before_update")
+def _times_on_update(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.slot_id.history.has_changes():
+        # times set along with the slot (a multi-slot run) are kept
+        if not state.attrs.end_at.history.has_changes():
+            _copy_slot_times(connection, target)
+        target.reminders_sent = 0
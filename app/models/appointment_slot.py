@@ -6,6 +6,8 @@ from app.db import Base
 
 class AppointmentSlot(Base):
     __tablename__ = "appointment_slots"
+    # ids are never reused once a row is deleted or archived (see services/archival)
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id: Mapped[int] = mapped_column(primary_key=True)
     doctor_id: Mapped[int] = mapped_column(ForeignKey("doctor_profiles.id"), nullable=False)
@@ -15,6 +17,21 @@ class AppointmentSlot(Base):
 
     is_available: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
 
+    # places in the slot (> 1 for group sessions) and how many are taken. is_available stays
+    # the "bookable now" flag listings filter on; the booking statements in services/booking
+    # keep it in step with the counter and with `blocked`
+    capacity: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+    booked_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+    # closed by the doctor; a freed place does not reopen a blocked slot
+    blocked: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
 Index("ix_appointment_slots_doctor_id", AppointmentSlot.doctor_id)
 Index("ix_appointment_slots_start_at", AppointmentSlot.start_at)
-Index("ix_appointment_slots_end_at", AppointmentSlot.end_at)
\ No newline at end of file
+Index("ix_appointment_slots_end_at", AppointmentSlot.end_at)
+Index(
+    "ix_appointment_slots_doctor_available_start",
+    AppointmentSlot.doctor_id,
+    AppointmentSlot.is_available,
+    AppointmentSlot.start_at,
+)
\ No newline at end of file
@@ -0,0 +1,39 @@
+from datetime import datetime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+
+from app.db import Base
+
+# cold copies of finished rows; ids are the ids the rows had in the hot tables
+
+class AppointmentSlotArchive(Base):
+    __tablename__ = "appointment_slots_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    doctor_id: Mapped[int] = mapped_column(ForeignKey("doctor_profiles.id"), nullable=False, index=True)
+
+    start_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    end_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    is_available: Mapped[int] = mapped_column(Integer, nullable=False)
+    capacity: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
+    booked_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    blocked: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class AppointmentArchive(Base):
+    __tablename__ = "appointments_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    doctor_id = Column(Integer, ForeignKey("doctor_profiles.id"), nullable=False, index=True)
+    patient_user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    slot_id = Column(Integer, nullable=False)  # may point into appointment_slots_archive
+    status = Column(String(20), nullable=False)
+    canceled_by = Column(String(10), nullable=True)
+    notes = Column(String(500), nullable=False, default="")
+    created_at = Column(DateTime, nullable=False)
+    start_at = Column(DateTime, nullable=True)
+    end_at = Column(DateTime, nullable=True)
+    reminders_sent = Column(Integer, nullable=False, default=0, server_default="0")
+    archived_at = Column(DateTime, nullable=False)
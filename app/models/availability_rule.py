@@ -0,0 +1,25 @@
+from datetime import date, datetime, time
+from typing import Optional
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, Date, DateTime, Integer, Time
+
+from app.db import Base
+
+class AvailabilityRule(Base):
+    __tablename__ = "availability_rules"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    doctor_id: Mapped[int] = mapped_column(ForeignKey("doctor_profiles.id"), nullable=False, index=True)
+
+    weekday: Mapped[int] = mapped_column(Integer, nullable=False)  # 0 = Monday ... 6 = Sunday
+    start_time: Mapped[time] = mapped_column(Time, nullable=False)
+    end_time: Mapped[time] = mapped_column(Time, nullable=False)
+    slot_minutes: Mapped[int] = mapped_column(Integer, nullable=False, default=30)
+
+    valid_from: Mapped[date] = mapped_column(Date, nullable=False)
+    valid_until: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+
+    # concrete AppointmentSlot rows exist for this rule up to (excluding) this instant
+    materialized_until: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
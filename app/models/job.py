@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import DateTime, Index, Integer, String, Text
+
+from app.db import Base
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False, default="{}")  # JSON
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # higher runs first
+
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="QUEUED")  # QUEUED/RUNNING/DONE/FAILED
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=5)
+    run_after: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # a RUNNING job whose lease ran out is claimable again (worker died mid-job)
+    locked_by: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    result: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON
+    progress: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON, set by long handlers while running
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+Index("ix_jobs_status_priority_run_after", Job.status, Job.priority, Job.run_after)
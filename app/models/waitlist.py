@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import ForeignKey, DateTime, Index, Integer, String
+
+from app.db import Base
+
+class WaitlistEntry(Base):
+    __tablename__ = "waitlist_entries"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    doctor_id: Mapped[int] = mapped_column(ForeignKey("doctor_profiles.id"), nullable=False, index=True)
+    patient_user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
+
+    # any slot lying entirely inside this window is acceptable
+    window_start: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    window_end: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    # WAITING -> OFFERED -> BOOKED / DECLINED / EXPIRED (hold ran out); WAITING -> CANCELED
+    # when the patient leaves, EXPIRED once the window has passed. Never back to WAITING.
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="WAITING")
+    slot_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # offered slot, held for the patient
+    hold_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    appointment_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+Index("ix_waitlist_entries_status_hold", WaitlistEntry.status, WaitlistEntry.hold_expires_at)
@@ -1,10 +1,12 @@
+import json
 from datetime import date, datetime, timedelta
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func
 
+from app.config import settings
 from app.db import get_db
 from app.core.auth import require_role, get_current_user
 
@@ -16,6 +18,15 @@ from app.models.appointment_slot import AppointmentSlot
 from app.models.review import Review
 from app.models.favorite import Favorite 
 from app.models.notification import Notification  
+from app.models.job import Job
+from app.core.windows import resolve_window
+from app.services.booking import release_appointments
+from app.services.deletion import delete_doctor, delete_user, dependent_rows, doctor_dependent_rows
+from app.services.slot_queries import slots_starting_between
+from app.services.jobs import enqueue, pool as job_pool, queue_stats
+from app.services.leader import leader
+from app.services.scheduler import scheduler
+from app.services.waitlist import offer_slot
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -36,8 +47,25 @@ def list_users(
     return query.order_by(User.id.asc()).all()
 
 
+def _in_background(background: Optional[bool], rows: int) -> bool:
+    return background if background is not None else rows > settings.deletion_inline_limit
+
+
+def _queue(db: Session, response: Response, kind: str, payload: dict) -> dict:
+    # heavy deletions run as a job; its progress is at GET /admin/jobs/{job_id}
+    job = enqueue(db, kind, payload, priority=1)
+    db.commit()
+    response.status_code = 202
+    return {"ok": True, "job_id": job.id, "status": job.status}
+
+
 @router.delete("/users/{user_id}", dependencies=[Depends(require_role("ADMIN"))])
-def delete_user(user_id: int, db: Session = Depends(get_db)):
+def delete_user_account(
+    user_id: int,
+    response: Response,
+    background: Optional[bool] = Query(default=None, description="queue as a job; default: only for heavy users"),
+    db: Session = Depends(get_db),
+):
     u = db.query(User).filter(User.id == user_id).first()
     if not u:
         raise HTTPException(status_code=404, detail="User not found")
@@ -47,9 +75,9 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
         if admins_count <= 1:
             raise HTTPException(status_code=409, detail="Cannot delete the last ADMIN")
 
-    db.delete(u)
-    db.commit()
-    return {"ok": True}
+    if _in_background(background, dependent_rows(db, user_id)):
+        return _queue(db, response, "delete_user", {"user_id": user_id})
+    return {"ok": True, **delete_user(db, user_id)}
 
 
 @router.get("/specialties", dependencies=[Depends(require_role("ADMIN"))])
@@ -144,32 +172,41 @@ def set_doctor_active(
 
 
 @router.delete("/doctors/{doctor_id}", dependencies=[Depends(require_role("ADMIN"))])
-def delete_doctor_profile(doctor_id: int, db: Session = Depends(get_db)):
+def delete_doctor_profile(
+    doctor_id: int,
+    response: Response,
+    background: Optional[bool] = Query(default=None, description="queue as a job; default: only for busy doctors"),
+    db: Session = Depends(get_db),
+):
     doc = db.query(DoctorProfile).filter(DoctorProfile.id == doctor_id).first()
     if not doc:
         raise HTTPException(status_code=404, detail="Doctor not found")
 
-    db.delete(doc)
-    db.commit()
-    return {"ok": True}
+    if _in_background(background, doctor_dependent_rows(db, doctor_id)):
+        return _queue(db, response, "delete_doctor", {"doctor_id": doctor_id})
+    return {"ok": True, **delete_doctor(db, doctor_id)}
 
 @router.get("/doctors/{doctor_id}/slots", dependencies=[Depends(require_role("ADMIN"))])
 def list_doctor_slots(
     doctor_id: int,
     only_available: Optional[int] = Query(default=None, ge=0, le=1),
     day: Optional[date] = Query(default=None),
+    from_: Optional[str] = Query(default=None, alias="from"),
+    to: Optional[str] = Query(default=None),
     db: Session = Depends(get_db),
 ):
-    q = db.query(AppointmentSlot).filter(AppointmentSlot.doctor_id == doctor_id)
+    if day is not None:
+        start = datetime.combine(day, datetime.min.time())
+        q = slots_starting_between(db, doctor_id, start, start + timedelta(days=1))
+    elif from_ or to:
+        start, end = resolve_window(from_, to)
+        q = slots_starting_between(db, doctor_id, start, end)
+    else:
+        q = db.query(AppointmentSlot).filter(AppointmentSlot.doctor_id == doctor_id)
 
     if only_available is not None:
         q = q.filter(AppointmentSlot.is_available == only_available)
 
-    if day is not None:
-        start = datetime.combine(day, datetime.min.time())
-        end = start + timedelta(days=1)
-        q = q.filter(AppointmentSlot.start_at >= start, AppointmentSlot.start_at < end)
-
     return q.order_by(AppointmentSlot.start_at.asc()).all()
 
 
@@ -208,11 +245,11 @@ def delete_appointment(appointment_id: int, db: Session = Depends(get_db)):
     if not appt:
         raise HTTPException(status_code=404, detail="Appointment not found")
 
-    slot = db.query(AppointmentSlot).filter(AppointmentSlot.id == appt.slot_id).first()
-    if slot:
-        slot.is_available = 1
+    released = release_appointments(db, [appt.id])
 
     db.delete(appt)
+    for slot_id in released:
+        offer_slot(db, slot_id)
     db.commit()
     return {"ok": True}
 
@@ -237,4 +274,47 @@ def delete_review(review_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Review not found")
     db.delete(r)
     db.commit()
-    return {"ok": True}
\ No newline at end of file
+    return {"ok": True}
+
+@router.get("/tasks", dependencies=[Depends(require_role("ADMIN"))])
+def list_tasks():
+    # periodic maintenance tasks of this process with the metrics of their last run
+    return [
+        {
+            "name": t.name,
+            "interval_seconds": t.interval_seconds,
+            "runs": t.runs,
+            "last_result": t.last_result,
+            "last_error": t.last_error,
+        }
+        for t in scheduler.tasks()
+    ]
+
+
+@router.get("/jobs", dependencies=[Depends(require_role("ADMIN"))])
+def list_jobs(db: Session = Depends(get_db)):
+    return {**queue_stats(db), "workers": job_pool.describe()}
+
+
+@router.get("/jobs/{job_id}", dependencies=[Depends(require_role("ADMIN"))])
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "progress": json.loads(job.progress) if job.progress else None,
+        "result": json.loads(job.result) if job.result else None,
+        "last_error": job.last_error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+
+@router.get("/leader", dependencies=[Depends(require_role("ADMIN"))])
+def leader_status(db: Session = Depends(get_db)):
+    # which process currently runs the periodic tasks, as seen by the one answering
+    return leader.status(db)
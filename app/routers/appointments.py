@@ -1,15 +1,37 @@
+from datetime import datetime, timedelta
+
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from typing import Optional
 
 from app.db import get_db
 from app.core.auth import require_role, get_current_user
+from app.core.idempotency import IdempotentRoute
 from app.models.user import User
 from app.models.appointment_slot import AppointmentSlot
 from app.models.appointment import Appointment
-from app.schemas.appointments import AppointmentCreate, AppointmentOut
-from app.services.notifications import notify_doctor_and_patient
+from app.models.archive import AppointmentArchive
+from app.models.doctor_profile import DoctorProfile
+from app.core.windows import check_window
+from app.schemas.appointments import (
+    AppointmentCreate, AppointmentOut, AppointmentSeriesCreate, AppointmentSeriesOut, NextAvailableRequest,
+)
+from app.services.appointment_views import parse_expand, project, to_out
+from app.services.archival import appointment_history
+from app.services.booking import (
+    claim_next_available, claim_run, claim_slot, claim_slots_at, patient_has_overlap, release_appointments,
+)
+from app.services.notifications import notify_bulk, notify_doctor_and_patient
+from app.services.waitlist import offer_slot
+
+router = APIRouter(prefix="/appointments", tags=["appointments"], route_class=IdempotentRoute)
 
-router = APIRouter(prefix="/appointments", tags=["appointments"])
+
+def _booking_end(slot: AppointmentSlot, duration_minutes: Optional[int]) -> datetime:
+    if duration_minutes is None:
+        return slot.end_at
+    return max(slot.end_at, slot.start_at + timedelta(minutes=duration_minutes))
 
 
 @router.post("", response_model=AppointmentOut, dependencies=[Depends(require_role("USER"))])
@@ -22,10 +44,61 @@ def create_appointment(
     if not slot:
         raise HTTPException(status_code=404, detail="Slot not found")
 
-    if slot.is_available != 1:
+    end_at = _booking_end(slot, data.duration_minutes)
+    if patient_has_overlap(db, user.id, slot.start_at, end_at):
+        raise HTTPException(status_code=409, detail="You already have an appointment at this time")
+
+    if end_at > slot.end_at:
+        run = claim_run(db, slot, data.duration_minutes, patient_user_id=user.id)
+        if run is None:
+            db.rollback()
+            raise HTTPException(status_code=409, detail="No contiguous free slots for this duration")
+        end_at = run[-1].end_at
+    elif slot.is_available != 1 or not claim_slot(db, slot, patient_user_id=user.id):
         raise HTTPException(status_code=409, detail="Slot is not available")
 
-    slot.is_available = 0
+    appt = Appointment(
+        doctor_id=slot.doctor_id,
+        patient_user_id=user.id,
+        slot_id=slot.id,
+        status="PENDING",
+        canceled_by=None,
+        notes=data.notes or "",
+        start_at=slot.start_at,
+        end_at=end_at,
+    )
+
+    db.add(appt)
+    db.commit()
+    db.refresh(appt)
+
+    notify_doctor_and_patient(db, appt, "New appointment request (PENDING)")
+
+    return appt
+
+
+@router.post("/next-available", response_model=AppointmentOut, dependencies=[Depends(require_role("USER"))])
+def book_next_available(
+    data: NextAvailableRequest,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    if (data.doctor_id is None) == (data.specialty_id is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of doctor_id or specialty_id")
+
+    if data.doctor_id is not None:
+        doc = db.query(DoctorProfile).filter(DoctorProfile.id == data.doctor_id).first()
+        if not doc or doc.is_active != 1:
+            raise HTTPException(status_code=404, detail="Doctor not found")
+
+    start, end = check_window(data.from_, data.to)
+
+    slot = claim_next_available(
+        db, start, end, doctor_id=data.doctor_id, specialty_id=data.specialty_id, patient_user_id=user.id
+    )
+    if slot is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="No available slot in the requested window")
 
     appt = Appointment(
         doctor_id=slot.doctor_id,
@@ -34,6 +107,8 @@ def create_appointment(
         status="PENDING",
         canceled_by=None,
         notes=data.notes or "",
+        start_at=slot.start_at,
+        end_at=slot.end_at,
     )
 
     db.add(appt)
@@ -45,32 +120,85 @@ def create_appointment(
     return appt
 
 
+@router.post("/series", response_model=AppointmentSeriesOut, dependencies=[Depends(require_role("USER"))])
+def book_series(
+    data: AppointmentSeriesCreate,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    doc = db.query(DoctorProfile).filter(DoctorProfile.id == data.doctor_id).first()
+    if not doc or doc.is_active != 1:
+        raise HTTPException(status_code=404, detail="Doctor not found")
+    if data.start_at <= datetime.utcnow():
+        raise HTTPException(status_code=400, detail="Series must start in the future")
+
+    starts = [data.start_at + timedelta(days=data.interval_days * i) for i in range(data.count)]
+    claimed = claim_slots_at(db, doc.id, starts, patient_user_id=user.id)
+    booked = {r.start_at for r in claimed}
+    missing = [s for s in starts if s not in booked]
+    if not claimed or (missing and data.mode == "all"):
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Not every occurrence is available", "missing": [s.isoformat() for s in missing]},
+        )
+
+    # one executemany INSERT; mapper events don't run, so the slot times are given here
+    appts = db.scalars(
+        insert(Appointment).returning(Appointment),
+        [
+            {
+                "doctor_id": doc.id,
+                "patient_user_id": user.id,
+                "slot_id": r.id,
+                "status": "PENDING",
+                "notes": data.notes or "",
+                "start_at": r.start_at,
+                "end_at": r.end_at,
+            }
+            for r in claimed
+        ],
+    ).all()
+
+    message = f"New appointment series request ({len(appts)} appointments, PENDING)"
+    notify_bulk(db, [(user.id, message), (doc.user_id, message)])
+    db.commit()
+
+    return {"appointments": appts, "missing": missing}
+
+
 @router.get("/mine", response_model=list[AppointmentOut], dependencies=[Depends(require_role("USER"))])
-def my_appointments(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return (
+def my_appointments(
+    expand: Optional[str] = Query(default=None, description="slot,doctor"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    fields = parse_expand(expand)
+    q = (
         db.query(Appointment)
         .filter(Appointment.patient_user_id == user.id)
         .order_by(Appointment.created_at.desc())
-        .all()
     )
+    return [to_out(r, fields) for r in project(q, Appointment, fields)]
 
 
 @router.get("/history", response_model=list[AppointmentOut], dependencies=[Depends(require_role("USER"))])
-def history(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return (
-        db.query(Appointment)
-        .filter(
-            Appointment.patient_user_id == user.id,
-            Appointment.status.in_(["COMPLETED", "CANCELED"]),
-        )
-        .order_by(Appointment.created_at.desc())
-        .all()
-    )
+def history(
+    expand: Optional[str] = Query(default=None, description="slot,doctor"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    fields = parse_expand(expand)
+    # finished appointments may already have been moved to the archive table
+    rows = appointment_history(db, user.id, ("COMPLETED", "CANCELED", "NO_SHOW"), fields)
+    return [to_out(r, fields) for r in rows]
 
 
 @router.get("/{appointment_id}", response_model=AppointmentOut, dependencies=[Depends(require_role("USER"))])
 def get_my_appointment(appointment_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
     appt = db.query(Appointment).filter(Appointment.id == appointment_id).first()
+    if not appt:
+        appt = db.query(AppointmentArchive).filter(AppointmentArchive.id == appointment_id).first()
     if not appt:
         raise HTTPException(status_code=404, detail="Appointment not found")
     if appt.patient_user_id != user.id:
@@ -92,9 +220,8 @@ def cancel_appointment(appointment_id: int, db: Session = Depends(get_db), user:
     appt.status = "CANCELED"
     appt.canceled_by = "USER"
 
-    slot = db.query(AppointmentSlot).filter(AppointmentSlot.id == appt.slot_id).first()
-    if slot:
-        slot.is_available = 1
+    for slot_id in release_appointments(db, [appt.id]):
+        offer_slot(db, slot_id)
 
     db.commit()
     db.refresh(appt)
@@ -125,15 +252,31 @@ def reschedule(
     if not new_slot:
         raise HTTPException(status_code=404, detail="New slot not found")
 
-    if new_slot.is_available != 1:
+    # a multi-slot booking (ending after its first slot) keeps its length and needs a run
+    # at the new place as well
+    old_slot = db.get(AppointmentSlot, appt.slot_id)
+    minutes = None
+    if old_slot is not None and appt.end_at and appt.end_at > old_slot.end_at:
+        minutes = int((appt.end_at - appt.start_at).total_seconds() // 60)
+    end_at = _booking_end(new_slot, minutes)
+    if patient_has_overlap(db, user.id, new_slot.start_at, end_at, exclude_id=appt.id):
+        raise HTTPException(status_code=409, detail="You already have an appointment at this time")
+
+    if end_at > new_slot.end_at:
+        run = claim_run(db, new_slot, minutes, patient_user_id=user.id, exclude_id=appt.id)
+        if run is None:
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Slot not available")
+        end_at = run[-1].end_at
+    elif new_slot.is_available != 1 or not claim_slot(db, new_slot, patient_user_id=user.id, exclude_id=appt.id):
         raise HTTPException(status_code=409, detail="Slot not available")
 
-    old_slot = db.query(AppointmentSlot).filter(AppointmentSlot.id == appt.slot_id).first()
-    if old_slot:
-        old_slot.is_available = 1
-
-    new_slot.is_available = 0
+    released = release_appointments(db, [appt.id])
     appt.slot_id = new_slot_id
+    if end_at > new_slot.end_at:
+        appt.start_at, appt.end_at = new_slot.start_at, end_at
+    for slot_id in released:
+        offer_slot(db, slot_id)
 
     db.commit()
     db.refresh(appt)
@@ -0,0 +1,101 @@
+from datetime import datetime
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.core.auth import require_role, get_current_user
+from app.models.user import User
+from app.models.doctor_profile import DoctorProfile
+from app.models.availability_rule import AvailabilityRule
+from app.schemas.availability import AvailabilityRuleCreate, AvailabilityRuleOut
+from app.services.slot_horizon import horizon_end, materialize_rule
+
+router = APIRouter(prefix="/doctor/availability-rules", tags=["availability-rules"])
+
+
+def _my_doctor_profile(db: Session, doctor_user: User) -> DoctorProfile:
+    prof = db.query(DoctorProfile).filter(DoctorProfile.user_id == doctor_user.id).first()
+    if not prof:
+        raise HTTPException(status_code=404, detail="Doctor profile missing")
+    return prof
+
+
+@router.post("", response_model=AvailabilityRuleOut, dependencies=[Depends(require_role("DOCTOR"))])
+def create_rule(
+    data: AvailabilityRuleCreate,
+    db: Session = Depends(get_db),
+    doctor_user: User = Depends(get_current_user),
+):
+    if data.end_time <= data.start_time:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
+
+    valid_from = data.valid_from or datetime.utcnow().date()
+    if data.valid_until is not None and data.valid_until < valid_from:
+        raise HTTPException(status_code=400, detail="valid_until must not be before valid_from")
+
+    prof = _my_doctor_profile(db, doctor_user)
+
+    q = db.query(AvailabilityRule).filter(
+        AvailabilityRule.doctor_id == prof.id,
+        AvailabilityRule.weekday == data.weekday,
+        AvailabilityRule.start_time < data.end_time,
+        AvailabilityRule.end_time > data.start_time,
+        or_(AvailabilityRule.valid_until.is_(None), AvailabilityRule.valid_until >= valid_from),
+    )
+    if data.valid_until is not None:
+        q = q.filter(AvailabilityRule.valid_from <= data.valid_until)
+    if q.first():
+        raise HTTPException(status_code=409, detail="Rule overlaps with existing rule")
+
+    rule = AvailabilityRule(
+        doctor_id=prof.id,
+        weekday=data.weekday,
+        start_time=data.start_time,
+        end_time=data.end_time,
+        slot_minutes=data.slot_minutes,
+        valid_from=valid_from,
+        valid_until=data.valid_until,
+    )
+    db.add(rule)
+    db.flush()
+    materialize_rule(db, rule, horizon_end())
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+
+@router.get("", response_model=List[AvailabilityRuleOut], dependencies=[Depends(require_role("DOCTOR"))])
+def list_rules(
+    db: Session = Depends(get_db),
+    doctor_user: User = Depends(get_current_user),
+):
+    prof = _my_doctor_profile(db, doctor_user)
+    return (
+        db.query(AvailabilityRule)
+        .filter(AvailabilityRule.doctor_id == prof.id)
+        .order_by(AvailabilityRule.weekday.asc(), AvailabilityRule.start_time.asc())
+        .all()
+    )
+
+
+@router.delete("/{rule_id}", dependencies=[Depends(require_role("DOCTOR"))])
+def delete_rule(
+    rule_id: int,
+    db: Session = Depends(get_db),
+    doctor_user: User = Depends(get_current_user),
+):
+    prof = _my_doctor_profile(db, doctor_user)
+
+    rule = db.query(AvailabilityRule).filter(AvailabilityRule.id == rule_id).first()
+    if not rule:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    if rule.doctor_id != prof.id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    # slots already materialized from the rule stay as regular slots
+    db.delete(rule)
+    db.commit()
+    return {"ok": True, "deleted_rule_id": rule_id}
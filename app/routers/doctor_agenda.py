@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date, datetime, timedelta
+
+from app.db import get_db
+from app.core.auth import require_role, get_current_user
+from app.models.user import User
+from app.models.doctor_profile import DoctorProfile
+from app.schemas.slots import AgendaOut
+from app.services.agenda import doctor_agenda
+
+router = APIRouter(prefix="/doctor", tags=["doctor-agenda"])
+
+
+def _window(day: Optional[date], week: Optional[str]) -> tuple[datetime, datetime]:
+    if day is not None and week is not None:
+        raise HTTPException(status_code=400, detail="Provide only one of day or week")
+
+    if week is not None:
+        try:
+            year, _, num = week.partition("-W")
+            first = date.fromisocalendar(int(year), int(num), 1)
+        except ValueError:
+            raise HTTPException(status_code=422, detail="week must be ISO week like 2026-W07")
+        start = datetime.combine(first, datetime.min.time())
+        return start, start + timedelta(days=7)
+
+    start = datetime.combine(day or datetime.utcnow().date(), datetime.min.time())
+    return start, start + timedelta(days=1)
+
+
+@router.get("/agenda", response_model=AgendaOut, dependencies=[Depends(require_role("DOCTOR"))])
+def agenda(
+    day: Optional[date] = Query(default=None),
+    week: Optional[str] = Query(default=None, description="ISO week, e.g. 2026-W07"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    prof = db.query(DoctorProfile).filter(DoctorProfile.user_id == user.id).first()
+    if not prof:
+        raise HTTPException(status_code=404, detail="Doctor profile not found")
+
+    start, end = _window(day, week)
+    return AgendaOut(doctor_id=prof.id, start=start, end=end, entries=doctor_agenda(db, prof.id, start, end))
@@ -8,9 +8,16 @@ from app.models.user import User
 from app.models.doctor_profile import DoctorProfile
 from app.models.appointment import Appointment
 from app.models.appointment_slot import AppointmentSlot
-from app.schemas.appointments import AppointmentOut
+from app.schemas.appointments import (
+    AppointmentOut, BulkAppointmentAction, BulkItemResult, RescheduleDayOut, RescheduleDayRequest,
+)
 from app.schemas.enums import AppointmentStatus
 from app.services import notify, notify_doctor_and_patient
+from app.services.appointment_actions import apply_bulk
+from app.services.appointment_views import parse_expand, project, to_out
+from app.services.booking import release_appointments
+from app.services.day_reschedule import reschedule_day
+from app.services.waitlist import offer_slot
 
 router = APIRouter(prefix="/doctor/appointments", tags=["doctor-appointments"])
 
@@ -25,16 +32,33 @@ def _my_doctor_id(db: Session, user: User) -> int:
 @router.get("", response_model=list[AppointmentOut], dependencies=[Depends(require_role("DOCTOR"))])
 def list_received(
     status: Optional[AppointmentStatus] = Query(default=None),
+    expand: Optional[str] = Query(default=None, description="slot,doctor"),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
+    fields = parse_expand(expand)
     doctor_id = _my_doctor_id(db, user)
 
     q = db.query(Appointment).filter(Appointment.doctor_id == doctor_id)
     if status:
         q = q.filter(Appointment.status == status.value)
 
-    return q.order_by(Appointment.created_at.desc()).all()
+    q = q.order_by(Appointment.created_at.desc())
+    return [to_out(r, fields) for r in project(q, Appointment, fields)]
+
+
+@router.post("/bulk", response_model=list[BulkItemResult], dependencies=[Depends(require_role("DOCTOR"))])
+def bulk_action(data: BulkAppointmentAction, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    doctor_id = _my_doctor_id(db, user)
+    return apply_bulk(db, doctor_id, data.ids, data.action)
+
+
+@router.post("/reschedule-day", response_model=RescheduleDayOut, dependencies=[Depends(require_role("DOCTOR"))])
+def reschedule_whole_day(data: RescheduleDayRequest, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    doctor_id = _my_doctor_id(db, user)
+    if data.day < datetime.utcnow().date():
+        raise HTTPException(status_code=400, detail="Cannot cancel a past day")
+    return reschedule_day(db, doctor_id, data.day, fallback=data.fallback)
 
 
 @router.post("/{appointment_id}/confirm", response_model=AppointmentOut, dependencies=[Depends(require_role("DOCTOR"))])
@@ -73,9 +97,8 @@ def cancel_by_doctor(appointment_id: int, db: Session = Depends(get_db), user: U
     appt.canceled_by = "DOCTOR"
     notify_doctor_and_patient(db, appt, "Appointment canceled by doctor")
 
-    slot = db.query(AppointmentSlot).filter(AppointmentSlot.id == appt.slot_id).first()
-    if slot:
-        slot.is_available = 1
+    for slot_id in release_appointments(db, [appt.id]):
+        offer_slot(db, slot_id)
 
     db.commit()
     db.refresh(appt)
@@ -102,10 +125,16 @@ def complete(appointment_id: int, db: Session = Depends(get_db), user: User = De
     return appt
 
 @router.get("/upcoming", response_model=list[AppointmentOut], dependencies=[Depends(require_role("DOCTOR"))])
-def upcoming(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def upcoming(
+    to: Optional[datetime] = Query(default=None),
+    expand: Optional[str] = Query(default=None, description="slot,doctor"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    fields = parse_expand(expand)
     doctor_id = _my_doctor_id(db, user)
 
-    return (
+    q = (
         db.query(Appointment)
         .join(AppointmentSlot, AppointmentSlot.id == Appointment.slot_id)
         .filter(
@@ -113,6 +142,8 @@ def upcoming(db: Session = Depends(get_db), user: User = Depends(get_current_use
             Appointment.status == "CONFIRMED",
             AppointmentSlot.start_at >= datetime.utcnow()
         )
-        .order_by(AppointmentSlot.start_at.asc())
-        .all()
-    )
\ No newline at end of file
+    )
+    if to is not None:
+        q = q.filter(AppointmentSlot.start_at < to)
+    q = q.order_by(AppointmentSlot.start_at.asc())
+    return [to_out(r, fields) for r in project(q, Appointment, fields)]
\ No newline at end of file
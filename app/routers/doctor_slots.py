@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app.db import get_db
 from app.core.auth import require_role, get_current_user
 from app.models.user import User
 from app.models.doctor_profile import DoctorProfile
 from app.models.appointment_slot import AppointmentSlot
-from app.models.appointment import Appointment
-from app.schemas.slots import SlotCreate, SlotOut
+from app.core.windows import resolve_window
+from app.schemas.slots import SlotCreate, SlotOut, SlotAvailabilityUpdate
+from app.services.slot_queries import has_overlap, slots_starting_between
+from app.services.slot_ranges import range_conflicts, delete_range, set_range_availability, slot_in_use
 
 router = APIRouter(tags=["slots"])
 
@@ -31,16 +33,7 @@ def create_slot(
 
     prof = _my_doctor_profile(db, doctor_user)
 
-    overlap = (
-        db.query(AppointmentSlot)
-        .filter(
-            AppointmentSlot.doctor_id == prof.id,
-            AppointmentSlot.start_at < data.end_at,
-            AppointmentSlot.end_at > data.start_at,
-        )
-        .first()
-    )
-    if overlap:
+    if has_overlap(db, prof.id, data.start_at, data.end_at):
         raise HTTPException(status_code=409, detail="Slot overlaps with existing slot")
 
     slot = AppointmentSlot(
@@ -48,6 +41,7 @@ def create_slot(
         start_at=data.start_at,
         end_at=data.end_at,
         is_available=1,
+        capacity=data.capacity,
     )
     db.add(slot)
     db.commit()
@@ -57,17 +51,20 @@ def create_slot(
 
 @router.get("/doctor/slots", response_model=List[SlotOut], dependencies=[Depends(require_role("DOCTOR"))])
 def list_my_slots(
+    from_: Optional[str] = Query(default=None, alias="from"),
+    to: Optional[str] = Query(default=None),
     db: Session = Depends(get_db),
     doctor_user: User = Depends(get_current_user),
 ):
     prof = _my_doctor_profile(db, doctor_user)
 
-    return (
-        db.query(AppointmentSlot)
-        .filter(AppointmentSlot.doctor_id == prof.id)
-        .order_by(AppointmentSlot.start_at.asc())
-        .all()
-    )
+    if from_ or to:
+        start, end = resolve_window(from_, to)
+        q = slots_starting_between(db, prof.id, start, end)
+    else:
+        q = db.query(AppointmentSlot).filter(AppointmentSlot.doctor_id == prof.id)
+
+    return q.order_by(AppointmentSlot.start_at.asc()).all()
 
 
 @router.delete("/doctor/slots/{slot_id}", dependencies=[Depends(require_role("DOCTOR"))])
@@ -85,9 +82,42 @@ def delete_slot(
     if slot.doctor_id != prof.id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    has_appt = db.query(Appointment).filter(Appointment.slot_id == slot_id).first()
-    if has_appt:
+    # also a slot inside a multi-slot booking that started on an earlier slot
+    if slot_in_use(db, slot_id):
         raise HTTPException(status_code=409, detail="Slot has active appointment and cannot be deleted")
     db.delete(slot)
     db.commit()
-    return {"ok": True, "deleted_slot_id": slot_id}
\ No newline at end of file
+    return {"ok": True, "deleted_slot_id": slot_id}
+
+
+@router.delete("/doctor/slots", dependencies=[Depends(require_role("DOCTOR"))])
+def delete_slots_in_range(
+    from_: str = Query(..., alias="from"),
+    to: str = Query(...),
+    db: Session = Depends(get_db),
+    doctor_user: User = Depends(get_current_user),
+):
+    prof = _my_doctor_profile(db, doctor_user)
+    start, end = resolve_window(from_, to)
+
+    conflicts = range_conflicts(db, prof.id, start, end, active_only=False)
+    deleted = delete_range(db, prof.id, start, end)
+    db.commit()
+    return {"ok": True, "deleted": deleted, "conflicts": conflicts}
+
+
+@router.patch("/doctor/slots/availability", dependencies=[Depends(require_role("DOCTOR"))])
+def set_slots_availability(
+    data: SlotAvailabilityUpdate,
+    from_: str = Query(..., alias="from"),
+    to: str = Query(...),
+    db: Session = Depends(get_db),
+    doctor_user: User = Depends(get_current_user),
+):
+    prof = _my_doctor_profile(db, doctor_user)
+    start, end = resolve_window(from_, to)
+
+    conflicts = range_conflicts(db, prof.id, start, end, active_only=True) if data.is_available else []
+    updated = set_range_availability(db, prof.id, start, end, data.is_available)
+    db.commit()
+    return {"ok": True, "updated": updated, "conflicts": conflicts}
@@ -3,33 +3,59 @@ from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import datetime
 
+from app.config import settings
+from app.core.windows import resolve_window
 from app.db import get_db
-from app.models.appointment_slot import AppointmentSlot
-from app.schemas.slots import SlotOut
+from app.schemas.slots import SlotOut, CalendarOut
+from app.services.slot_calendar import month_days
+from app.services.slot_horizon import virtual_slots
+from app.services.slot_queries import available_slots
 
 router = APIRouter(prefix="/doctors", tags=["public-slots"])
 
+
 @router.get("/{doctor_id}/slots", response_model=list[SlotOut])
 def list_available_slots(
     doctor_id: int,
-    from_dt: Optional[str] = Query(default=None),
+    from_: Optional[str] = Query(default=None, alias="from"),
+    to: Optional[str] = Query(default=None),
+    limit: int = Query(default=settings.slot_listing_default_limit, ge=1, le=settings.slot_listing_max_limit),
+    from_dt: Optional[str] = Query(default=None, deprecated=True),
+    to_dt: Optional[str] = Query(default=None, deprecated=True),
     db: Session = Depends(get_db),
 ):
-
-    q = (
-        db.query(AppointmentSlot)
-        .filter(
-            AppointmentSlot.doctor_id == doctor_id,
-            AppointmentSlot.is_available == 1
-        )
+    start, end = resolve_window(
+        from_ or from_dt,
+        to or to_dt,
+        "from" if from_ else "from_dt",
+        "to" if to else "to_dt",
     )
 
-    if from_dt:
-        try:
-            dt = datetime.fromisoformat(from_dt)
-        except ValueError:
-            raise HTTPException(status_code=422, detail="from_dt must be ISO datetime like 2026-02-10T10:30:00")
+    slots = [SlotOut.model_validate(s) for s in available_slots(db, doctor_id, start, end, limit)]
+
+    # a full page already ends before anything further out; otherwise fill the rest of the
+    # window past the materialized horizon from the doctor's availability rules
+    if len(slots) >= limit:
+        return slots
+    extra = virtual_slots(db, doctor_id, start, end)
+    if not extra:
+        return slots
+    return sorted(slots + [SlotOut(**v) for v in extra], key=lambda s: s.start_at)[:limit]
+
 
-        q = q.filter(AppointmentSlot.end_at > dt)
+@router.get("/{doctor_id}/calendar", response_model=CalendarOut)
+def month_calendar(
+    doctor_id: int,
+    month: str = Query(..., description="YYYY-MM"),
+    db: Session = Depends(get_db),
+):
+    try:
+        first = datetime.strptime(month, "%Y-%m")
+    except ValueError:
+        raise HTTPException(status_code=422, detail="month must be like 2026-02")
 
-    return q.order_by(AppointmentSlot.start_at.asc()).all()
\ No newline at end of file
+    return CalendarOut(
+        doctor_id=doctor_id,
+        month=first.strftime("%Y-%m"),
+        days=month_days(db, doctor_id, first.year, first.month),
+    )
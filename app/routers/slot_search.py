@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.config import settings
+from app.db import get_db
+from app.models.doctor_profile import DoctorProfile
+from app.models.specialty import Specialty
+from app.core.windows import resolve_window
+from app.schemas.slots import DoctorSummary, SlotSearchResult
+from app.services.slot_search import active_doctor_ids, earliest_slots
+
+router = APIRouter(prefix="/slots", tags=["public-slots"])
+
+
+@router.get("/search", response_model=list[SlotSearchResult])
+def search_slots(
+    specialty_id: int = Query(..., ge=1),
+    from_: Optional[str] = Query(default=None, alias="from"),
+    to: Optional[str] = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=settings.slot_listing_max_limit),
+    db: Session = Depends(get_db),
+):
+    if not db.query(Specialty.id).filter(Specialty.id == specialty_id).first():
+        raise HTTPException(status_code=404, detail="Specialty not found")
+
+    start, end = resolve_window(from_, to)
+
+    doctor_ids = active_doctor_ids(db, specialty_id)
+    rows = earliest_slots(db, doctor_ids, start, end, limit)
+    if not rows:
+        return []
+
+    doctors = {
+        d.id: DoctorSummary.model_validate(d)
+        for d in db.query(DoctorProfile).filter(DoctorProfile.id.in_({r.doctor_id for r in rows})).all()
+    }
+    return [
+        SlotSearchResult(id=r.id, doctor_id=r.doctor_id, start_at=r.start_at, end_at=r.end_at, doctor=doctors[r.doctor_id])
+        for r in rows
+    ]
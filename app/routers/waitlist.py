@@ -0,0 +1,130 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.core.auth import require_role, get_current_user
+from app.models.user import User
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+from app.models.doctor_profile import DoctorProfile
+from app.models.waitlist import WaitlistEntry
+from app.schemas.appointments import AppointmentOut
+from app.schemas.waitlist import WaitlistCreate, WaitlistOut
+from app.services.booking import patient_has_overlap
+from app.services.notifications import notify_doctor_and_patient
+from app.services.waitlist import release_hold, waitlist_index
+
+router = APIRouter(prefix="/waitlist", tags=["waitlist"])
+
+
+def _my_entry(db: Session, entry_id: int, user: User) -> WaitlistEntry:
+    entry = db.query(WaitlistEntry).filter(WaitlistEntry.id == entry_id).first()
+    if not entry:
+        raise HTTPException(status_code=404, detail="Waitlist entry not found")
+    if entry.patient_user_id != user.id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return entry
+
+
+@router.post("", response_model=WaitlistOut, dependencies=[Depends(require_role("USER"))])
+def join_waitlist(data: WaitlistCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    doc = db.query(DoctorProfile).filter(DoctorProfile.id == data.doctor_id).first()
+    if not doc or doc.is_active != 1:
+        raise HTTPException(status_code=404, detail="Doctor not found")
+    if data.window_end <= data.window_start:
+        raise HTTPException(status_code=400, detail="window_end must be after window_start")
+    if data.window_end <= datetime.utcnow():
+        raise HTTPException(status_code=400, detail="Window is in the past")
+
+    entry = WaitlistEntry(
+        doctor_id=data.doctor_id,
+        patient_user_id=user.id,
+        window_start=data.window_start,
+        window_end=data.window_end,
+    )
+    db.add(entry)
+    db.commit()
+    db.refresh(entry)
+    return entry
+
+
+@router.get("/mine", response_model=list[WaitlistOut], dependencies=[Depends(require_role("USER"))])
+def my_waitlist(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    return (
+        db.query(WaitlistEntry)
+        .filter(WaitlistEntry.patient_user_id == user.id)
+        .order_by(WaitlistEntry.created_at.desc())
+        .all()
+    )
+
+
+@router.post("/{entry_id}/accept", response_model=AppointmentOut, dependencies=[Depends(require_role("USER"))])
+def accept_offer(entry_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    entry = _my_entry(db, entry_id, user)
+    now = datetime.utcnow()
+    if entry.status != "OFFERED" or entry.hold_expires_at <= now:
+        raise HTTPException(status_code=409, detail="No slot is held for this entry")
+
+    slot = db.query(AppointmentSlot).filter(AppointmentSlot.id == entry.slot_id).first()
+    if not slot:
+        raise HTTPException(status_code=409, detail="The held slot no longer exists")
+    if patient_has_overlap(db, user.id, slot.start_at, slot.end_at):
+        raise HTTPException(status_code=409, detail="You already have an appointment at this time")
+
+    # the hold may be expiring right now; exactly one of accept and expiry wins
+    booked = (
+        db.query(WaitlistEntry)
+        .filter(WaitlistEntry.id == entry.id, WaitlistEntry.status == "OFFERED", WaitlistEntry.hold_expires_at > now)
+        .update({"status": "BOOKED"})
+    )
+    if not booked:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="No slot is held for this entry")
+
+    appt = Appointment(
+        doctor_id=slot.doctor_id,
+        patient_user_id=user.id,
+        slot_id=slot.id,
+        status="PENDING",
+        canceled_by=None,
+        notes="",
+        start_at=slot.start_at,
+        end_at=slot.end_at,
+    )
+    db.add(appt)
+    db.flush()
+    entry.appointment_id = appt.id
+    db.commit()
+    db.refresh(appt)
+
+    notify_doctor_and_patient(db, appt, "New appointment request (PENDING)")
+
+    return appt
+
+
+@router.post("/{entry_id}/decline", response_model=WaitlistOut, dependencies=[Depends(require_role("USER"))])
+def decline_offer(entry_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    entry = _my_entry(db, entry_id, user)
+    if not release_hold(db, entry.id, "DECLINED"):
+        raise HTTPException(status_code=409, detail="No slot is held for this entry")
+    db.commit()
+    db.refresh(entry)
+    return entry
+
+
+@router.delete("/{entry_id}", dependencies=[Depends(require_role("USER"))])
+def leave_waitlist(entry_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    entry = _my_entry(db, entry_id, user)
+    left = (
+        db.query(WaitlistEntry)
+        .filter(WaitlistEntry.id == entry.id, WaitlistEntry.status == "WAITING")
+        .update({"status": "CANCELED"})
+    )
+    if left:
+        waitlist_index.remove(entry.doctor_id, entry.id)
+    elif not release_hold(db, entry.id, "CANCELED"):
+        raise HTTPException(status_code=409, detail="Entry is no longer active")
+    db.commit()
+    return {"ok": True}
@@ -1,11 +1,37 @@
-from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import Literal, Optional
+
+from app.schemas.slots import DoctorSummary
 
 class AppointmentCreate(BaseModel):
     doctor_id: int
     slot_id: int
     notes: Optional[str] = None
+    # longer than the slot: also books the back-to-back slots that follow it
+    duration_minutes: Optional[int] = Field(default=None, ge=5, le=480)
+
+class NextAvailableRequest(BaseModel):
+    doctor_id: Optional[int] = Field(default=None, ge=1)
+    specialty_id: Optional[int] = Field(default=None, ge=1)
+    from_: Optional[datetime] = Field(default=None, alias="from")
+    to: Optional[datetime] = None
+    notes: Optional[str] = None
+
+class AppointmentSeriesCreate(BaseModel):
+    doctor_id: int = Field(..., ge=1)
+    # first occurrence; the others follow every interval_days at the same time
+    start_at: datetime
+    count: int = Field(..., ge=2, le=52)
+    interval_days: int = Field(default=7, ge=1, le=28)
+    # "all": book every occurrence or none; "best_effort": book what is free and report the rest
+    mode: Literal["all", "best_effort"] = "all"
+    notes: Optional[str] = None
+
+class AppointmentSlotRef(BaseModel):
+    id: int
+    start_at: Optional[datetime] = None
+    end_at: Optional[datetime] = None
 
 class AppointmentOut(BaseModel):
     id: int
@@ -16,6 +42,42 @@ class AppointmentOut(BaseModel):
     status: str
     canceled_by: Optional[str] = None
     notes: Optional[str] = None
+    start_at: Optional[datetime] = None
+    end_at: Optional[datetime] = None
+    # only filled when requested with ?expand=slot,doctor
+    slot: Optional[AppointmentSlotRef] = None
+    doctor: Optional[DoctorSummary] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class AppointmentSeriesOut(BaseModel):
+    appointments: list[AppointmentOut]
+    missing: list[datetime]
+
+class BulkAppointmentAction(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=200)
+    action: Literal["confirm", "cancel", "complete"]
+
+class BulkItemResult(BaseModel):
+    id: int
+    ok: bool
+    status: Optional[str] = None
+    detail: Optional[str] = None
+
+class RescheduleDayRequest(BaseModel):
+    day: date
+    # also use free slots of other doctors of the same specialty
+    fallback: bool = False
+
+class RescheduledAppointment(BaseModel):
+    appointment_id: int
+    from_slot_id: int
+    to_slot_id: int
+    doctor_id: int
+    start_at: datetime
+
+class RescheduleDayOut(BaseModel):
+    moved: list[RescheduledAppointment]
+    canceled: list[int]
+    blocked_slots: int
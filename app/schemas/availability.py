@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from datetime import date, datetime, time
+from typing import Optional
+
+class AvailabilityRuleCreate(BaseModel):
+    weekday: int = Field(..., ge=0, le=6)
+    start_time: time
+    end_time: time
+    slot_minutes: int = Field(default=30, ge=5, le=480)
+    valid_from: Optional[date] = None
+    valid_until: Optional[date] = None
+
+class AvailabilityRuleOut(BaseModel):
+    id: int
+    doctor_id: int
+    weekday: int
+    start_time: time
+    end_time: time
+    slot_minutes: int
+    valid_from: date
+    valid_until: Optional[date] = None
+    materialized_until: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -4,4 +4,5 @@ class AppointmentStatus(str, Enum):
     PENDING = "PENDING"
     CONFIRMED = "CONFIRMED"
     REJECTED = "REJECTED"
-    CANCELED = "CANCELED"
\ No newline at end of file
+    CANCELED = "CANCELED"
+    NO_SHOW = "NO_SHOW"
@@ -1,16 +1,70 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Optional
 
 class SlotCreate(BaseModel):
     start_at: datetime
     end_at: datetime
+    capacity: int = Field(default=1, ge=1, le=100)  # > 1 for a group session
+
+class SlotAvailabilityUpdate(BaseModel):
+    is_available: int = Field(ge=0, le=1)
 
 class SlotOut(BaseModel):
-    id: int
+    id: Optional[int] = None  # None for slots computed from availability rules
     doctor_id: int
     start_at: datetime
     end_at: datetime
     is_available: int
+    # None when served from the in-memory availability index or computed from rules
+    capacity: Optional[int] = None
+    booked_count: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+class DoctorSummary(BaseModel):
+    id: int
+    full_name: str
+    clinic_name: Optional[str] = None
+    specialty_id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class SlotSearchResult(BaseModel):
+    id: int
+    doctor_id: int
+    start_at: datetime
+    end_at: datetime
+    doctor: DoctorSummary
+
+class CalendarDay(BaseModel):
+    date: str
+    available: int
+    booked: int
+    blocked: int = 0
+
+class CalendarOut(BaseModel):
+    doctor_id: int
+    month: str
+    days: list[CalendarDay]
+
+class AgendaAppointment(BaseModel):
+    id: int
+    status: str
+    patient_user_id: int
+    patient_name: Optional[str] = None
+
+class AgendaEntry(BaseModel):
+    slot_id: int
+    start_at: datetime
+    end_at: datetime
+    is_available: int
+    appointment: Optional[AgendaAppointment] = None
+
+class AgendaOut(BaseModel):
+    doctor_id: int
+    start: datetime
+    end: datetime
+    entries: list[AgendaEntry]
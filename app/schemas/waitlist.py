@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+
+class WaitlistCreate(BaseModel):
+    doctor_id: int = Field(..., ge=1)
+    window_start: datetime
+    window_end: datetime
+
+class WaitlistOut(BaseModel):
+    id: int
+    doctor_id: int
+    patient_user_id: int
+    window_start: datetime
+    window_end: datetime
+    status: str
+    slot_id: Optional[int] = None
+    hold_expires_at: Optional[datetime] = None
+    appointment_id: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,3 +1,3 @@
-from .notifications import notify, notify_doctor_and_patient
+from .notifications import notify, notify_bulk, notify_doctor_and_patient
 
-__all__ = ["notify", "notify_doctor_and_patient"]
\ No newline at end of file
+__all__ = ["notify", "notify_bulk", "notify_doctor_and_patient"]
\ No newline at end of file
@@ -0,0 +1,83 @@
+from datetime import datetime
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+from app.models.user import User
+from app.services import schedule_events
+from app.services.cache import TTLCache
+from app.services.slot_ranges import holds_slot
+
+# appointments that still occupy their slot; canceled/rejected ones leave it to the next booking
+AGENDA_STATUSES = ("PENDING", "CONFIRMED", "COMPLETED")
+
+# keyed by (doctor_id, window start, window end)
+agenda_cache = TTLCache(ttl_seconds=settings.agenda_cache_ttl_seconds)
+
+
+def doctor_agenda(db: Session, doctor_id: int, start: datetime, end: datetime) -> list[dict]:
+    key = (doctor_id, start, end)
+    cached = agenda_cache.get(key)
+    if cached is not None:
+        return cached
+
+    rows = db.execute(
+        select(
+            AppointmentSlot.id,
+            AppointmentSlot.start_at,
+            AppointmentSlot.end_at,
+            AppointmentSlot.is_available,
+            Appointment.id.label("appointment_id"),
+            Appointment.status,
+            Appointment.patient_user_id,
+            User.username,
+            User.email,
+        )
+        .select_from(AppointmentSlot)
+        # every slot of a multi-slot booking shows the booking, not only the first one
+        .outerjoin(Appointment, and_(holds_slot(), Appointment.status.in_(AGENDA_STATUSES)))
+        .outerjoin(User, User.id == Appointment.patient_user_id)
+        .where(
+            AppointmentSlot.doctor_id == doctor_id,
+            AppointmentSlot.start_at >= start,
+            AppointmentSlot.start_at < end,
+        )
+        .order_by(AppointmentSlot.start_at.asc(), AppointmentSlot.id.asc())
+    ).all()
+
+    entries = [
+        {
+            "slot_id": r.id,
+            "start_at": r.start_at,
+            "end_at": r.end_at,
+            "is_available": r.is_available,
+            "appointment": None if r.appointment_id is None else {
+                "id": r.appointment_id,
+                "status": r.status,
+                "patient_user_id": r.patient_user_id,
+                "patient_name": r.username or r.email,
+            },
+        }
+        for r in rows
+    ]
+
+    if not schedule_events.pending(db):
+        agenda_cache.set(key, entries)
+    return entries
+
+
+def _invalidate(changes: set) -> None:
+    for doctor_id, start_at in changes:
+        if doctor_id is None:
+            agenda_cache.clear()
+            return
+        if start_at is None:
+            agenda_cache.invalidate_where(lambda k, d=doctor_id: k[0] == d)
+        else:
+            agenda_cache.invalidate_where(lambda k, d=doctor_id, t=start_at: k[0] == d and k[1] <= t < k[2])
+
+
+schedule_events.subscribe(_invalidate)
@@ -0,0 +1,83 @@
+from typing import NamedTuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment
+from app.models.doctor_profile import DoctorProfile
+from app.services import schedule_events
+from app.services.booking import release_appointments
+from app.services.notifications import notify_bulk
+from app.services.waitlist import offer_slot
+
+
+class Transition(NamedTuple):
+    from_statuses: tuple[str, ...]
+    to_status: str
+    message: str
+    conflict_detail: str
+    frees_slot: bool
+
+
+# same rules and messages as the single-appointment doctor endpoints
+TRANSITIONS = {
+    "confirm": Transition(("PENDING",), "CONFIRMED", "Appointment confirmed", "Only PENDING can be confirmed", False),
+    "cancel": Transition(("PENDING", "CONFIRMED"), "CANCELED", "Appointment canceled by doctor", "Cannot cancel in current status", True),
+    "complete": Transition(("CONFIRMED",), "COMPLETED", "Appointment completed", "Only CONFIRMED can be completed", False),
+}
+
+
+def apply_bulk(db: Session, doctor_id: int, ids: list[int], action: str) -> list[dict]:
+    t = TRANSITIONS[action]
+    ids = list(dict.fromkeys(ids))
+
+    rows = {
+        r.id: r
+        for r in db.execute(
+            select(Appointment.id, Appointment.doctor_id, Appointment.status).where(Appointment.id.in_(ids))
+        )
+    }
+    results = {}
+    eligible = []
+    for i in ids:
+        r = rows.get(i)
+        if r is None:
+            results[i] = {"id": i, "ok": False, "status": None, "detail": "Appointment not found"}
+        elif r.doctor_id != doctor_id:
+            results[i] = {"id": i, "ok": False, "status": None, "detail": "Forbidden"}
+        elif r.status not in t.from_statuses:
+            results[i] = {"id": i, "ok": False, "status": r.status, "detail": t.conflict_detail}
+        else:
+            eligible.append(i)
+
+    changed = []
+    if eligible:
+        values = {"status": t.to_status}
+        if action == "cancel":
+            values["canceled_by"] = "DOCTOR"
+        # the status guard is repeated so a row changed since the read above is left alone
+        changed = db.execute(
+            update(Appointment)
+            .where(Appointment.id.in_(eligible), Appointment.status.in_(t.from_statuses))
+            .values(**values)
+            .returning(Appointment.id, Appointment.patient_user_id, Appointment.slot_id, Appointment.start_at)
+            .execution_options(synchronize_session=False)
+        ).all()
+
+    for r in changed:
+        results[r.id] = {"id": r.id, "ok": True, "status": t.to_status, "detail": None}
+    for i in eligible:
+        results.setdefault(i, {"id": i, "ok": False, "status": None, "detail": t.conflict_detail})
+
+    for r in changed:
+        schedule_events.touch(db, doctor_id, r.start_at)
+    if changed and t.frees_slot:
+        for slot_id in release_appointments(db, [r.id for r in changed]):
+            offer_slot(db, slot_id)
+
+    if changed:
+        doctor_user_id = db.query(DoctorProfile.user_id).filter(DoctorProfile.id == doctor_id).scalar()
+        notify_bulk(db, [(uid, t.message) for r in changed for uid in (r.patient_user_id, doctor_user_id)])
+
+    db.commit()
+    return [results[i] for i in ids]
@@ -0,0 +1,45 @@
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Query
+
+from app.models.doctor_profile import DoctorProfile
+
+EXPANDABLE = ("slot", "doctor")
+APPOINTMENT_COLUMNS = (
+    "id", "created_at", "patient_user_id", "doctor_id", "slot_id",
+    "status", "canceled_by", "notes", "start_at", "end_at",
+)
+DOCTOR_COLUMNS = ("id", "full_name", "clinic_name", "specialty_id")
+
+
+def parse_expand(value: Optional[str]) -> set[str]:
+    fields = {f.strip() for f in (value or "").split(",") if f.strip()}
+    unknown = fields - set(EXPANDABLE)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown expand field: {', '.join(sorted(unknown))}")
+    return fields
+
+
+def doctor_columns() -> list:
+    return [getattr(DoctorProfile, c).label(f"doctor_{c}") for c in DOCTOR_COLUMNS]
+
+
+def project(q: Query, model, expand: set[str]) -> Query:
+    # explicit columns instead of ORM entities; the doctor comes from the same statement.
+    # slot times are the copies stored on the appointment, so "slot" needs no join
+    cols = [getattr(model, c) for c in APPOINTMENT_COLUMNS]
+    if "doctor" in expand:
+        q = q.join(DoctorProfile, DoctorProfile.id == model.doctor_id)
+        cols += doctor_columns()
+    return q.with_entities(*cols)
+
+
+def to_out(row, expand: set[str]) -> dict:
+    m = row._mapping
+    out = {c: m[c] for c in APPOINTMENT_COLUMNS}
+    if "slot" in expand:
+        out["slot"] = {"id": m["slot_id"], "start_at": m["start_at"], "end_at": m["end_at"]}
+    if "doctor" in expand:
+        out["doctor"] = {c: m[f"doctor_{c}"] for c in DOCTOR_COLUMNS}
+    return out
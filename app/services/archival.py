@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import DateTime, delete, exists, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+from app.models.archive import AppointmentArchive, AppointmentSlotArchive
+from app.models.doctor_profile import DoctorProfile
+from app.services import schedule_events
+from app.services.appointment_views import APPOINTMENT_COLUMNS, doctor_columns
+
+FINISHED_STATUSES = ("COMPLETED", "CANCELED", "REJECTED", "NO_SHOW")
+
+
+def _move(db: Session, hot, cold, ids: list[int], now: datetime) -> None:
+    # rows keep their ids in the archive; the hot tables are AUTOINCREMENT on SQLite, so an
+    # archived id is never handed out again
+    cols = [c.name for c in hot.__table__.columns]
+    db.execute(
+        insert(cold).from_select(
+            cols + ["archived_at"],
+            select(*[hot.__table__.c[n] for n in cols], literal(now, DateTime)).where(hot.id.in_(ids)),
+        )
+    )
+    db.execute(delete(hot).where(hot.id.in_(ids)).execution_options(synchronize_session=False))
+
+
+def archive_appointments_batch(db: Session, cutoff: datetime, now: datetime, batch_size: int) -> int:
+    ids = db.scalars(
+        select(Appointment.id)
+        .join(AppointmentSlot, AppointmentSlot.id == Appointment.slot_id)
+        .where(
+            Appointment.status.in_(FINISHED_STATUSES),
+            AppointmentSlot.end_at < cutoff,
+        )
+        .order_by(Appointment.id.asc())
+        .limit(batch_size)
+    ).all()
+    if ids:
+        _move(db, Appointment, AppointmentArchive, ids, now)
+    return len(ids)
+
+
+def archive_slots_batch(db: Session, cutoff: datetime, now: datetime, batch_size: int) -> int:
+    rows = db.execute(
+        select(AppointmentSlot.id, AppointmentSlot.doctor_id, AppointmentSlot.start_at)
+        .where(
+            AppointmentSlot.end_at < cutoff,
+            ~exists().where(Appointment.slot_id == AppointmentSlot.id),
+        )
+        .order_by(AppointmentSlot.id.asc())
+        .limit(batch_size)
+    ).all()
+    if rows:
+        _move(db, AppointmentSlot, AppointmentSlotArchive, [r.id for r in rows], now)
+        for r in rows:
+            schedule_events.touch(db, r.doctor_id, r.start_at)
+    return len(rows)
+
+
+def archive_expired(db: Session, now: Optional[datetime] = None, batch_size: Optional[int] = None) -> dict:
+    # each batch is its own short transaction; appointments go first so their slots are free to follow
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=settings.archive_after_days)
+    batch_size = batch_size or settings.archive_batch_size
+
+    moved = {"appointments": 0, "slots": 0}
+    for key, step in (("appointments", archive_appointments_batch), ("slots", archive_slots_batch)):
+        while True:
+            n = step(db, cutoff, now, batch_size)
+            db.commit()
+            moved[key] += n
+            if n < batch_size:
+                break
+    return moved
+
+
+def run_archival() -> dict:
+    db = SessionLocal()
+    try:
+        return archive_expired(db)
+    finally:
+        db.close()
+
+
+def appointment_history(db: Session, patient_user_id: int, statuses: tuple[str, ...], expand: frozenset = frozenset()):
+    def part(model):
+        return select(*[getattr(model, c) for c in APPOINTMENT_COLUMNS]).where(
+            model.patient_user_id == patient_user_id,
+            model.status.in_(statuses),
+        )
+
+    q = union_all(part(Appointment), part(AppointmentArchive)).subquery()
+    stmt = select(q)
+    if "doctor" in expand:
+        stmt = stmt.join(DoctorProfile, DoctorProfile.id == q.c.doctor_id).add_columns(*doctor_columns())
+    return db.execute(stmt.order_by(q.c.created_at.desc(), q.c.id.desc())).all()
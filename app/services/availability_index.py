@@ -0,0 +1,106 @@
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.appointment_slot import AppointmentSlot
+from app.services import schedule_events
+
+# In-process copy of each doctor's slots, answering overlap checks and
+# "available after T" queries with bisect instead of SQL.
+#
+# An index is loaded lazily on first use and dropped whenever a committed
+# transaction in this process touches that doctor's slots. Other processes do
+# not see those commits, so this is only safe with a single app process; it is
+# enabled with AVAILABILITY_INDEX_ENABLED.
+
+
+class DoctorAvailabilityIndex:
+    __slots__ = ("ids", "starts", "ends", "max_ends", "available")
+
+    def __init__(self, rows):
+        # rows: (id, start_at, end_at, is_available) ordered by start_at
+        self.ids = [r[0] for r in rows]
+        self.starts = [r[1] for r in rows]
+        self.ends = [r[2] for r in rows]
+        self.available = bytearray(1 if r[3] == 1 else 0 for r in rows)
+
+        # running max of end_at keeps overlap checks exact even for legacy overlapping slots
+        self.max_ends = []
+        m = None
+        for e in self.ends:
+            m = e if m is None or e > m else m
+            self.max_ends.append(m)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        j = bisect_left(self.starts, end)
+        return j > 0 and self.max_ends[j - 1] > start
+
+    def available_after(
+        self,
+        t: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> list[tuple[int, datetime, datetime]]:
+        # available slots with t <= start_at < until, by start_at
+        i = bisect_left(self.starts, t) if t is not None else 0
+        j = bisect_left(self.starts, until) if until is not None else len(self.ids)
+
+        out = []
+        for k in range(i, j):
+            if self.available[k]:
+                out.append((self.ids[k], self.starts[k], self.ends[k]))
+                if limit is not None and len(out) >= limit:
+                    break
+        return out
+
+
+class AvailabilityIndexRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: dict[int, DoctorAvailabilityIndex] = {}
+        self._generation = 0
+
+    def get(self, db: Session, doctor_id: int) -> DoctorAvailabilityIndex:
+        idx = self._indexes.get(doctor_id)
+        if idx is not None:
+            return idx
+
+        generation = self._generation
+        rows = (
+            db.query(AppointmentSlot.id, AppointmentSlot.start_at, AppointmentSlot.end_at, AppointmentSlot.is_available)
+            .filter(AppointmentSlot.doctor_id == doctor_id)
+            .order_by(AppointmentSlot.start_at.asc(), AppointmentSlot.id.asc())
+            .all()
+        )
+        idx = DoctorAvailabilityIndex(rows)
+
+        # don't cache what a concurrent commit may have made stale, nor this session's uncommitted writes
+        if not schedule_events.pending(db):
+            with self._lock:
+                if generation == self._generation:
+                    self._indexes.setdefault(doctor_id, idx)
+        return idx
+
+    def invalidate(self, changes: set) -> None:
+        with self._lock:
+            self._generation += 1
+            for doctor_id, _ in changes:
+                if doctor_id is None:
+                    self._indexes.clear()
+                    return
+                self._indexes.pop(doctor_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._indexes.clear()
+
+
+availability_index = AvailabilityIndexRegistry()
+schedule_events.subscribe(availability_index.invalidate)
@@ -0,0 +1,230 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, case, exists, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+from app.models.doctor_profile import DoctorProfile
+from app.services import schedule_events
+from app.services.slot_ranges import ACTIVE_STATUSES, holds_slot
+
+
+# A claim takes one place: booked_count + 1, and is_available drops to 0 with the last place.
+# The guard makes it a conditional update, so of concurrent claims on the last place exactly
+# one matches; SET expressions see the old booked_count.
+CLAIMABLE = (AppointmentSlot.is_available == 1, AppointmentSlot.booked_count < AppointmentSlot.capacity)
+CLAIM_VALUES = {
+    AppointmentSlot.booked_count: AppointmentSlot.booked_count + 1,
+    AppointmentSlot.is_available: case((AppointmentSlot.booked_count + 1 < AppointmentSlot.capacity, 1), else_=0),
+}
+
+
+def claim_slot(
+    db: Session,
+    slot: AppointmentSlot,
+    patient_user_id: Optional[int] = None,
+    exclude_id: Optional[int] = None,
+) -> bool:
+    # with patient_user_id, the claim also fails when the patient has an overlapping booking;
+    # checked in the UPDATE itself, so two concurrent bookings cannot both pass
+    q = db.query(AppointmentSlot).filter(AppointmentSlot.id == slot.id, *CLAIMABLE)
+    if patient_user_id is not None:
+        q = q.filter(~_patient_overlap(patient_user_id, slot.start_at, slot.end_at, exclude_id))
+    n = q.update(CLAIM_VALUES, synchronize_session="fetch")
+    if n:
+        schedule_events.touch(db, slot.doctor_id, slot.start_at)
+    return n == 1
+
+
+def _patient_overlap(patient_user_id: int, start, end, exclude_id: Optional[int] = None):
+    # range probe on ix_appointments_patient_end_start: only bookings ending after `start`
+    q = (
+        exists()
+        .where(
+            Appointment.patient_user_id == patient_user_id,
+            Appointment.end_at > start,
+            Appointment.start_at < end,
+            Appointment.status.in_(ACTIVE_STATUSES),
+        )
+    )
+    if exclude_id is not None:
+        q = q.where(Appointment.id != exclude_id)
+    return q
+
+
+def patient_has_overlap(
+    db: Session,
+    patient_user_id: int,
+    start: datetime,
+    end: datetime,
+    exclude_id: Optional[int] = None,
+) -> bool:
+    return db.query(_patient_overlap(patient_user_id, start, end, exclude_id)).scalar()
+
+
+def claim_slots_at(db: Session, doctor_id: int, starts: list[datetime], patient_user_id: Optional[int] = None) -> list:
+    # claims every free slot of the doctor starting at one of `starts` in a single set-based
+    # UPDATE ... RETURNING; the caller decides whether a partial result is acceptable
+    q = update(AppointmentSlot).where(
+        AppointmentSlot.doctor_id == doctor_id,
+        AppointmentSlot.start_at.in_(starts),
+        *CLAIMABLE,
+    )
+    if patient_user_id is not None:
+        q = q.where(~_patient_overlap(patient_user_id, AppointmentSlot.start_at, AppointmentSlot.end_at))
+    rows = db.execute(
+        q.values(CLAIM_VALUES)
+        .returning(AppointmentSlot.id, AppointmentSlot.doctor_id, AppointmentSlot.start_at, AppointmentSlot.end_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+    for r in rows:
+        schedule_events.touch(db, r.doctor_id, r.start_at)
+    return sorted(rows, key=lambda r: r.start_at)
+
+
+def release_slots(db: Session, slot_ids: Iterable[int]) -> None:
+    # gives back one place per id (an id may repeat) and reopens the slots the doctor has not
+    # blocked. A relative decrement, so concurrent releases and claims on one group slot never
+    # lose an update
+    counts = Counter(slot_ids)
+    if not counts:
+        return
+    db.flush()
+    table = AppointmentSlot.__table__
+    db.connection().execute(
+        update(table)
+        .where(table.c.id == bindparam("slot_id"))
+        .values(
+            booked_count=case((table.c.booked_count > bindparam("n"), table.c.booked_count - bindparam("n")), else_=0),
+            is_available=case((table.c.blocked == 1, 0), else_=1),
+        ),
+        [{"slot_id": slot_id, "n": n} for slot_id, n in counts.items()],
+    )
+    # the Core statement bypasses the session, so loaded copies of these slots are stale
+    for obj in list(db.identity_map.values()):
+        if isinstance(obj, AppointmentSlot) and obj.id in counts:
+            db.expire(obj, ["booked_count", "is_available"])
+    for r in db.execute(select(AppointmentSlot.doctor_id, AppointmentSlot.start_at).where(AppointmentSlot.id.in_(counts))):
+        schedule_events.touch(db, r.doctor_id, r.start_at)
+
+
+def release_slot(db: Session, slot_id: int) -> None:
+    release_slots(db, [slot_id])
+
+
+def release_appointments(db: Session, appointment_ids: Iterable[int]) -> list[int]:
+    # gives back every slot the appointments hold: the booked slot and, for a multi-slot
+    # booking, the rest of its run (the doctor's slots starting inside [start_at, end_at)).
+    # Returns the released slot ids, e.g. to offer them to the waitlist
+    ids = list(appointment_ids)
+    if not ids:
+        return []
+    slot_ids = db.scalars(
+        select(AppointmentSlot.id)
+        .join(Appointment, holds_slot())
+        .where(Appointment.id.in_(ids))
+    ).all()
+    release_slots(db, slot_ids)
+    return list(dict.fromkeys(slot_ids))
+
+
+def claim_run(
+    db: Session,
+    slot: AppointmentSlot,
+    minutes: int,
+    patient_user_id: Optional[int] = None,
+    exclude_id: Optional[int] = None,
+) -> Optional[list]:
+    # claims the back-to-back free slots of the slot's doctor that start with `slot` and
+    # together last at least `minutes`, or nothing. The run is one range scan of
+    # ix_appointment_slots_doctor_available_start; LAG(end_at) finds gaps (and booked slots,
+    # which the scan skips) in SQL, so only the verdict comes back before the claim.
+    # patient_user_id adds the patient overlap check to the claim, as in claim_slot
+    start = slot.start_at
+    end = start + timedelta(minutes=minutes)
+    window = (
+        AppointmentSlot.doctor_id == slot.doctor_id,
+        *CLAIMABLE,
+        AppointmentSlot.start_at >= start,
+        AppointmentSlot.start_at < end,
+    )
+    run = (
+        select(
+            AppointmentSlot.start_at,
+            AppointmentSlot.end_at,
+            func.lag(AppointmentSlot.end_at).over(order_by=AppointmentSlot.start_at).label("prev_end"),
+        )
+        .where(*window)
+        .subquery()
+    )
+    found = db.execute(
+        select(
+            func.count().label("n"),
+            func.min(run.c.start_at).label("first_start"),
+            func.max(run.c.end_at).label("last_end"),
+            func.sum(case((run.c.prev_end != run.c.start_at, 1), else_=0)).label("gaps"),
+        )
+    ).one()
+    if not found.n or found.first_start != start or found.gaps or found.last_end < end:
+        return None
+
+    claim = update(AppointmentSlot).where(*window)
+    if patient_user_id is not None:
+        claim = claim.where(~_patient_overlap(patient_user_id, start, end, exclude_id))
+    rows = db.execute(
+        claim
+        .values(CLAIM_VALUES)
+        .returning(AppointmentSlot.id, AppointmentSlot.doctor_id, AppointmentSlot.start_at, AppointmentSlot.end_at)
+        .execution_options(synchronize_session="fetch")
+    ).all()
+    # a slot of the run taken (or freed) since the check: the caller rolls back
+    if len(rows) != found.n:
+        return None
+    schedule_events.touch(db, slot.doctor_id, start)
+    return sorted(rows, key=lambda r: r.start_at)
+
+
+def claim_next_available(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    doctor_id: Optional[int] = None,
+    specialty_id: Optional[int] = None,
+    patient_user_id: Optional[int] = None,
+):
+    # picks and claims the earliest free slot in a single UPDATE ... RETURNING statement.
+    # FOR UPDATE SKIP LOCKED (PostgreSQL) makes concurrent callers pass over rows another
+    # transaction is claiming instead of queueing behind it; SQLite serializes writers anyway.
+    candidate = (
+        select(AppointmentSlot.id)
+        .where(
+            *CLAIMABLE,
+            AppointmentSlot.start_at >= start,
+            AppointmentSlot.start_at < end,
+        )
+        .order_by(AppointmentSlot.start_at.asc(), AppointmentSlot.id.asc())
+        .limit(1)
+    )
+    if doctor_id is not None:
+        candidate = candidate.where(AppointmentSlot.doctor_id == doctor_id)
+    if specialty_id is not None:
+        candidate = candidate.join(DoctorProfile, DoctorProfile.id == AppointmentSlot.doctor_id).where(
+            DoctorProfile.specialty_id == specialty_id,
+            DoctorProfile.is_active == 1,
+        )
+    if patient_user_id is not None:
+        candidate = candidate.where(~_patient_overlap(patient_user_id, AppointmentSlot.start_at, AppointmentSlot.end_at))
+    candidate = candidate.with_for_update(skip_locked=True, of=AppointmentSlot)
+
+    row = db.execute(
+        update(AppointmentSlot)
+        .where(AppointmentSlot.id == candidate.scalar_subquery(), *CLAIMABLE)
+        .values(CLAIM_VALUES)
+        .returning(AppointmentSlot.id, AppointmentSlot.doctor_id, AppointmentSlot.start_at, AppointmentSlot.end_at)
+    ).first()
+    if row is not None:
+        schedule_events.touch(db, row.doctor_id, row.start_at)
+    return row
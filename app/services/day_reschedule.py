@@ -0,0 +1,243 @@
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+from app.models.doctor_profile import DoctorProfile
+from app.models.waitlist import WaitlistEntry
+from app.services import schedule_events
+from app.services.booking import CLAIM_VALUES, CLAIMABLE, claim_run, release_appointments
+from app.services.notifications import notify_bulk
+from app.services.slot_ranges import ACTIVE_STATUSES
+from app.services.waitlist import release_hold
+
+# other doctors' slots are only considered this close to the canceled day
+FALLBACK_DAYS = 7
+# rounds of re-assignment for slots taken by a concurrent booking meanwhile
+MAX_ROUNDS = 3
+# start slots tried per multi-slot appointment before it is canceled
+MAX_RUN_STARTS = 20
+
+HOLD_CANCELED = "The slot held for you from the waitlist was canceled by the doctor"
+
+
+class Candidate(NamedTuple):
+    start_at: datetime
+    id: int
+    doctor_id: int
+    end_at: datetime
+
+
+def _free_slots(db: Session, start: datetime, end: datetime, *conditions) -> list[Candidate]:
+    rows = db.execute(
+        select(AppointmentSlot.start_at, AppointmentSlot.id, AppointmentSlot.doctor_id, AppointmentSlot.end_at)
+        .where(*CLAIMABLE, AppointmentSlot.start_at >= start, AppointmentSlot.start_at < end, *conditions)
+        .order_by(AppointmentSlot.start_at.asc(), AppointmentSlot.id.asc())
+    ).all()
+    return [Candidate(*r) for r in rows]
+
+
+def _busy(busy: dict, patient_user_id: int, slot: Candidate) -> bool:
+    return any(s < slot.end_at and e > slot.start_at for s, e in busy.get(patient_user_id, ()))
+
+
+def _assign(appointments, own: list[Candidate], fallback: list[Candidate], busy: dict) -> dict:
+    # greedy by original time: each appointment takes the doctor's earliest free slot the
+    # patient can attend, else the earliest same-specialty slot starting no earlier than it did
+    used = set()
+    plan = {}
+    for a in appointments:
+        pick = next((c for c in own if c.id not in used and not _busy(busy, a.patient_user_id, c)), None)
+        if pick is None:
+            i = bisect_left(fallback, (a.start_at,))
+            pick = next((c for c in fallback[i:] if c.id not in used and not _busy(busy, a.patient_user_id, c)), None)
+        if pick is not None:
+            used.add(pick.id)
+            busy.setdefault(a.patient_user_id, []).append((pick.start_at, pick.end_at))
+            plan[a.id] = pick
+    return plan
+
+
+def _claim_runs(db: Session, appointments, own: list[Candidate], fallback: list[Candidate], busy: dict) -> dict:
+    # a multi-slot booking needs a run of the same length: each start candidate the patient
+    # can attend is tried with booking.claim_run, own doctor first, as in _assign
+    plan = {}
+    for a in appointments:
+        length = a.end_at - a.start_at
+        i = bisect_left(fallback, (a.start_at,))
+        starts = [c for c in own + fallback[i:] if not _busy(busy, a.patient_user_id, c._replace(end_at=c.start_at + length))]
+        for c in starts[:MAX_RUN_STARTS]:
+            run = claim_run(db, c, int(length.total_seconds() // 60))
+            if run is not None:
+                plan[a.id] = c._replace(end_at=run[-1].end_at)
+                busy.setdefault(a.patient_user_id, []).append((c.start_at, run[-1].end_at))
+                break
+    return plan
+
+
+def reschedule_day(db: Session, doctor_id: int, day: date, fallback: bool = False) -> dict:
+    # moves every active appointment of the doctor on `day` to a free slot, cancels the ones
+    # no slot is found for and blocks the whole day, all in the caller's single transaction
+    day_start = datetime.combine(day, datetime.min.time())
+    day_end = day_start + timedelta(days=1)
+    now = datetime.utcnow()
+
+    affected = db.execute(
+        select(
+            Appointment.id,
+            Appointment.patient_user_id,
+            Appointment.slot_id,
+            Appointment.status,
+            Appointment.start_at,
+            Appointment.end_at,
+            AppointmentSlot.end_at.label("slot_end_at"),
+        )
+        .join(AppointmentSlot, AppointmentSlot.id == Appointment.slot_id)
+        .where(
+            Appointment.doctor_id == doctor_id,
+            Appointment.status.in_(ACTIVE_STATUSES),
+            Appointment.start_at >= day_start,
+            Appointment.start_at < day_end,
+        )
+        .order_by(Appointment.start_at.asc(), Appointment.id.asc())
+    ).all()
+
+    # the day's bookings and waitlist holds give their places back before the slots are
+    # blocked; a held slot is not offered on, it is canceled with the day
+    release_appointments(db, [a.id for a in affected])
+    day_slots = select(AppointmentSlot.id).where(
+        AppointmentSlot.doctor_id == doctor_id, AppointmentSlot.start_at >= day_start, AppointmentSlot.start_at < day_end
+    )
+    holds = db.execute(
+        select(WaitlistEntry.id, WaitlistEntry.patient_user_id)
+        .where(WaitlistEntry.status == "OFFERED", WaitlistEntry.slot_id.in_(day_slots))
+    ).all()
+    released_holds = [h for h in holds if release_hold(db, h.id, "CANCELED", now, reoffer=False)]
+    blocked = (
+        db.query(AppointmentSlot)
+        .filter(AppointmentSlot.doctor_id == doctor_id, AppointmentSlot.start_at >= day_start, AppointmentSlot.start_at < day_end)
+        .update({AppointmentSlot.is_available: 0, AppointmentSlot.blocked: 1}, synchronize_session=False)
+    )
+    schedule_events.touch(db, doctor_id)
+    if not affected:
+        notify_bulk(db, [(h.patient_user_id, HOLD_CANCELED) for h in released_holds])
+        db.commit()
+        return {"moved": [], "canceled": [], "blocked_slots": blocked}
+
+    horizon = max(day_end, now) + timedelta(days=settings.slot_listing_max_days)
+    own = _free_slots(db, max(day_end, now), horizon, AppointmentSlot.doctor_id == doctor_id)
+    others: list[Candidate] = []
+    if fallback:
+        specialty_id = db.query(DoctorProfile.specialty_id).filter(DoctorProfile.id == doctor_id).scalar()
+        colleagues = select(DoctorProfile.id).where(
+            DoctorProfile.specialty_id == specialty_id, DoctorProfile.is_active == 1, DoctorProfile.id != doctor_id
+        )
+        others = _free_slots(
+            db, max(day_start, now), day_end + timedelta(days=FALLBACK_DAYS), AppointmentSlot.doctor_id.in_(colleagues)
+        )
+
+    by_id = {a.id: a for a in affected}
+
+    # the patients' other active bookings, so nobody is moved onto a clash
+    patients = {a.patient_user_id for a in affected}
+    busy: dict[int, list] = {}
+    for p, s, e in db.execute(
+        select(Appointment.patient_user_id, Appointment.start_at, Appointment.end_at).where(
+            Appointment.patient_user_id.in_(patients),
+            Appointment.status.in_(ACTIVE_STATUSES),
+            Appointment.id.not_in([a.id for a in affected]),
+            Appointment.end_at > day_start,
+        )
+    ):
+        busy.setdefault(p, []).append((s, e))
+
+    # bookings spanning several slots are placed after the single-slot ones, on runs
+    runs = [a for a in affected if a.end_at and a.end_at > a.slot_end_at]
+    plan: dict[int, Candidate] = {}
+    pending = [a for a in affected if a.id not in {r.id for r in runs}]
+    for _ in range(MAX_ROUNDS):
+        taken = {p: list(ivs) for p, ivs in busy.items()}
+        for appt_id, c in plan.items():
+            taken.setdefault(by_id[appt_id].patient_user_id, []).append((c.start_at, c.end_at))
+        round_plan = _assign(pending, own, others, taken)
+        if not round_plan:
+            break
+
+        # claim every chosen slot at once; one booked meanwhile is missing from RETURNING
+        chosen = {c.id for c in round_plan.values()}
+        claimed = set(db.scalars(
+            update(AppointmentSlot)
+            .where(AppointmentSlot.id.in_(chosen), *CLAIMABLE)
+            .values(CLAIM_VALUES)
+            .returning(AppointmentSlot.id)
+            .execution_options(synchronize_session=False)
+        ).all())
+        plan.update({appt_id: c for appt_id, c in round_plan.items() if c.id in claimed})
+        own = [c for c in own if c.id not in chosen]
+        others = [c for c in others if c.id not in chosen]
+        pending = [a for a in pending if a.id not in plan]
+        if claimed == chosen or not pending:
+            break
+
+    if runs:
+        taken = {p: list(ivs) for p, ivs in busy.items()}
+        for appt_id, c in plan.items():
+            taken.setdefault(by_id[appt_id].patient_user_id, []).append((c.start_at, c.end_at))
+        plan.update(_claim_runs(db, runs, own, others, taken))
+
+    moved = []
+    if plan:
+        # ORM bulk UPDATE by primary key (executemany); mapper events don't run, so the slot
+        # times are set here instead of by _copy_slot_times
+        db.execute(update(Appointment), [
+            {
+                "id": appt_id,
+                "slot_id": c.id,
+                "doctor_id": c.doctor_id,
+                "start_at": c.start_at,
+                "end_at": c.end_at,
+                "reminders_sent": 0,
+                # another doctor has not agreed to this booking yet
+                "status": by_id[appt_id].status if c.doctor_id == doctor_id else "PENDING",
+            }
+            for appt_id, c in plan.items()
+        ])
+        for c in plan.values():
+            schedule_events.touch(db, c.doctor_id, c.start_at)
+        moved = [
+            {"appointment_id": appt_id, "from_slot_id": by_id[appt_id].slot_id, "to_slot_id": c.id, "doctor_id": c.doctor_id, "start_at": c.start_at}
+            for appt_id, c in plan.items()
+        ]
+
+    canceled = [a.id for a in affected if a.id not in plan]
+    if canceled:
+        db.execute(
+            update(Appointment)
+            .where(Appointment.id.in_(canceled))
+            .values(status="CANCELED", canceled_by="DOCTOR")
+            .execution_options(synchronize_session=False)
+        )
+
+    doctor_users = dict(
+        db.query(DoctorProfile.id, DoctorProfile.user_id)
+        .filter(DoctorProfile.id.in_({c.doctor_id for c in plan.values()}))
+        .all()
+    )
+    messages = []
+    for appt_id, c in plan.items():
+        messages.append((by_id[appt_id].patient_user_id, f"Your appointment was moved to {c.start_at:%Y-%m-%d %H:%M} because the doctor canceled the day"))
+        if c.doctor_id != doctor_id and c.doctor_id in doctor_users:
+            messages.append((doctor_users[c.doctor_id], "New appointment request (PENDING)"))
+    for appt_id in canceled:
+        messages.append((by_id[appt_id].patient_user_id, "Appointment canceled by doctor"))
+    for h in released_holds:
+        messages.append((h.patient_user_id, HOLD_CANCELED))
+    notify_bulk(db, messages)
+
+    db.commit()
+    return {"moved": moved, "canceled": canceled, "blocked_slots": blocked}
@@ -0,0 +1,220 @@
+import logging
+import time
+from collections import Counter
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+from app.models.archive import AppointmentArchive, AppointmentSlotArchive
+from app.models.availability_rule import AvailabilityRule
+from app.models.doctor_profile import DoctorProfile
+from app.models.favorite import Favorite
+from app.models.idempotency_key import IdempotencyKey
+from app.models.notification import Notification
+from app.models.review import Review
+from app.models.user import User
+from app.models.waitlist import WaitlistEntry
+from app.services import schedule_events
+from app.services.booking import release_appointments
+from app.services.notifications import notify_bulk
+from app.services.slot_ranges import ACTIVE_STATUSES
+from app.services.waitlist import offer_slot, release_hold
+
+logger = logging.getLogger(__name__)
+
+Progress = Callable[[dict], None]
+
+
+class _Run:
+    # counts per table, reported after every chunk; each chunk is its own short transaction,
+    # so a deletion stopped halfway is simply started again
+    def __init__(self, db: Session, chunk_size: Optional[int], progress: Optional[Progress]):
+        self.db = db
+        self.chunk_size = chunk_size or settings.deletion_chunk_size
+        self.progress = progress
+        self.counts: Counter = Counter()
+        self.started = time.monotonic()
+
+    def commit(self, step: str) -> None:
+        if self.progress is not None:
+            self.progress({"step": step, "rows": dict(self.counts)})
+        self.db.commit()
+
+    def delete(self, model, *conditions) -> None:
+        while True:
+            chunk = select(model.id).where(*conditions).limit(self.chunk_size).scalar_subquery()
+            n = self.db.execute(
+                delete(model).where(model.id.in_(chunk)).execution_options(synchronize_session=False)
+            ).rowcount
+            self.counts[model.__tablename__] += n
+            self.commit(model.__tablename__)
+            if n < self.chunk_size:
+                return
+
+    def cancel(self, *conditions) -> list:
+        # one chunk of active appointments to CANCELED; the rows are returned for follow-up
+        chunk = (
+            select(Appointment.id)
+            .where(*conditions, Appointment.status.in_(ACTIVE_STATUSES))
+            .limit(self.chunk_size)
+            .scalar_subquery()
+        )
+        rows = self.db.execute(
+            update(Appointment)
+            .where(Appointment.id.in_(chunk), Appointment.status.in_(ACTIVE_STATUSES))
+            .values(status="CANCELED", canceled_by="ADMIN")
+            .returning(Appointment.id, Appointment.doctor_id, Appointment.patient_user_id, Appointment.start_at)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.counts["canceled_appointments"] += len(rows)
+        return rows
+
+    def result(self) -> dict:
+        return {"rows": dict(self.counts), "seconds": round(time.monotonic() - self.started, 3)}
+
+
+def dependent_rows(db: Session, user_id: int) -> int:
+    # rough size of a user's deletion, to decide between doing it inline and queueing a job
+    total = 0
+    for model, column in (
+        (Appointment, Appointment.patient_user_id),
+        (Notification, Notification.user_id),
+        (Review, Review.user_id),
+        (Favorite, Favorite.user_id),
+    ):
+        total += db.query(func.count(model.id)).filter(column == user_id).scalar() or 0
+    doctor_id = db.query(DoctorProfile.id).filter(DoctorProfile.user_id == user_id).scalar()
+    if doctor_id is not None:
+        total += doctor_dependent_rows(db, doctor_id)
+    return total
+
+
+def doctor_dependent_rows(db: Session, doctor_id: int) -> int:
+    return sum(
+        db.query(func.count(model.id)).filter(model.doctor_id == doctor_id).scalar() or 0
+        for model in (AppointmentSlot, Appointment)
+    )
+
+
+def _delete_doctor(run: _Run, doctor_id: int) -> None:
+    db = run.db
+    profile = db.get(DoctorProfile, doctor_id)
+    if profile is None:
+        return
+    profile.is_active = 0
+    # closed first, so nothing is booked while the schedule is being taken apart
+    while True:
+        chunk = (
+            select(AppointmentSlot.id)
+            .where(AppointmentSlot.doctor_id == doctor_id, AppointmentSlot.is_available == 1)
+            .limit(run.chunk_size)
+            .scalar_subquery()
+        )
+        n = db.execute(
+            update(AppointmentSlot)
+            .where(AppointmentSlot.id.in_(chunk))
+            .values(is_available=0, blocked=1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        run.counts["blocked_slots"] += n
+        schedule_events.touch(db, doctor_id)
+        run.commit("blocked_slots")
+        if n < run.chunk_size:
+            break
+
+    while True:
+        rows = run.cancel(Appointment.doctor_id == doctor_id)
+        notify_bulk(db, [(r.patient_user_id, "Appointment canceled: the doctor is no longer available") for r in rows])
+        run.commit("canceled_appointments")
+        if len(rows) < run.chunk_size:
+            break
+
+    # children before parents: appointments reference the slots
+    run.delete(WaitlistEntry, WaitlistEntry.doctor_id == doctor_id)
+    run.delete(Appointment, Appointment.doctor_id == doctor_id)
+    run.delete(AppointmentArchive, AppointmentArchive.doctor_id == doctor_id)
+    run.delete(AppointmentSlot, AppointmentSlot.doctor_id == doctor_id)
+    run.delete(AppointmentSlotArchive, AppointmentSlotArchive.doctor_id == doctor_id)
+    run.delete(AvailabilityRule, AvailabilityRule.doctor_id == doctor_id)
+    run.delete(Review, Review.doctor_id == doctor_id)
+    run.delete(Favorite, Favorite.doctor_id == doctor_id)
+
+    db.execute(delete(DoctorProfile).where(DoctorProfile.id == doctor_id).execution_options(synchronize_session=False))
+    db.expunge(profile)
+    run.counts["doctor_profiles"] += 1
+    schedule_events.touch(db, doctor_id)
+    run.commit("doctor_profiles")
+
+
+def delete_doctor(
+    db: Session,
+    doctor_id: int,
+    chunk_size: Optional[int] = None,
+    progress: Optional[Progress] = None,
+) -> dict:
+    # the profile with its schedule, bookings, reviews and favorites; patients of canceled
+    # appointments are notified. The doctor's user account stays
+    run = _Run(db, chunk_size, progress)
+    _delete_doctor(run, doctor_id)
+    logger.info("deleted doctor %s: %s", doctor_id, dict(run.counts))
+    return run.result()
+
+
+def delete_user(
+    db: Session,
+    user_id: int,
+    chunk_size: Optional[int] = None,
+    progress: Optional[Progress] = None,
+) -> dict:
+    # the account and everything hanging off it, in chunked set-based statements. The
+    # patient's active appointments are canceled first and their slots freed (and offered to
+    # the waitlist); a doctor account takes its profile along
+    run = _Run(db, chunk_size, progress)
+    doctor_id = db.query(DoctorProfile.id).filter(DoctorProfile.user_id == user_id).scalar()
+    if doctor_id is not None:
+        _delete_doctor(run, doctor_id)
+
+    while True:
+        rows = run.cancel(Appointment.patient_user_id == user_id)
+        for slot_id in release_appointments(db, [r.id for r in rows]):
+            offer_slot(db, slot_id)
+        doctor_users = dict(
+            db.query(DoctorProfile.id, DoctorProfile.user_id)
+            .filter(DoctorProfile.id.in_({r.doctor_id for r in rows}))
+            .all()
+        )
+        notify_bulk(db, [
+            (doctor_users[r.doctor_id], "Appointment canceled: the patient's account was deleted")
+            for r in rows
+            if r.doctor_id in doctor_users
+        ])
+        for r in rows:
+            schedule_events.touch(db, r.doctor_id, r.start_at)
+        run.commit("canceled_appointments")
+        if len(rows) < run.chunk_size:
+            break
+
+    # held waitlist offers give their slot to the next patient in line
+    for entry_id in db.scalars(
+        select(WaitlistEntry.id).where(WaitlistEntry.patient_user_id == user_id, WaitlistEntry.status == "OFFERED")
+    ).all():
+        release_hold(db, entry_id, "CANCELED")
+    run.commit("waitlist_holds")
+
+    run.delete(WaitlistEntry, WaitlistEntry.patient_user_id == user_id)
+    run.delete(Appointment, Appointment.patient_user_id == user_id)
+    run.delete(AppointmentArchive, AppointmentArchive.patient_user_id == user_id)
+    run.delete(Review, Review.user_id == user_id)
+    run.delete(Favorite, Favorite.user_id == user_id)
+    run.delete(Notification, Notification.user_id == user_id)
+    run.delete(IdempotencyKey, IdempotencyKey.user_id == user_id)
+
+    n = db.execute(delete(User).where(User.id == user_id).execution_options(synchronize_session=False)).rowcount
+    run.counts["users"] += n
+    run.commit("users")
+    logger.info("deleted user %s: %s", user_id, dict(run.counts))
+    return run.result()
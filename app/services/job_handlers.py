@@ -0,0 +1,34 @@
+from sqlalchemy.orm import Session
+
+from app.services.archival import archive_expired
+from app.services.deletion import delete_doctor, delete_user
+from app.services.jobs import handler, report_progress
+from app.services.slot_horizon import extend_horizons
+from app.services.sweeper import sweep_past_appointments
+
+# built-in job kinds; maintenance that can also be queued on demand instead of waiting for the scheduler
+
+
+@handler("extend_slot_horizon")
+def _extend_slot_horizon(db: Session, payload: dict):
+    return extend_horizons(db)
+
+
+@handler("archive_expired")
+def _archive_expired(db: Session, payload: dict):
+    return archive_expired(db, batch_size=payload.get("batch_size"))
+
+
+@handler("sweep_past_appointments")
+def _sweep_past_appointments(db: Session, payload: dict):
+    return sweep_past_appointments(db, policy=payload.get("policy"))
+
+
+@handler("delete_user")
+def _delete_user(db: Session, payload: dict):
+    return delete_user(db, payload["user_id"], progress=lambda p: report_progress(db, p))
+
+
+@handler("delete_doctor")
+def _delete_doctor(db: Session, payload: dict):
+    return delete_doctor(db, payload["doctor_id"], progress=lambda p: report_progress(db, p))
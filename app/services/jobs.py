@@ -0,0 +1,233 @@
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+# kind -> handler(db, payload) returning something JSON-serializable
+Handler = Callable[[Session, dict], object]
+handlers: dict[str, Handler] = {}
+
+MAX_BACKOFF_SECONDS = 60 * 60
+
+# id of the job the current worker thread is running, for report_progress
+_current = threading.local()
+
+
+def handler(kind: str):
+    def register(func: Handler) -> Handler:
+        handlers[kind] = func
+        return func
+    return register
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[dict] = None,
+    priority: int = 0,
+    run_after: Optional[datetime] = None,
+    max_attempts: Optional[int] = None,
+) -> Job:
+    # added to the caller's transaction, so the job exists only if the caller commits
+    if kind not in handlers:
+        raise ValueError(f"unknown job kind: {kind}")
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload or {}),
+        priority=priority,
+        run_after=run_after or datetime.utcnow(),
+        max_attempts=max_attempts or settings.job_max_attempts,
+    )
+    db.add(job)
+    return job
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(Job.status == "QUEUED", Job.run_after <= now),
+        and_(Job.status == "RUNNING", Job.lease_expires_at < now),
+    )
+
+
+def claim(db: Session, worker_id: str, now: Optional[datetime] = None) -> Optional[int]:
+    # same single-statement claim as booking.claim_next_available
+    now = now or datetime.utcnow()
+    candidate = (
+        select(Job.id)
+        .where(_claimable(now))
+        .order_by(Job.priority.desc(), Job.run_after.asc(), Job.id.asc())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job_id = db.execute(
+        update(Job)
+        .where(Job.id == candidate.scalar_subquery(), _claimable(now))
+        .values(
+            status="RUNNING",
+            locked_by=worker_id,
+            lease_expires_at=now + timedelta(seconds=settings.job_lease_seconds),
+            attempts=Job.attempts + 1,
+        )
+        .returning(Job.id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    db.commit()
+    return job_id
+
+
+def report_progress(db: Session, progress: dict) -> None:
+    # stores a handler's progress on its job row as part of the handler's next commit;
+    # a no-op outside a job, so services can report unconditionally
+    job_id = getattr(_current, "job_id", None)
+    if job_id is not None:
+        db.execute(
+            update(Job)
+            .where(Job.id == job_id)
+            .values(progress=json.dumps(progress, default=str))
+            .execution_options(synchronize_session=False)
+        )
+
+
+def backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(settings.job_backoff_seconds * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS))
+
+
+def _finish(db: Session, job_id: int, worker_id: str, **values) -> None:
+    # a worker that lost its lease must not overwrite the new owner's outcome
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == "RUNNING")
+        .values(locked_by=None, lease_expires_at=None, **values)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def run_one(db: Session, worker_id: str) -> bool:
+    job_id = claim(db, worker_id)
+    if job_id is None:
+        return False
+
+    job = db.get(Job, job_id, populate_existing=True)
+    _current.job_id = job_id
+    try:
+        func = handlers.get(job.kind)
+        if func is None:
+            raise LookupError(f"no handler for job kind {job.kind}")
+        result = func(db, json.loads(job.payload or "{}"))
+        db.commit()
+    except Exception:
+        db.rollback()
+        error = traceback.format_exc(limit=5)
+        logger.warning("job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+        now = datetime.utcnow()
+        if job.attempts >= job.max_attempts:
+            _finish(db, job_id, worker_id, status="FAILED", last_error=error, finished_at=now)
+        else:
+            _finish(db, job_id, worker_id, status="QUEUED", last_error=error, run_after=now + backoff(job.attempts))
+        return True
+    finally:
+        _current.job_id = None
+
+    _finish(db, job_id, worker_id, status="DONE", result=json.dumps(result, default=str), finished_at=datetime.utcnow())
+    return True
+
+
+def queue_stats(db: Session, failures: int = 20) -> dict:
+    depth = dict(db.query(Job.status, func.count(Job.id)).group_by(Job.status).all())
+    by_kind = [
+        {"kind": kind, "status": status, "count": n}
+        for kind, status, n in db.query(Job.kind, Job.status, func.count(Job.id)).group_by(Job.kind, Job.status).order_by(Job.kind, Job.status)
+    ]
+    failed = (
+        db.query(Job)
+        .filter(or_(Job.status == "FAILED", and_(Job.status == "QUEUED", Job.last_error.is_not(None))))
+        .order_by(Job.id.desc())
+        .limit(failures)
+        .all()
+    )
+    return {
+        "depth": depth,
+        "by_kind": by_kind,
+        "failures": [
+            {"id": j.id, "kind": j.kind, "status": j.status, "attempts": j.attempts, "last_error": j.last_error, "finished_at": j.finished_at}
+            for j in failed
+        ],
+    }
+
+
+def work(stop, worker_id: str, poll_seconds: float, session_factory: Callable[[], Session] = SessionLocal) -> None:
+    import app.services.job_handlers  # noqa: F401  registers the built-in kinds in spawned processes
+
+    db = session_factory()
+    try:
+        while not stop.is_set():
+            try:
+                busy = run_one(db, worker_id)
+            except Exception:  # keep the worker alive, e.g. through a locked database
+                logger.exception("job worker %s failed to claim", worker_id)
+                db.rollback()
+                busy = False
+            if not busy:
+                stop.wait(poll_seconds)
+    finally:
+        db.close()
+
+
+class WorkerPool:
+    # N workers polling the jobs table, as threads of this process or as separate processes
+
+    def __init__(self, size: int, mode: str = "thread", poll_seconds: float = 1.0, session_factory: Optional[sessionmaker] = None):
+        self.size = size
+        self.mode = mode
+        self.poll_seconds = poll_seconds
+        self.session_factory = session_factory or SessionLocal
+        self._workers: list = []
+        self._stop = None
+
+    def start(self) -> None:
+        if self._workers or self.size <= 0:
+            return
+        if self.mode == "process":
+            ctx = multiprocessing.get_context("spawn")
+            self._stop = ctx.Event()
+            make = ctx.Process
+            # a child process builds its own engine from settings
+            kwargs = {}
+        else:
+            self._stop = threading.Event()
+            make = threading.Thread
+            kwargs = {"session_factory": self.session_factory}
+
+        for i in range(self.size):
+            worker_id = f"{os.getpid()}-{self.mode}-{i}"
+            w = make(target=work, args=(self._stop, worker_id, self.poll_seconds), kwargs=kwargs, name=f"job-worker-{i}", daemon=True)
+            w.start()
+            self._workers.append(w)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._stop is not None:
+            self._stop.set()
+        for w in self._workers:
+            w.join(timeout)
+        self._workers = []
+        self._stop = None
+
+    def describe(self) -> dict:
+        return {"size": self.size, "mode": self.mode, "alive": sum(1 for w in self._workers if w.is_alive())}
+
+
+pool = WorkerPool(settings.job_workers, settings.job_worker_mode, settings.job_poll_seconds)
@@ -0,0 +1,147 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import case, exists, insert, literal, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.leader_lease import LeaderLease
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderElection:
+    # lease row in the app database: with several app processes (uvicorn --workers N, or
+    # several hosts) only the holder of an unexpired lease runs the periodic tasks.
+    # The holder renews every lease/3 seconds; if it dies, another process takes over
+    # once the lease has expired, and a clean shutdown gives the lease up at once.
+
+    def __init__(self, name: str, lease_seconds: float, session_factory: Callable[[], Session] = SessionLocal):
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.renew_seconds = lease_seconds / 3
+        self.session_factory = session_factory
+        self.holder_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.last_error: Optional[str] = None
+        # monotonic deadline of our own lease, so a stalled renewal stops us before anyone
+        # else can take over (their check is against the expiry stored in the row)
+        self._valid_until = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_leader(self) -> bool:
+        return time.monotonic() < self._valid_until
+
+    def try_acquire(self, db: Session, now: Optional[datetime] = None) -> bool:
+        started = time.monotonic()
+        now = now or datetime.utcnow()
+        expires = now + timedelta(seconds=self.lease_seconds)
+        mine = LeaderLease.holder == self.holder_id
+
+        # renew our lease or take over an expired one, in one conditional statement
+        row = db.execute(
+            update(LeaderLease)
+            .where(LeaderLease.name == self.name, or_(mine, LeaderLease.expires_at < now))
+            .values(
+                holder=self.holder_id,
+                acquired_at=case((mine, LeaderLease.acquired_at), else_=now),
+                renewed_at=now,
+                expires_at=expires,
+            )
+            .returning(LeaderLease.name)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if row is None:
+            # first election: create the row unless somebody already holds it
+            try:
+                row = db.execute(
+                    insert(LeaderLease)
+                    .from_select(
+                        ["name", "holder", "acquired_at", "renewed_at", "expires_at"],
+                        select(literal(self.name), literal(self.holder_id), literal(now), literal(now), literal(expires))
+                        .where(~exists().where(LeaderLease.name == self.name)),
+                    )
+                    .returning(LeaderLease.name)
+                ).first()
+            except IntegrityError:
+                db.rollback()
+                row = None
+        db.commit()
+
+        was_leader = self.is_leader()
+        self._valid_until = started + self.lease_seconds if row is not None else 0.0
+        if row is not None and not was_leader:
+            logger.info("%s became leader of %s", self.holder_id, self.name)
+        elif row is None and was_leader:
+            logger.warning("%s lost leadership of %s", self.holder_id, self.name)
+        return row is not None
+
+    def release(self, db: Session) -> None:
+        self._valid_until = 0.0
+        db.execute(
+            update(LeaderLease)
+            .where(LeaderLease.name == self.name, LeaderLease.holder == self.holder_id)
+            .values(expires_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def status(self, db: Session) -> dict:
+        lease = db.get(LeaderLease, self.name, populate_existing=True)
+        return {
+            "name": self.name,
+            "holder": lease.holder if lease else None,
+            "acquired_at": lease.acquired_at if lease else None,
+            "renewed_at": lease.renewed_at if lease else None,
+            "expires_at": lease.expires_at if lease else None,
+            "lease_seconds": self.lease_seconds,
+            "this_worker": self.holder_id,
+            "is_leader": self.is_leader(),
+            "running": self._thread is not None and self._thread.is_alive(),
+            "last_error": self.last_error,
+        }
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                self.try_acquire(db)
+                self.last_error = None
+            except Exception as e:  # e.g. database locked: retry, our lease runs out on its own
+                logger.exception("leader election %s failed", self.name)
+                self.last_error = repr(e)
+                db.rollback()
+            finally:
+                db.close()
+            self._stop.wait(self.renew_seconds)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="leader-election", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+            db = self.session_factory()
+            try:
+                self.release(db)
+            except Exception:
+                logger.exception("could not release leadership of %s", self.name)
+            finally:
+                db.close()
+
+
+leader = LeaderElection("scheduler", settings.leader_lease_seconds)
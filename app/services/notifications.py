@@ -1,3 +1,4 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.models.notification import Notification
 from app.models.doctor_profile import DoctorProfile
@@ -16,4 +17,11 @@ def notify_doctor_and_patient(db: Session, appt, message: str):
     # find doctor user_id
     prof = db.query(DoctorProfile).filter(DoctorProfile.id == appt.doctor_id).first()
     if prof:
-        notify(db, prof.user_id, message)
\ No newline at end of file
+        notify(db, prof.user_id, message)
+
+
+def notify_bulk(db: Session, messages: list[tuple[int, str]]):
+    # one multi-row INSERT; committed together with the caller's transaction
+    if messages:
+        db.execute(insert(Notification), [{"user_id": uid, "message": msg} for uid, msg in messages])
+
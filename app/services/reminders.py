@@ -0,0 +1,194 @@
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, NamedTuple, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.appointment import Appointment
+from app.services import schedule_events
+from app.services.notifications import notify_bulk
+
+logger = logging.getLogger(__name__)
+
+FIRE_BATCH_SIZE = 500
+
+
+class Reminder(NamedTuple):
+    bit: int  # in Appointment.reminders_sent
+    # sent while the appointment starts within (until, before] from now; a booking made
+    # later than that never gets this reminder
+    before: timedelta
+    until: timedelta
+    message: str
+
+
+REMINDERS = (
+    Reminder(1, timedelta(hours=24), timedelta(hours=12), "Reminder: your appointment is tomorrow at {:%H:%M}"),
+    Reminder(2, timedelta(hours=1), timedelta(0), "Reminder: your appointment is in 1 hour, at {:%H:%M}"),
+)
+
+
+class ReminderWheel:
+    # heap of (due_at, reminder, appointment_id) for CONFIRMED appointments starting within
+    # the next `window`. It is filled by one scan at startup, then kept current from
+    # schedule_events (confirm/cancel/reschedule in this process) and by loading only the
+    # time range that newly enters the window. Entries are never removed in place: sending
+    # is a conditional UPDATE on reminders_sent, so an entry for an appointment that was
+    # canceled, moved or already reminded by another process sends nothing.
+
+    def __init__(self, window_hours: float, tick_seconds: float, session_factory: Callable[[], Session] = SessionLocal):
+        self.window = timedelta(hours=window_hours)
+        self.tick_seconds = tick_seconds
+        self.session_factory = session_factory
+        self.sent = 0
+        self._heap: list[tuple[datetime, int, int]] = []
+        self._queued: set[tuple[datetime, int, int]] = set()
+        self._loaded_until: Optional[datetime] = None
+        self._changes: set = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def on_change(self, changes: set) -> None:
+        # only a loaded wheel needs to hear about changes
+        if self._loaded_until is not None:
+            with self._lock:
+                self._changes |= changes
+
+    def _schedule(self, rows, now: datetime) -> None:
+        for r in rows:
+            for i, reminder in enumerate(REMINDERS):
+                if r.reminders_sent & reminder.bit or r.start_at - reminder.until <= now:
+                    continue
+                entry = (r.start_at - reminder.before, i, r.id)
+                if entry not in self._queued:
+                    self._queued.add(entry)
+                    heapq.heappush(self._heap, entry)
+
+    def _load(self, db: Session, now: datetime, *conditions) -> None:
+        rows = db.execute(
+            select(Appointment.id, Appointment.start_at, Appointment.reminders_sent)
+            .where(Appointment.status == "CONFIRMED", Appointment.start_at > now, *conditions)
+        ).all()
+        self._schedule(rows, now)
+
+    def catch_up(self, db: Session, now: datetime) -> None:
+        self._heap.clear()
+        self._queued.clear()
+        with self._lock:
+            self._changes.clear()
+        self._loaded_until = now + self.window
+        self._load(db, now, Appointment.start_at <= self._loaded_until)
+
+    def _advance(self, db: Session, now: datetime) -> None:
+        horizon = now + self.window
+        if horizon > self._loaded_until:
+            self._load(db, now, Appointment.start_at > self._loaded_until, Appointment.start_at <= horizon)
+            self._loaded_until = horizon
+
+    def _apply_changes(self, db: Session, now: datetime) -> None:
+        with self._lock:
+            changes, self._changes = self._changes, set()
+        if not changes:
+            return
+        if any(doctor_id is None for doctor_id, _ in changes):
+            self.catch_up(db, now)
+            return
+
+        by_doctor: dict[int, Optional[set]] = {}
+        for doctor_id, start_at in changes:
+            if start_at is None:
+                by_doctor[doctor_id] = None
+            elif by_doctor.get(doctor_id, set()) is not None:
+                by_doctor.setdefault(doctor_id, set()).add(start_at)
+        matches = [
+            Appointment.doctor_id == doctor_id if starts is None
+            else and_(Appointment.doctor_id == doctor_id, Appointment.start_at.in_(starts))
+            for doctor_id, starts in by_doctor.items()
+        ]
+        self._load(db, now, Appointment.start_at <= self._loaded_until, or_(*matches))
+
+    def fire_due(self, db: Session, now: datetime) -> int:
+        due: dict[int, list[int]] = {}
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            self._queued.discard(entry)
+            due.setdefault(entry[1], []).append(entry[2])
+
+        sent = 0
+        for i, ids in due.items():
+            reminder = REMINDERS[i]
+            for k in range(0, len(ids), FIRE_BATCH_SIZE):
+                rows = db.execute(
+                    update(Appointment)
+                    .where(
+                        Appointment.id.in_(ids[k:k + FIRE_BATCH_SIZE]),
+                        Appointment.status == "CONFIRMED",
+                        Appointment.reminders_sent.op("&")(reminder.bit) == 0,
+                        Appointment.start_at > now + reminder.until,
+                        Appointment.start_at <= now + reminder.before,
+                    )
+                    .values(reminders_sent=Appointment.reminders_sent.op("|")(reminder.bit))
+                    .returning(Appointment.patient_user_id, Appointment.start_at)
+                    .execution_options(synchronize_session=False)
+                ).all()
+                notify_bulk(db, [(r.patient_user_id, reminder.message.format(r.start_at)) for r in rows])
+                db.commit()
+                sent += len(rows)
+        self.sent += sent
+        return sent
+
+    def tick(self, db: Session, now: Optional[datetime] = None) -> int:
+        now = now or datetime.utcnow()
+        if self._loaded_until is None:
+            self.catch_up(db, now)
+        else:
+            self._apply_changes(db, now)
+            self._advance(db, now)
+        return self.fire_due(db, now)
+
+    def describe(self) -> dict:
+        return {
+            "queued": len(self._heap),
+            "next_due": self._heap[0][0] if self._heap else None,
+            "loaded_until": self._loaded_until,
+            "sent": self.sent,
+        }
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                self.tick(db)
+            except Exception:  # keep the loop alive; the next tick retries
+                logger.exception("reminder tick failed")
+                db.rollback()
+            finally:
+                db.close()
+            wait = self.tick_seconds
+            if self._heap:
+                wait = min(wait, max((self._heap[0][0] - datetime.utcnow()).total_seconds(), 0.0))
+            self._stop.wait(wait)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="reminders", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._loaded_until = None
+
+
+reminder_wheel = ReminderWheel(settings.reminder_window_hours, settings.reminder_tick_seconds)
+schedule_events.subscribe(reminder_wheel.on_change)
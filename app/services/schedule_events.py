@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+
+# Collects which doctors' schedules a transaction touched and tells in-process
+# caches about it once the transaction commits.
+#
+# ORM changes to AppointmentSlot and Appointment are picked up automatically at flush time.
+# Core / bulk statements (insert(...), query.update(...), ...) bypass the flush,
+# so code issuing them must call touch() itself.
+#
+# A change is a (doctor_id, start_at) pair; start_at None means "anything of
+# that doctor" and doctor_id None means "anything at all".
+
+Change = tuple[Optional[int], Optional[datetime]]
+Listener = Callable[[set[Change]], None]
+
+_KEY = "schedule_changes"
+_listeners: list[Listener] = []
+
+
+def subscribe(listener: Listener) -> None:
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def touch(db: Session, doctor_id: Optional[int], start_at: Optional[datetime] = None) -> None:
+    db.info.setdefault(_KEY, set()).add((doctor_id, start_at))
+
+
+def pending(db: Session) -> bool:
+    return bool(db.info.get(_KEY))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (AppointmentSlot, Appointment)) and obj.doctor_id is not None:
+            touch(session, obj.doctor_id, obj.start_at)
+            for old in inspect(obj).attrs.start_at.history.deleted:
+                touch(session, obj.doctor_id, old)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch(session):
+    changes = session.info.pop(_KEY, None)
+    if not changes:
+        return
+    for listener in list(_listeners):
+        listener(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop(_KEY, None)
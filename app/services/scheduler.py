@@ -0,0 +1,75 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PeriodicTask:
+    name: str
+    interval_seconds: float
+    func: Callable[[], object]
+    next_run: float = 0.0
+    last_result: object = None
+    last_error: Optional[str] = None
+    runs: int = field(default=0)
+
+
+class Scheduler:
+    # single background thread running periodic maintenance tasks in-process
+
+    def __init__(self, tick_seconds: float = 1.0, gate: Optional[Callable[[], bool]] = None):
+        self.tick_seconds = tick_seconds
+        # tasks only run while gate() is true, e.g. while this process holds the leader lease
+        self.gate = gate
+        self._tasks: dict[str, PeriodicTask] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, name: str, interval_seconds: float, func: Callable[[], object]) -> None:
+        self._tasks[name] = PeriodicTask(name=name, interval_seconds=interval_seconds, func=func)
+
+    def tasks(self) -> list[PeriodicTask]:
+        return list(self._tasks.values())
+
+    def run_task(self, task: PeriodicTask) -> None:
+        try:
+            task.last_result = task.func()
+            task.last_error = None
+        except Exception as e:  # keep the loop alive, report on the task
+            logger.exception("periodic task %s failed", task.name)
+            task.last_error = repr(e)
+        task.runs += 1
+        task.next_run = time.monotonic() + task.interval_seconds
+
+    def run_due(self) -> None:
+        if self.gate is not None and not self.gate():
+            return
+        now = time.monotonic()
+        for task in list(self._tasks.values()):
+            if task.next_run <= now:
+                self.run_task(task)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.run_due()
+            self._stop.wait(self.tick_seconds)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+scheduler = Scheduler()
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.appointment_slot import AppointmentSlot
+from app.services import schedule_events
+from app.services.cache import TTLCache
+
+# per doctor-month day counts, keyed by (doctor_id, year, month)
+calendar_cache = TTLCache(ttl_seconds=settings.calendar_cache_ttl_seconds)
+
+
+def month_bounds(year: int, month: int) -> tuple[datetime, datetime]:
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+def month_days(db: Session, doctor_id: int, year: int, month: int) -> list[dict]:
+    key = (doctor_id, year, month)
+    cached = calendar_cache.get(key)
+    if cached is not None:
+        return cached
+
+    start, end = month_bounds(year, month)
+    day = func.date(AppointmentSlot.start_at)
+    rows = (
+        db.query(
+            day.label("day"),
+            # counted in places, so a group session contributes its capacity; the free places
+            # of a slot the doctor blocked count as blocked, not booked
+            func.sum(case(
+                (AppointmentSlot.is_available == 1, AppointmentSlot.capacity - AppointmentSlot.booked_count), else_=0
+            )).label("available"),
+            func.sum(case(
+                (or_(AppointmentSlot.is_available == 1, AppointmentSlot.blocked == 1), AppointmentSlot.booked_count),
+                else_=AppointmentSlot.capacity,
+            )).label("booked"),
+            func.sum(case(
+                (AppointmentSlot.blocked == 1, AppointmentSlot.capacity - AppointmentSlot.booked_count), else_=0
+            )).label("blocked"),
+        )
+        .filter(
+            AppointmentSlot.doctor_id == doctor_id,
+            AppointmentSlot.start_at >= start,
+            AppointmentSlot.start_at < end,
+        )
+        .group_by(day)
+        .order_by(day)
+        .all()
+    )
+    days = [
+        {
+            "date": str(r.day)[:10],
+            "available": int(r.available or 0),
+            "booked": int(r.booked or 0),
+            "blocked": int(r.blocked or 0),
+        }
+        for r in rows
+    ]
+
+    if not schedule_events.pending(db):
+        calendar_cache.set(key, days)
+    return days
+
+
+def _invalidate(changes: set) -> None:
+    for doctor_id, start_at in changes:
+        if doctor_id is None:
+            calendar_cache.clear()
+            return
+        if start_at is None:
+            calendar_cache.invalidate_where(lambda k, d=doctor_id: k[0] == d)
+        else:
+            calendar_cache.invalidate((doctor_id, start_at.year, start_at.month))
+
+
+schedule_events.subscribe(_invalidate)
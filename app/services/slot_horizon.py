@@ -0,0 +1,136 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+from sqlalchemy import insert, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.appointment_slot import AppointmentSlot
+from app.models.availability_rule import AvailabilityRule
+from app.services import schedule_events
+
+
+def horizon_end(now: Optional[datetime] = None) -> datetime:
+    now = now or datetime.utcnow()
+    return datetime.combine(now.date(), datetime.min.time()) + timedelta(days=settings.slot_horizon_days + 1)
+
+
+def iter_rule_slots(rule: AvailabilityRule, start: datetime, end: datetime) -> Iterator[tuple[datetime, datetime]]:
+    # occurrences of the rule with start_at in [start, end), in time order
+    first_day = max(start.date(), rule.valid_from)
+    last_day = end.date()
+    if rule.valid_until is not None:
+        last_day = min(last_day, rule.valid_until)
+
+    day = first_day + timedelta(days=(rule.weekday - first_day.weekday()) % 7)
+    step = timedelta(minutes=rule.slot_minutes)
+    while day <= last_day:
+        s = datetime.combine(day, rule.start_time)
+        day_end = datetime.combine(day, rule.end_time)
+        while s + step <= day_end:
+            if start <= s < end:
+                yield s, s + step
+            s += step
+        day += timedelta(days=7)
+
+
+def _overlaps(starts: list, ends: list, s: datetime, e: datetime) -> bool:
+    # starts/ends are sorted by start; slots of one doctor never overlap each other,
+    # so only the neighbour before and the first one at/after s can intersect [s, e)
+    i = bisect_left(starts, s)
+    if i > 0 and ends[i - 1] > s:
+        return True
+    return i < len(starts) and starts[i] < e
+
+
+def materialize_rule(db: Session, rule: AvailabilityRule, until: datetime, now: Optional[datetime] = None) -> int:
+    now = now or datetime.utcnow()
+    start = max(rule.materialized_until or datetime.min, now)
+    if start >= until:
+        return 0
+
+    existing = (
+        db.query(AppointmentSlot.start_at, AppointmentSlot.end_at)
+        .filter(
+            AppointmentSlot.doctor_id == rule.doctor_id,
+            AppointmentSlot.end_at > start,
+            AppointmentSlot.start_at < until + timedelta(minutes=rule.slot_minutes),
+        )
+        .order_by(AppointmentSlot.start_at.asc())
+        .all()
+    )
+    starts = [r.start_at for r in existing]
+    ends = [r.end_at for r in existing]
+
+    rows = [
+        {"doctor_id": rule.doctor_id, "start_at": s, "end_at": e, "is_available": 1}
+        for s, e in iter_rule_slots(rule, start, until)
+        if not _overlaps(starts, ends, s, e)
+    ]
+    if rows:
+        db.execute(insert(AppointmentSlot), rows)
+        schedule_events.touch(db, rule.doctor_id)
+
+    rule.materialized_until = until
+    return len(rows)
+
+
+def extend_horizons(db: Session, now: Optional[datetime] = None) -> int:
+    now = now or datetime.utcnow()
+    until = horizon_end(now)
+
+    rules = (
+        db.query(AvailabilityRule)
+        .filter(
+            or_(AvailabilityRule.materialized_until.is_(None), AvailabilityRule.materialized_until < until),
+            or_(AvailabilityRule.valid_until.is_(None), AvailabilityRule.valid_until >= now.date()),
+        )
+        .order_by(AvailabilityRule.doctor_id.asc(), AvailabilityRule.id.asc())
+        .all()
+    )
+
+    created = 0
+    for rule in rules:
+        created += materialize_rule(db, rule, until, now=now)
+        db.commit()
+    return created
+
+
+def run_horizon_extension() -> int:
+    db = SessionLocal()
+    try:
+        return extend_horizons(db)
+    finally:
+        db.close()
+
+
+def virtual_slots(db: Session, doctor_id: int, start: datetime, end: datetime) -> list[dict]:
+    # slots beyond each rule's materialized horizon, computed from the rules without writing rows.
+    # Checked against all of the doctor's concrete slots, booked and blocked ones included
+    rules = db.query(AvailabilityRule).filter(AvailabilityRule.doctor_id == doctor_id).all()
+    if not rules:
+        return []
+    lo = max(start, min(r.materialized_until or datetime.min for r in rules))
+    concrete = (
+        db.query(AppointmentSlot.start_at, AppointmentSlot.end_at)
+        .filter(
+            AppointmentSlot.doctor_id == doctor_id,
+            AppointmentSlot.end_at > lo,
+            AppointmentSlot.start_at < end + timedelta(minutes=max(r.slot_minutes for r in rules)),
+        )
+        .order_by(AppointmentSlot.start_at.asc())
+        .all()
+    )
+    starts = [s for s, _ in concrete]
+    ends = [e for _, e in concrete]
+
+    out = []
+    for rule in rules:
+        lo = max(start, rule.materialized_until or datetime.min)
+        for s, e in iter_rule_slots(rule, lo, end):
+            if not _overlaps(starts, ends, s, e):
+                out.append({"id": None, "doctor_id": doctor_id, "start_at": s, "end_at": e, "is_available": 1})
+    out.sort(key=lambda x: x["start_at"])
+    return out
@@ -0,0 +1,152 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.services.slot_horizon import horizon_end
+
+# Optional monthly RANGE partitioning of appointment_slots on PostgreSQL. Every slot query
+# bounds start_at (see slot_queries), so the planner prunes to the months of the window and
+# a month that is no longer needed is detached as a metadata-only operation.
+
+PARENT = "appointment_slots"
+
+# one-off conversion of an existing table; partitioned tables need the partition key in
+# every unique constraint, so appointments.slot_id can no longer be a foreign key
+CONVERT_STATEMENTS = [
+    "ALTER TABLE appointments DROP CONSTRAINT IF EXISTS appointments_slot_id_fkey",
+    f"ALTER TABLE {PARENT} RENAME TO {PARENT}_unpartitioned",
+    f"ALTER INDEX {PARENT}_pkey RENAME TO {PARENT}_unpartitioned_pkey",
+    f"CREATE TABLE {PARENT} (LIKE {PARENT}_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (start_at)",
+    f"ALTER TABLE {PARENT} ADD PRIMARY KEY (id, start_at)",
+    f"ALTER TABLE {PARENT} ADD FOREIGN KEY (doctor_id) REFERENCES doctor_profiles (id)",
+    f"CREATE TABLE {PARENT}_default PARTITION OF {PARENT} DEFAULT",
+]
+FINISH_STATEMENTS = [
+    f"INSERT INTO {PARENT} SELECT * FROM {PARENT}_unpartitioned",
+    f"ALTER SEQUENCE {PARENT}_id_seq OWNED BY {PARENT}.id",
+    f"DROP TABLE {PARENT}_unpartitioned",
+    f"CREATE INDEX ix_{PARENT}_doctor_id ON {PARENT} (doctor_id)",
+    f"CREATE INDEX ix_{PARENT}_start_at ON {PARENT} (start_at)",
+    f"CREATE INDEX ix_{PARENT}_end_at ON {PARENT} (end_at)",
+    f"CREATE INDEX ix_{PARENT}_doctor_available_start ON {PARENT} (doctor_id, is_available, start_at)",
+]
+
+
+def _month(dt: datetime) -> datetime:
+    return datetime(dt.year, dt.month, 1)
+
+
+def _next_month(dt: datetime) -> datetime:
+    return datetime(dt.year + 1, 1, 1) if dt.month == 12 else datetime(dt.year, dt.month + 1, 1)
+
+
+def month_starts(start: datetime, end: datetime) -> list[datetime]:
+    # first instants of every month intersecting [start, end)
+    out = []
+    m = _month(start)
+    while m < end:
+        out.append(m)
+        m = _next_month(m)
+    return out
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT}_{month:%Y_%m}"
+
+
+def create_partition_sql(month: datetime) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT} "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_next_month(month):%Y-%m-%d}')"
+    )
+
+
+def split_default_sql(month: datetime) -> list[str]:
+    # PostgreSQL refuses to create a month while the default partition holds rows for it
+    # (e.g. a manual slot beyond the horizon), so those rows move into the new partition
+    bounds = f"start_at >= '{month:%Y-%m-%d}' AND start_at < '{_next_month(month):%Y-%m-%d}'"
+    return [
+        f"ALTER TABLE {PARENT} DETACH PARTITION {PARENT}_default",
+        create_partition_sql(month),
+        f"INSERT INTO {PARENT} SELECT * FROM {PARENT}_default WHERE {bounds}",
+        f"DELETE FROM {PARENT}_default WHERE {bounds}",
+        f"ALTER TABLE {PARENT} ATTACH PARTITION {PARENT}_default DEFAULT",
+    ]
+
+
+def detach_partition_sql(month: datetime) -> str:
+    return f"ALTER TABLE {PARENT} DETACH PARTITION {partition_name(month)}"
+
+
+def is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    kind = db.execute(text("SELECT relkind FROM pg_class WHERE relname = :name"), {"name": PARENT}).scalar()
+    return kind == "p"
+
+
+def ensure_partitions(db: Session, start: datetime, end: datetime) -> int:
+    if not is_partitioned(db):
+        return 0
+    months = month_starts(start, end)
+    for m in months:
+        if db.execute(text("SELECT to_regclass(:name)"), {"name": partition_name(m)}).scalar():
+            continue
+        stranded = db.execute(
+            text(f"SELECT 1 FROM {PARENT}_default WHERE start_at >= :lo AND start_at < :hi LIMIT 1"),
+            {"lo": m, "hi": _next_month(m)},
+        ).scalar()
+        for stmt in split_default_sql(m) if stranded else [create_partition_sql(m)]:
+            db.execute(text(stmt))
+        # one month per transaction keeps the default detached only briefly
+        db.commit()
+    return len(months)
+
+
+def detach_partition(db: Session, month: datetime) -> None:
+    # the detached table keeps its rows and can be dumped or dropped at leisure
+    db.execute(text(detach_partition_sql(_month(month))))
+    db.commit()
+
+
+def convert_to_partitioned(db: Session, now: Optional[datetime] = None) -> None:
+    now = now or datetime.utcnow()
+    for stmt in CONVERT_STATEMENTS:
+        db.execute(text(stmt))
+
+    lo, hi = db.execute(text(f"SELECT min(start_at), max(start_at) FROM {PARENT}_unpartitioned")).one()
+    lo = min(lo or now, now)
+    hi = max(hi or now, horizon_end(now))
+    for m in month_starts(lo, _next_month(hi)):
+        db.execute(text(create_partition_sql(m)))
+
+    for stmt in FINISH_STATEMENTS:
+        db.execute(text(stmt))
+    db.commit()
+
+
+def run_partition_maintenance() -> int:
+    # keeps a partition ready for every month up to one past the materialization horizon
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        return ensure_partitions(db, now, _next_month(horizon_end(now)))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name != "postgresql":
+            print("Slot partitioning needs PostgreSQL")
+        elif is_partitioned(db):
+            print("appointment_slots is already partitioned")
+        else:
+            convert_to_partitioned(db)
+            print("appointment_slots converted to monthly partitions")
+    finally:
+        db.close()
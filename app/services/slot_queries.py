@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import Iterator, NamedTuple, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query, Session
+
+from app.config import settings
+from app.models.appointment_slot import AppointmentSlot
+from app.services import slot_rtree
+from app.services.availability_index import availability_index
+
+
+def _overlapping(db: Session, q: Query, doctor_id: int, start: datetime, end: datetime) -> Query:
+    if slot_rtree.enabled(db):
+        return slot_rtree.overlapping(q, doctor_id, start, end)
+    return q.filter(
+        AppointmentSlot.doctor_id == doctor_id,
+        AppointmentSlot.start_at < end,
+        AppointmentSlot.end_at > start,
+    )
+
+
+def has_overlap(db: Session, doctor_id: int, start: datetime, end: datetime) -> bool:
+    if settings.availability_index_enabled:
+        return availability_index.get(db, doctor_id).overlaps(start, end)
+
+    return _overlapping(db, db.query(AppointmentSlot.id), doctor_id, start, end).first() is not None
+
+
+def available_slots(
+    db: Session,
+    doctor_id: int,
+    start: datetime,
+    end: datetime,
+    limit: Optional[int] = None,
+) -> list:
+    # available slots with start <= start_at < end, earliest first.
+    # ORM rows from SQL, or plain dicts when served from the in-memory index
+    if settings.availability_index_enabled:
+        return [
+            {"id": slot_id, "doctor_id": doctor_id, "start_at": s, "end_at": e, "is_available": 1}
+            for slot_id, s, e in availability_index.get(db, doctor_id).available_after(start, end, limit)
+        ]
+
+    # equality on (doctor_id, is_available) plus a start_at range: one bounded range scan
+    # of ix_appointment_slots_doctor_available_start, already in start_at order. Deliberately
+    # not the R*Tree: it returns the window unordered, so every match is sorted before the
+    # limit applies (about 4x slower in benchmarks/slot_overlap.py)
+    q = (
+        db.query(AppointmentSlot)
+        .filter(
+            AppointmentSlot.doctor_id == doctor_id,
+            AppointmentSlot.is_available == 1,
+            AppointmentSlot.start_at >= start,
+            AppointmentSlot.start_at < end,
+        )
+        .order_by(AppointmentSlot.start_at.asc())
+    )
+    if limit is not None:
+        q = q.limit(limit)
+    return q.all()
+
+
+class SlotRow(NamedTuple):
+    start_at: datetime
+    id: int
+    doctor_id: int
+    end_at: datetime
+
+
+def iter_available_slots(
+    db: Session,
+    doctor_id: int,
+    start: datetime,
+    end: datetime,
+    page_size: int = 25,
+) -> Iterator[SlotRow]:
+    # lazily pages one doctor's available slots in (start_at, id) order; each page is a
+    # keyset range scan of ix_appointment_slots_doctor_available_start, so a consumer that
+    # stops early only ever reads the pages it used
+    if settings.availability_index_enabled:
+        for slot_id, s, e in availability_index.get(db, doctor_id).available_after(start, end):
+            yield SlotRow(s, slot_id, doctor_id, e)
+        return
+
+    after: Optional[tuple[datetime, int]] = None
+    while True:
+        q = db.query(AppointmentSlot.id, AppointmentSlot.start_at, AppointmentSlot.end_at).filter(
+            AppointmentSlot.doctor_id == doctor_id,
+            AppointmentSlot.is_available == 1,
+            AppointmentSlot.start_at >= start,
+            AppointmentSlot.start_at < end,
+        )
+        if after is not None:
+            q = q.filter(AppointmentSlot.start_at >= after[0], or_(
+                AppointmentSlot.start_at > after[0],
+                and_(AppointmentSlot.start_at == after[0], AppointmentSlot.id > after[1]),
+            ))
+        rows = q.order_by(AppointmentSlot.start_at.asc(), AppointmentSlot.id.asc()).limit(page_size).all()
+
+        for r in rows:
+            yield SlotRow(r.start_at, r.id, doctor_id, r.end_at)
+        if len(rows) < page_size:
+            return
+        after = (rows[-1].start_at, rows[-1].id)
+
+
+def slots_starting_between(db: Session, doctor_id: int, start: datetime, end: datetime) -> Query:
+    q = _overlapping(db, db.query(AppointmentSlot), doctor_id, start, end)
+    return q.filter(AppointmentSlot.start_at >= start)
@@ -0,0 +1,105 @@
+from datetime import datetime
+
+from sqlalchemy import and_, delete, exists, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+from app.models.waitlist import WaitlistEntry
+from app.services import schedule_events
+
+ACTIVE_STATUSES = ("PENDING", "CONFIRMED")
+
+
+def _in_window(doctor_id: int, start: datetime, end: datetime):
+    return (
+        AppointmentSlot.doctor_id == doctor_id,
+        AppointmentSlot.start_at >= start,
+        AppointmentSlot.start_at < end,
+    )
+
+
+def holds_slot():
+    # an appointment holds its own slot and, for a multi-slot booking, every slot of the doctor
+    # starting inside [start_at, end_at); booking.release_appointments frees by the same rule
+    return or_(
+        Appointment.slot_id == AppointmentSlot.id,
+        and_(
+            AppointmentSlot.doctor_id == Appointment.doctor_id,
+            AppointmentSlot.start_at >= Appointment.start_at,
+            AppointmentSlot.start_at < Appointment.end_at,
+        ),
+    )
+
+
+def _holds(active_only: bool):
+    # any appointment referencing the slot (the foreign key), or an active one covering it
+    if active_only:
+        return and_(holds_slot(), Appointment.status.in_(ACTIVE_STATUSES))
+    return or_(
+        Appointment.slot_id == AppointmentSlot.id,
+        and_(holds_slot(), Appointment.status.in_(ACTIVE_STATUSES)),
+    )
+
+
+def _has_appointment(active_only: bool):
+    return exists().where(_holds(active_only))
+
+
+def _held_for_waitlist():
+    # a slot held for a waitlist offer has no appointment until the patient accepts
+    return exists().where(WaitlistEntry.slot_id == AppointmentSlot.id, WaitlistEntry.status == "OFFERED")
+
+
+def slot_in_use(db: Session, slot_id: int) -> bool:
+    return db.query(
+        exists().where(AppointmentSlot.id == slot_id, or_(_has_appointment(active_only=False), _held_for_waitlist()))
+    ).scalar()
+
+
+def range_conflicts(db: Session, doctor_id: int, start: datetime, end: datetime, active_only: bool) -> list[dict]:
+    q = (
+        select(AppointmentSlot.id, AppointmentSlot.start_at, Appointment.id.label("appointment_id"), Appointment.status)
+        .join(Appointment, _holds(active_only))
+        .where(*_in_window(doctor_id, start, end))
+        .order_by(AppointmentSlot.start_at.asc(), Appointment.id.asc())
+    )
+    return [
+        {"slot_id": r.id, "start_at": r.start_at, "appointment_id": r.appointment_id, "status": r.status}
+        for r in db.execute(q)
+    ]
+
+
+def delete_range(db: Session, doctor_id: int, start: datetime, end: datetime) -> int:
+    # slots referenced by any appointment (even a canceled one) or held for a waitlist offer
+    # stay, as in the single delete
+    n = db.execute(
+        delete(AppointmentSlot)
+        .where(*_in_window(doctor_id, start, end), ~_has_appointment(active_only=False), ~_held_for_waitlist())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if n:
+        schedule_events.touch(db, doctor_id)
+    return n
+
+
+def set_range_availability(db: Session, doctor_id: int, start: datetime, end: datetime, is_available: int) -> int:
+    # blocking is kept in its own column, so a place freed later does not reopen the slot
+    stmt = update(AppointmentSlot).where(
+        *_in_window(doctor_id, start, end),
+        AppointmentSlot.blocked == is_available,
+    )
+    if is_available:
+        # never reopen a slot whose places are all held by active appointments
+        active = (
+            select(func.count(Appointment.id))
+            .where(holds_slot(), Appointment.status.in_(ACTIVE_STATUSES))
+            .scalar_subquery()
+        )
+        stmt = stmt.where(active < AppointmentSlot.capacity)
+    n = db.execute(
+        stmt.values(is_available=is_available, blocked=1 - is_available).execution_options(synchronize_session=False)
+    ).rowcount
+    if n:
+        schedule_events.touch(db, doctor_id)
+    return n
@@ -0,0 +1,99 @@
+import calendar
+import weakref
+from datetime import datetime
+
+from sqlalchemy import Column, Float, Integer, MetaData, Table, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session
+
+from app.config import settings
+from app.models.appointment_slot import AppointmentSlot
+
+# Optional SQLite R*Tree mirror of appointment_slots: one box per slot with
+# doctor_id as the first dimension and [start, end] in epoch seconds as the
+# second. Kept in sync by triggers, created together with appointment_slots.
+#
+# R*Tree coordinates are 32-bit floats rounded outwards, so the box is only a
+# coarse filter; queries always repeat the exact predicate on appointment_slots.
+
+TABLE = "appointment_slots_rtree"
+
+rtree = Table(
+    TABLE,
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("doctor_min", Float),
+    Column("doctor_max", Float),
+    Column("start_epoch", Float),
+    Column("end_epoch", Float),
+)
+
+_EPOCH = "CAST(strftime('%s', {}) AS INTEGER)"
+
+CREATE_STATEMENTS = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING rtree(id, doctor_min, doctor_max, start_epoch, end_epoch)",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_ai AFTER INSERT ON appointment_slots BEGIN
+        INSERT INTO {TABLE} VALUES (new.id, new.doctor_id, new.doctor_id, {_EPOCH.format('new.start_at')}, {_EPOCH.format('new.end_at')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_au AFTER UPDATE OF doctor_id, start_at, end_at ON appointment_slots BEGIN
+        UPDATE {TABLE} SET doctor_min = new.doctor_id, doctor_max = new.doctor_id,
+            start_epoch = {_EPOCH.format('new.start_at')}, end_epoch = {_EPOCH.format('new.end_at')}
+        WHERE id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_ad AFTER DELETE ON appointment_slots BEGIN
+        DELETE FROM {TABLE} WHERE id = old.id;
+    END""",
+    f"""INSERT OR REPLACE INTO {TABLE}
+        SELECT id, doctor_id, doctor_id, {_EPOCH.format('start_at')}, {_EPOCH.format('end_at')} FROM appointment_slots""",
+]
+
+_available: "weakref.WeakKeyDictionary[Engine, bool]" = weakref.WeakKeyDictionary()
+
+
+def epoch(dt: datetime) -> int:
+    return calendar.timegm(dt.timetuple())
+
+
+@event.listens_for(AppointmentSlot.__table__, "after_create")
+def _create(target, connection, **kw):
+    if connection.dialect.name != "sqlite" or not settings.slot_rtree_enabled:
+        return
+    for stmt in CREATE_STATEMENTS:
+        connection.exec_driver_sql(stmt)
+    _available[connection.engine] = True
+
+
+@event.listens_for(AppointmentSlot.__table__, "after_drop")
+def _drop(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {TABLE}")
+    _available[connection.engine] = False
+
+
+def enabled(db: Session) -> bool:
+    if not settings.slot_rtree_enabled:
+        return False
+    bind = db.get_bind()
+    if bind.dialect.name != "sqlite":
+        return False
+    engine = getattr(bind, "engine", bind)
+    if engine not in _available:
+        found = db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": TABLE}
+        ).first()
+        _available[engine] = found is not None
+    return _available[engine]
+
+
+def overlapping(q: Query, doctor_id: int, start: datetime, end: datetime) -> Query:
+    # slots of the doctor intersecting [start, end), driven by the R*Tree
+    return q.join(rtree, rtree.c.id == AppointmentSlot.id).filter(
+        rtree.c.doctor_min <= doctor_id,
+        rtree.c.doctor_max >= doctor_id,
+        rtree.c.start_epoch <= epoch(end),
+        rtree.c.end_epoch >= epoch(start),
+        AppointmentSlot.doctor_id == doctor_id,
+        AppointmentSlot.start_at < end,
+        AppointmentSlot.end_at > start,
+    )
@@ -0,0 +1,28 @@
+import heapq
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy.orm import Session
+
+from app.models.doctor_profile import DoctorProfile
+from app.services.slot_queries import SlotRow, iter_available_slots
+
+
+def active_doctor_ids(db: Session, specialty_id: int) -> list[int]:
+    rows = (
+        db.query(DoctorProfile.id)
+        .filter(DoctorProfile.specialty_id == specialty_id, DoctorProfile.is_active == 1)
+        .all()
+    )
+    return [r.id for r in rows]
+
+
+def merged_slot_stream(db: Session, doctor_ids: list[int], start: datetime, end: datetime, page_size: int = 25):
+    # k-way merge of per-doctor streams that are each already in (start_at, id) order,
+    # so only the head of every stream is held in the heap
+    streams = [iter_available_slots(db, doctor_id, start, end, page_size) for doctor_id in doctor_ids]
+    return heapq.merge(*streams)
+
+
+def earliest_slots(db: Session, doctor_ids: list[int], start: datetime, end: datetime, limit: int) -> list[SlotRow]:
+    return list(islice(merged_slot_stream(db, doctor_ids, start, end, page_size=min(limit, 25)), limit))
@@ -0,0 +1,91 @@
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.appointment import Appointment
+from app.models.doctor_profile import DoctorProfile
+from app.services import schedule_events
+from app.services.notifications import notify_bulk
+
+logger = logging.getLogger(__name__)
+
+MESSAGES = {
+    "COMPLETED": "Appointment completed",
+    "NO_SHOW": "Appointment marked as no-show",
+}
+
+
+def sweep_batch(db: Session, now: datetime, policy: str, batch_size: int) -> tuple[int, int]:
+    # the appointment's own end_at: a multi-slot booking ends with the last slot of its run
+    due = (
+        select(Appointment.id)
+        .where(Appointment.status == "CONFIRMED", Appointment.end_at <= now)
+        .order_by(Appointment.id.asc())
+        .limit(batch_size)
+    )
+    changed = db.execute(
+        update(Appointment)
+        .where(Appointment.id.in_(due.scalar_subquery()), Appointment.status == "CONFIRMED")
+        .values(status=policy)
+        .returning(Appointment.doctor_id, Appointment.patient_user_id, Appointment.start_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not changed:
+        return 0, 0
+
+    doctor_users = dict(
+        db.query(DoctorProfile.id, DoctorProfile.user_id)
+        .filter(DoctorProfile.id.in_({r.doctor_id for r in changed}))
+        .all()
+    )
+    messages = []
+    for r in changed:
+        schedule_events.touch(db, r.doctor_id, r.start_at)
+        messages.append((r.patient_user_id, MESSAGES[policy]))
+        if r.doctor_id in doctor_users:
+            messages.append((doctor_users[r.doctor_id], MESSAGES[policy]))
+    notify_bulk(db, messages)
+    return len(changed), len(messages)
+
+
+def sweep_past_appointments(
+    db: Session,
+    now: Optional[datetime] = None,
+    policy: Optional[str] = None,
+    batch_size: Optional[int] = None,
+) -> dict:
+    # CONFIRMED appointments whose slot has ended become COMPLETED or NO_SHOW, one short
+    # transaction per batch so the sweep never holds locks across the whole backlog
+    now = now or datetime.utcnow()
+    policy = policy or settings.past_appointment_policy
+    batch_size = batch_size or settings.sweep_batch_size
+    started = time.monotonic()
+
+    metrics = {"policy": policy, "batches": 0, "transitioned": 0, "notifications": 0}
+    while True:
+        n, sent = sweep_batch(db, now, policy, batch_size)
+        db.commit()
+        if n:
+            metrics["batches"] += 1
+            metrics["transitioned"] += n
+            metrics["notifications"] += sent
+        if n < batch_size:
+            break
+
+    metrics["seconds"] = round(time.monotonic() - started, 3)
+    logger.info("swept past appointments: %s", metrics)
+    return metrics
+
+
+def run_sweeper() -> dict:
+    db = SessionLocal()
+    try:
+        return sweep_past_appointments(db)
+    finally:
+        db.close()
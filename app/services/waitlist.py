@@ -0,0 +1,250 @@
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.appointment_slot import AppointmentSlot
+from app.models.waitlist import WaitlistEntry
+from app.services.booking import claim_slot, patient_has_overlap, release_slot
+from app.services.notifications import notify_bulk
+
+logger = logging.getLogger(__name__)
+
+# In-process index of each doctor's WAITING entries, so a freed slot finds its entry in
+# O(log n): entries sorted by window_start plus a segment tree of max(window_end). The
+# first entry in that order with window_end >= slot end is the only one worth checking,
+# because if its window starts after the slot, so does every later one.
+#
+# Entries only ever leave WAITING and new ones get higher ids, so an index stays current
+# while the doctor's max entry id is unchanged (checked with one indexed lookup per match).
+# Newer entries are loaded by id and kept in a short pending list scanned linearly; past
+# PENDING_LIMIT they are merged into a fresh tree in memory, O(n) once per PENDING_LIMIT joins.
+# Entries that left WAITING in another process are caught by the conditional UPDATE that
+# makes the offer, and dropped from the index then.
+
+_EMPTY = datetime.min
+
+PENDING_LIMIT = 64
+
+
+class DoctorWaitlistIndex:
+    __slots__ = ("ids", "starts", "max_id", "pending", "_pos", "_size", "_tree")
+
+    def __init__(self, rows, max_id: int):
+        # rows: (id, window_start, window_end) ordered by window_start, id
+        self.ids = [r[0] for r in rows]
+        self.starts = [r[1] for r in rows]
+        self.max_id = max_id
+        self.pending: list = []
+        self._pos = {r[0]: i for i, r in enumerate(rows)}
+
+        size = 1
+        while size < len(rows):
+            size *= 2
+        self._size = size
+        self._tree = [_EMPTY] * (2 * size)
+        for i, r in enumerate(rows):
+            self._tree[size + i] = r[2]
+        for n in range(size - 1, 0, -1):
+            self._tree[n] = max(self._tree[2 * n], self._tree[2 * n + 1])
+
+    def __len__(self) -> int:
+        return len(self._pos) + len(self.pending)
+
+    def add(self, rows, max_id: int) -> None:
+        # entries newer than the tree, (id, window_start, window_end) in any order
+        self.pending.extend(rows)
+        self.max_id = max_id
+
+    def merged(self) -> "DoctorWaitlistIndex":
+        # a new index holding the live tree entries and the pending ones; the tree is already
+        # in order, so only the pending entries are sorted
+        live = [(self.ids[i], self.starts[i], self._tree[self._size + i]) for i in sorted(self._pos.values())]
+        pending = sorted(self.pending, key=lambda r: (r[1], r[0]))
+        return DoctorWaitlistIndex(list(heapq.merge(live, pending, key=lambda r: (r[1], r[0]))), self.max_id)
+
+    def remove(self, entry_id: int) -> None:
+        i = self._pos.pop(entry_id, None)
+        if i is None:
+            self.pending = [r for r in self.pending if r[0] != entry_id]
+            return
+        n = self._size + i
+        self._tree[n] = _EMPTY
+        n //= 2
+        while n:
+            self._tree[n] = max(self._tree[2 * n], self._tree[2 * n + 1])
+            n //= 2
+
+    def _leftmost(self, node: int, nl: int, nr: int, lo: int, end: datetime) -> int:
+        # smallest position >= lo whose window_end >= end, or -1
+        if nr <= lo or self._tree[node] < end:
+            return -1
+        if nr - nl == 1:
+            return nl
+        mid = (nl + nr) // 2
+        i = self._leftmost(2 * node, nl, mid, lo, end)
+        return i if i >= 0 else self._leftmost(2 * node + 1, mid, nr, lo, end)
+
+    def first_fit(self, start: datetime, end: datetime, lo: int = 0) -> Optional[tuple[int, int]]:
+        # (position, entry id) of the first entry from position lo whose window holds [start, end)
+        i = self._leftmost(1, 0, self._size, lo, end)
+        if i < 0 or self.starts[i] > start:
+            return None
+        return i, self.ids[i]
+
+    def _tree_fits(self, start: datetime, end: datetime):
+        lo = 0
+        while (hit := self.first_fit(start, end, lo)) is not None:
+            lo = hit[0] + 1
+            yield self.starts[hit[0]], hit[1]
+
+    def candidates(self, start: datetime, end: datetime):
+        # ids of the entries whose window holds [start, end), by window_start then id
+        pending = sorted((r[1], r[0]) for r in self.pending if r[1] <= start and r[2] >= end)
+        for _, entry_id in heapq.merge(self._tree_fits(start, end), pending):
+            yield entry_id
+
+
+class WaitlistIndexRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: dict[int, DoctorWaitlistIndex] = {}
+
+    def get(self, db: Session, doctor_id: int) -> DoctorWaitlistIndex:
+        max_id = db.query(func.max(WaitlistEntry.id)).filter(WaitlistEntry.doctor_id == doctor_id).scalar() or 0
+        idx = self._indexes.get(doctor_id)
+        if idx is not None and idx.max_id == max_id:
+            return idx
+
+        if idx is not None:
+            rows = db.execute(
+                select(WaitlistEntry.id, WaitlistEntry.window_start, WaitlistEntry.window_end)
+                .where(WaitlistEntry.doctor_id == doctor_id, WaitlistEntry.id > idx.max_id, WaitlistEntry.status == "WAITING")
+            ).all()
+            with self._lock:
+                idx.add(rows, max_id)
+                if len(idx.pending) > PENDING_LIMIT:
+                    idx = self._indexes[doctor_id] = idx.merged()
+            return idx
+
+        rows = db.execute(
+            select(WaitlistEntry.id, WaitlistEntry.window_start, WaitlistEntry.window_end)
+            .where(WaitlistEntry.doctor_id == doctor_id, WaitlistEntry.status == "WAITING")
+            .order_by(WaitlistEntry.window_start.asc(), WaitlistEntry.id.asc())
+        ).all()
+        idx = DoctorWaitlistIndex(rows, max_id)
+        with self._lock:
+            self._indexes[doctor_id] = idx
+        return idx
+
+    def remove(self, doctor_id: int, entry_id: int) -> None:
+        with self._lock:
+            idx = self._indexes.get(doctor_id)
+            if idx is not None:
+                idx.remove(entry_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+
+
+waitlist_index = WaitlistIndexRegistry()
+
+
+def offer_slot(db: Session, slot_id: int, now: Optional[datetime] = None) -> Optional[int]:
+    # hold a just-freed slot for the first waiting patient whose window contains it; part of
+    # the caller's transaction, so the slot is never visibly free in between
+    now = now or datetime.utcnow()
+    db.flush()
+    slot = db.get(AppointmentSlot, slot_id, populate_existing=True)
+    if slot is None or slot.is_available != 1 or slot.start_at <= now:
+        return None
+
+    idx = waitlist_index.get(db, slot.doctor_id)
+    for entry_id in idx.candidates(slot.start_at, slot.end_at):
+        entry = db.get(WaitlistEntry, entry_id)
+        if entry is None or entry.status != "WAITING":
+            waitlist_index.remove(slot.doctor_id, entry_id)
+            continue
+        if patient_has_overlap(db, entry.patient_user_id, slot.start_at, slot.end_at):
+            continue
+
+        if not claim_slot(db, slot):
+            return None
+        hold_until = now + timedelta(minutes=settings.waitlist_hold_minutes)
+        offered = (
+            db.query(WaitlistEntry)
+            .filter(WaitlistEntry.id == entry_id, WaitlistEntry.status == "WAITING")
+            .update({"status": "OFFERED", "slot_id": slot.id, "hold_expires_at": hold_until})
+        )
+        waitlist_index.remove(slot.doctor_id, entry_id)
+        if not offered:
+            release_slot(db, slot.id)
+            continue
+
+        notify_bulk(db, [(
+            entry.patient_user_id,
+            f"A slot on {slot.start_at:%Y-%m-%d %H:%M} from your waitlist is held for you until {hold_until:%H:%M}",
+        )])
+        return entry_id
+    return None
+
+
+def release_hold(db: Session, entry_id: int, status: str, now: Optional[datetime] = None, reoffer: bool = True) -> bool:
+    # ends an offer (DECLINED / EXPIRED / CANCELED), frees its slot and offers it to the next
+    # entry; reoffer=False when the slot itself is going away
+    now = now or datetime.utcnow()
+    row = db.execute(
+        update(WaitlistEntry)
+        .where(WaitlistEntry.id == entry_id, WaitlistEntry.status == "OFFERED")
+        .values(status=status, hold_expires_at=None)
+        .returning(WaitlistEntry.slot_id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        return False
+
+    release_slot(db, row.slot_id)
+    if reoffer:
+        offer_slot(db, row.slot_id, now)
+    return True
+
+
+def expire_waitlist(db: Session, now: Optional[datetime] = None) -> dict:
+    now = now or datetime.utcnow()
+    held = db.scalars(
+        select(WaitlistEntry.id)
+        .where(WaitlistEntry.status == "OFFERED", WaitlistEntry.hold_expires_at <= now)
+        .order_by(WaitlistEntry.hold_expires_at.asc())
+    ).all()
+    holds = 0
+    for entry_id in held:
+        holds += release_hold(db, entry_id, "EXPIRED", now)
+        db.commit()
+
+    # removed from the in-process indexes lazily, when a match runs into them
+    windows = (
+        db.query(WaitlistEntry)
+        .filter(WaitlistEntry.status == "WAITING", WaitlistEntry.window_end <= now)
+        .update({"status": "EXPIRED"}, synchronize_session=False)
+    )
+    db.commit()
+
+    metrics = {"holds_expired": holds, "entries_expired": windows}
+    if holds or windows:
+        logger.info("expired waitlist: %s", metrics)
+    return metrics
+
+
+def run_waitlist_expiry() -> dict:
+    db = SessionLocal()
+    try:
+        return expire_waitlist(db)
+    finally:
+        db.close()
@@ -11,7 +11,8 @@ from app.seed import seed_specialties
 
 
 def run_auto_seed():
-    if os.getenv("AUTO_SEED", "1") in ("0", "false", "False", "no", "NO"):
+    # opt-in: the seed creates a well-known admin account
+    if os.getenv("AUTO_SEED", "0") in ("0", "false", "False", "no", "NO"):
         return
 
     db: Session = SessionLocal()
@@ -0,0 +1,167 @@
+"""
+Benchmark: slot interval overlap queries on SQLite, B-tree indexes vs R*Tree.
+
+Builds a throwaway database with the appointment_slots schema and indexes the
+app uses, fills it with back-to-back slots for many doctors, then times the
+overlap probe used by POST /doctor/slots, an overlap window query and the
+bounded public listing (start_at in [from, to), earliest first, LIMIT) through
+both plans.
+
+    python benchmarks/slot_overlap.py                      # 10M slots
+    python benchmarks/slot_overlap.py --slots 1000000 --doctors 500
+"""
+import argparse
+import calendar
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.slot_rtree import CREATE_STATEMENTS  # noqa: E402
+
+BASE = datetime(2024, 1, 1)
+SLOT = timedelta(minutes=30)
+
+BTREE_OVERLAP = """
+    SELECT id FROM appointment_slots
+    WHERE doctor_id = ? AND start_at < ? AND end_at > ? LIMIT 1
+"""
+RTREE_OVERLAP = """
+    SELECT s.id FROM appointment_slots_rtree r JOIN appointment_slots s ON s.id = r.id
+    WHERE r.doctor_min <= ? AND r.doctor_max >= ? AND r.start_epoch <= ? AND r.end_epoch >= ?
+      AND s.start_at < ? AND s.end_at > ? LIMIT 1
+"""
+BTREE_WINDOW = """
+    SELECT id FROM appointment_slots
+    WHERE doctor_id = ? AND start_at < ? AND end_at > ? AND is_available = 1
+    ORDER BY start_at
+"""
+RTREE_WINDOW = """
+    SELECT s.id FROM appointment_slots_rtree r JOIN appointment_slots s ON s.id = r.id
+    WHERE r.doctor_min <= ? AND r.doctor_max >= ? AND r.start_epoch <= ? AND r.end_epoch >= ?
+      AND s.start_at < ? AND s.end_at > ? AND s.is_available = 1
+    ORDER BY s.start_at
+"""
+
+# GET /doctors/{id}/slots: served by ix_appointment_slots_doctor_available_start
+BTREE_LISTING = """
+    SELECT id FROM appointment_slots
+    WHERE doctor_id = ? AND is_available = 1 AND start_at >= ? AND start_at < ?
+    ORDER BY start_at LIMIT ?
+"""
+RTREE_LISTING = """
+    SELECT s.id FROM appointment_slots_rtree r JOIN appointment_slots s ON s.id = r.id
+    WHERE r.doctor_min <= ? AND r.doctor_max >= ? AND r.start_epoch <= ? AND r.end_epoch >= ?
+      AND s.doctor_id = ? AND s.is_available = 1 AND s.start_at >= ? AND s.start_at < ?
+    ORDER BY s.start_at LIMIT ?
+"""
+
+
+def fmt(dt):
+    return dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def epoch(dt):
+    return calendar.timegm(dt.timetuple())
+
+
+def build(path, slots, doctors):
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        PRAGMA journal_mode = OFF;
+        PRAGMA synchronous = OFF;
+        CREATE TABLE appointment_slots (
+            id INTEGER PRIMARY KEY,
+            doctor_id INTEGER NOT NULL,
+            start_at DATETIME NOT NULL,
+            end_at DATETIME NOT NULL,
+            is_available INTEGER NOT NULL
+        );
+    """)
+    per_doctor = slots // doctors
+
+    def rows():
+        for d in range(1, doctors + 1):
+            t = BASE
+            for _ in range(per_doctor):
+                yield d, fmt(t), fmt(t + SLOT), random.randint(0, 1)
+                t += SLOT
+
+    conn.executemany(
+        "INSERT INTO appointment_slots (doctor_id, start_at, end_at, is_available) VALUES (?, ?, ?, ?)", rows()
+    )
+    conn.executescript("""
+        CREATE INDEX ix_appointment_slots_doctor_id ON appointment_slots (doctor_id);
+        CREATE INDEX ix_appointment_slots_start_at ON appointment_slots (start_at);
+        CREATE INDEX ix_appointment_slots_end_at ON appointment_slots (end_at);
+        CREATE INDEX ix_appointment_slots_doctor_available_start
+            ON appointment_slots (doctor_id, is_available, start_at);
+    """)
+    for stmt in CREATE_STATEMENTS:
+        conn.execute(stmt)
+    conn.commit()
+    conn.execute("ANALYZE")
+    return conn, per_doctor
+
+
+def timed(conn, sql, params_list):
+    t0 = time.perf_counter()
+    for params in params_list:
+        conn.execute(sql, params).fetchall()
+    return (time.perf_counter() - t0) / len(params_list) * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--slots", type=int, default=10_000_000)
+    ap.add_argument("--doctors", type=int, default=5_000)
+    ap.add_argument("--queries", type=int, default=2_000)
+    ap.add_argument("--window-days", type=int, default=7)
+    ap.add_argument("--limit", type=int, default=100)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        conn, per_doctor = build(os.path.join(tmp, "bench.db"), args.slots, args.doctors)
+        print(f"built {per_doctor * args.doctors:,} slots for {args.doctors:,} doctors in {time.perf_counter() - t0:.1f}s")
+
+        span = per_doctor * SLOT
+        probes, windows = [], []
+        for _ in range(args.queries):
+            d = random.randint(1, args.doctors)
+            s = BASE + timedelta(minutes=random.randint(0, int(span.total_seconds() // 60)))
+            e = s + timedelta(minutes=45)
+            probes.append((d, s, e))
+            windows.append((d, s, s + timedelta(days=args.window_days)))
+
+        cases = [
+            ("overlap probe", BTREE_OVERLAP, RTREE_OVERLAP, probes),
+            (f"{args.window_days}-day window", BTREE_WINDOW, RTREE_WINDOW, windows),
+        ]
+        for name, btree_sql, rtree_sql, qs in cases:
+            btree_params = [(d, fmt(e), fmt(s)) for d, s, e in qs]
+            rtree_params = [(d, d, epoch(e), epoch(s), fmt(e), fmt(s)) for d, s, e in qs]
+
+            print(f"\n{name}")
+            for label, sql, params in (("b-tree", btree_sql, btree_params), ("r*tree", rtree_sql, rtree_params)):
+                plan = "; ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params[0]))
+                print(f"  {label}: {timed(conn, sql, params):9.1f} us/query   [{plan}]")
+
+        print(f"\n{args.window_days}-day listing, limit {args.limit}")
+        listing = (
+            ("b-tree", BTREE_LISTING, [(d, fmt(s), fmt(e), args.limit) for d, s, e in windows]),
+            ("r*tree", RTREE_LISTING, [(d, d, epoch(e), epoch(s), d, fmt(s), fmt(e), args.limit) for d, s, e in windows]),
+        )
+        for label, sql, params in listing:
+            plan = "; ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params[0]))
+            print(f"  {label}: {timed(conn, sql, params):9.1f} us/query   [{plan}]")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
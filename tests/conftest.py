@@ -1,6 +1,13 @@
 """
 Pytest configuration and fixtures for the Doctor-Appointment tests.
 """
+import os
+
+# background threads and the startup seed would run against the real database, not the test one
+os.environ.setdefault("SCHEDULER_ENABLED", "0")
+os.environ.setdefault("JOB_WORKERS", "0")
+os.environ.setdefault("AUTO_SEED", "0")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -19,6 +26,10 @@ from app.models.review import Review
 from app.models.favorite import Favorite
 from app.models.notification import Notification
 from app.core.security import hash_password, create_access_token
+from app.services.availability_index import availability_index
+from app.services.slot_calendar import calendar_cache
+from app.services.agenda import agenda_cache
+from app.services.waitlist import waitlist_index
 
 
 # Create in-memory SQLite database for testing
@@ -35,6 +46,10 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database session for each test."""
+    availability_index.clear()
+    calendar_cache.clear()
+    agenda_cache.clear()
+    waitlist_index.clear()
     Base.metadata.create_all(bind=engine)
     session = TestingSessionLocal()
     try:
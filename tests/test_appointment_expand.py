@@ -0,0 +1,94 @@
+"""
+Unit tests for ?expand=slot,doctor on appointment listings.
+"""
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+from tests.conftest import engine
+
+
+def _add_appointments(db_session, doctor_profile, test_user, n, status="PENDING"):
+    base = datetime.utcnow().replace(microsecond=0) + timedelta(days=2)
+    appts = []
+    for i in range(n):
+        slot = AppointmentSlot(
+            doctor_id=doctor_profile.id,
+            start_at=base + timedelta(hours=i),
+            end_at=base + timedelta(hours=i, minutes=30),
+            is_available=0,
+        )
+        db_session.add(slot)
+        db_session.flush()
+        appts.append(Appointment(doctor_id=doctor_profile.id, patient_user_id=test_user.id, slot_id=slot.id, status=status, notes=""))
+    db_session.add_all(appts)
+    db_session.commit()
+    return appts
+
+
+class TestExpand:
+    """Tests for embedding slot and doctor in appointment responses."""
+
+    def test_mine_expanded(self, client, auth_headers, appointment, appointment_slot, doctor_profile):
+        """Test slot and doctor are embedded on request."""
+        response = client.get("/appointments/mine?expand=slot,doctor", headers=auth_headers)
+        assert response.status_code == 200
+        item = response.json()[0]
+        assert item["slot"] == {
+            "id": appointment_slot.id,
+            "start_at": appointment_slot.start_at.isoformat(),
+            "end_at": appointment_slot.end_at.isoformat(),
+        }
+        assert item["doctor"]["id"] == doctor_profile.id
+        assert item["doctor"]["full_name"] == doctor_profile.full_name
+
+    def test_not_expanded_by_default(self, client, auth_headers, appointment):
+        """Test the plain listing leaves slot and doctor empty."""
+        item = client.get("/appointments/mine", headers=auth_headers).json()[0]
+        assert item["id"] == appointment.id
+        assert item["slot"] is None and item["doctor"] is None
+
+    def test_unknown_field(self, client, auth_headers):
+        """Test unknown expand fields are rejected."""
+        response = client.get("/appointments/mine?expand=patient", headers=auth_headers)
+        assert response.status_code == 422
+        assert "patient" in response.json()["detail"]
+
+    def test_history_expanded(self, client, auth_headers, appointment, doctor_profile, db_session):
+        """Test history embeds the doctor."""
+        appointment.status = "COMPLETED"
+        db_session.commit()
+
+        item = client.get("/appointments/history?expand=doctor", headers=auth_headers).json()[0]
+        assert item["doctor"]["clinic_name"] == doctor_profile.clinic_name
+        assert item["slot"] is None
+
+    def test_doctor_listings_expanded(self, client, doctor_auth_headers, appointment, appointment_slot, db_session):
+        """Test the doctor's received and upcoming lists embed the slot."""
+        appointment.status = "CONFIRMED"
+        db_session.commit()
+
+        for url in ("/doctor/appointments?expand=slot", "/doctor/appointments/upcoming?expand=slot"):
+            item = client.get(url, headers=doctor_auth_headers).json()[0]
+            assert item["slot"]["start_at"] == appointment_slot.start_at.isoformat()
+
+    def test_single_query_regardless_of_rows(self, client, auth_headers, doctor_profile, test_user, db_session):
+        """Test the expanded listing issues one appointments query however many rows it returns."""
+        _add_appointments(db_session, doctor_profile, test_user, 12)
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if "FROM appointments" in statement or "JOIN appointments" in statement:
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = client.get("/appointments/mine?expand=slot,doctor", headers=auth_headers)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert len(response.json()) == 12
+        assert len(statements) == 1
+        assert "doctor_profiles" in statements[0]
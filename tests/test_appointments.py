@@ -256,3 +256,540 @@ class TestRescheduleAppointment:
         )
         assert response.status_code == 409
         assert "not available" in response.json()["detail"]
+
+
+class TestBookNextAvailable:
+    """Tests for claiming the earliest free slot."""
+
+    def _add_slots(self, db_session, doctor_profile, offsets_hours):
+        from app.models.appointment_slot import AppointmentSlot
+        from datetime import datetime, timedelta
+
+        base = datetime.utcnow() + timedelta(days=1)
+        slots = [
+            AppointmentSlot(
+                doctor_id=doctor_profile.id,
+                start_at=base + timedelta(hours=h),
+                end_at=base + timedelta(hours=h, minutes=30),
+                is_available=1,
+            )
+            for h in offsets_hours
+        ]
+        db_session.add_all(slots)
+        db_session.commit()
+        return slots
+
+    def test_books_earliest_slot_for_doctor(self, client, auth_headers, doctor_profile, db_session):
+        """Test the earliest free slot of the doctor is claimed."""
+        slots = self._add_slots(db_session, doctor_profile, [5, 2, 8])
+
+        response = client.post("/appointments/next-available", json={"doctor_id": doctor_profile.id}, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["slot_id"] == slots[1].id
+        assert data["status"] == "PENDING"
+
+        db_session.refresh(slots[1])
+        assert slots[1].is_available == 0
+
+    def test_skips_claimed_slots(self, client, auth_headers, doctor_profile, db_session):
+        """Test consecutive calls claim consecutive slots instead of failing."""
+        slots = self._add_slots(db_session, doctor_profile, [1, 2])
+
+        first = client.post("/appointments/next-available", json={"doctor_id": doctor_profile.id}, headers=auth_headers)
+        second = client.post("/appointments/next-available", json={"doctor_id": doctor_profile.id}, headers=auth_headers)
+        third = client.post("/appointments/next-available", json={"doctor_id": doctor_profile.id}, headers=auth_headers)
+
+        assert [first.json()["slot_id"], second.json()["slot_id"]] == [slots[0].id, slots[1].id]
+        assert third.status_code == 404
+
+    def test_books_by_specialty(self, client, auth_headers, doctor_profile, specialty, db_session):
+        """Test booking the earliest slot across a specialty."""
+        slots = self._add_slots(db_session, doctor_profile, [3])
+
+        response = client.post("/appointments/next-available", json={"specialty_id": specialty.id}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["slot_id"] == slots[0].id
+        assert response.json()["doctor_id"] == doctor_profile.id
+
+    def test_respects_window(self, client, auth_headers, doctor_profile, db_session):
+        """Test slots outside the window are not claimed."""
+        from datetime import timedelta
+
+        slots = self._add_slots(db_session, doctor_profile, [1, 30])
+
+        payload = {
+            "doctor_id": doctor_profile.id,
+            "from": (slots[0].start_at + timedelta(minutes=1)).isoformat(),
+        }
+        response = client.post("/appointments/next-available", json=payload, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["slot_id"] == slots[1].id
+
+    def test_requires_exactly_one_target(self, client, auth_headers, doctor_profile, specialty):
+        """Test doctor_id and specialty_id are mutually exclusive."""
+        response = client.post("/appointments/next-available", json={}, headers=auth_headers)
+        assert response.status_code == 400
+
+        response = client.post(
+            "/appointments/next-available",
+            json={"doctor_id": doctor_profile.id, "specialty_id": specialty.id},
+            headers=auth_headers,
+        )
+        assert response.status_code == 400
+
+    def test_unknown_doctor(self, client, auth_headers):
+        """Test booking with an unknown doctor."""
+        response = client.post("/appointments/next-available", json={"doctor_id": 9999}, headers=auth_headers)
+        assert response.status_code == 404
+
+
+class TestPatientOverlap:
+    """Tests for the patient double-booking guard."""
+
+    def _other_doctor_slot(self, db_session, specialty, start, minutes=30):
+        from datetime import timedelta
+        from app.models.user import User
+        from app.models.doctor_profile import DoctorProfile
+        from app.models.appointment_slot import AppointmentSlot
+
+        user = User(email="other@example.com", username="otherdoc", password_hash="x", role="DOCTOR")
+        db_session.add(user)
+        db_session.commit()
+        prof = DoctorProfile(user_id=user.id, full_name="Dr. Other", bio="", clinic_name="", address="", phone="", specialty_id=specialty.id, is_active=1)
+        db_session.add(prof)
+        db_session.commit()
+        slot = AppointmentSlot(doctor_id=prof.id, start_at=start, end_at=start + timedelta(minutes=minutes), is_available=1)
+        db_session.add(slot)
+        db_session.commit()
+        return slot
+
+    def _book(self, client, auth_headers, slot):
+        return client.post("/appointments", json={"doctor_id": slot.doctor_id, "slot_id": slot.id}, headers=auth_headers)
+
+    def test_times_copied_from_slot(self, appointment, appointment_slot):
+        """Test appointments carry their slot's interval."""
+        assert appointment.start_at == appointment_slot.start_at
+        assert appointment.end_at == appointment_slot.end_at
+
+    def test_overlapping_booking_rejected(self, client, auth_headers, appointment_slot, specialty, db_session):
+        """Test booking a second doctor at an overlapping time fails."""
+        from datetime import timedelta
+
+        assert self._book(client, auth_headers, appointment_slot).status_code == 200
+        other = self._other_doctor_slot(db_session, specialty, appointment_slot.start_at + timedelta(minutes=15))
+
+        response = self._book(client, auth_headers, other)
+        assert response.status_code == 409
+        assert "already have an appointment" in response.json()["detail"]
+        db_session.refresh(other)
+        assert other.is_available == 1
+
+    def test_adjacent_and_canceled_allowed(self, client, auth_headers, appointment_slot, specialty, db_session):
+        """Test back-to-back bookings and slots freed by a cancellation are accepted."""
+        first = self._book(client, auth_headers, appointment_slot).json()
+        other = self._other_doctor_slot(db_session, specialty, appointment_slot.start_at)
+        client.post(f"/appointments/{first['id']}/cancel", headers=auth_headers)
+
+        assert self._book(client, auth_headers, other).status_code == 200
+
+    def test_reschedule_into_overlap_rejected(self, client, auth_headers, appointment_slot, doctor_profile, specialty, db_session):
+        """Test rescheduling onto a time the patient is already booked fails."""
+        from datetime import timedelta
+        from app.models.appointment_slot import AppointmentSlot
+
+        later = AppointmentSlot(
+            doctor_id=doctor_profile.id,
+            start_at=appointment_slot.start_at + timedelta(hours=3),
+            end_at=appointment_slot.start_at + timedelta(hours=4),
+            is_available=1,
+        )
+        db_session.add(later)
+        db_session.commit()
+        appt = self._book(client, auth_headers, later).json()
+        other = self._other_doctor_slot(db_session, specialty, appointment_slot.start_at + timedelta(hours=3, minutes=30))
+        moving = self._book(client, auth_headers, appointment_slot).json()
+
+        response = client.post(f"/appointments/{moving['id']}/reschedule?new_slot_id={other.id}", headers=auth_headers)
+        assert response.status_code == 409
+
+        # overlapping only the appointment being moved is fine
+        response = client.post(f"/appointments/{appt['id']}/reschedule?new_slot_id={other.id}", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["start_at"] == other.start_at.isoformat()
+
+    def test_next_available_skips_overlapping_slots(self, client, auth_headers, appointment_slot, doctor_profile, specialty, db_session):
+        """Test next-available passes over slots that clash with the patient's bookings."""
+        from datetime import timedelta
+        from app.models.appointment_slot import AppointmentSlot
+
+        self._book(client, auth_headers, appointment_slot)
+        other = self._other_doctor_slot(db_session, specialty, appointment_slot.start_at)
+        later = AppointmentSlot(
+            doctor_id=other.doctor_id,
+            start_at=appointment_slot.start_at + timedelta(hours=2),
+            end_at=appointment_slot.start_at + timedelta(hours=3),
+            is_available=1,
+        )
+        db_session.add(later)
+        db_session.commit()
+
+        response = client.post("/appointments/next-available", json={"doctor_id": other.doctor_id}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["slot_id"] == later.id
+
+    def test_claim_rechecks_overlap(self, client, auth_headers, appointment_slot, specialty, db_session, monkeypatch):
+        """Test a booking that raced past the pre-check is still refused by the claim itself."""
+        from datetime import timedelta
+        from app.models.appointment_slot import AppointmentSlot
+        import app.routers.appointments as appointments_router
+
+        assert self._book(client, auth_headers, appointment_slot).status_code == 200
+        other = self._other_doctor_slot(db_session, specialty, appointment_slot.start_at + timedelta(minutes=15))
+        tail = AppointmentSlot(doctor_id=other.doctor_id, start_at=other.end_at, end_at=other.end_at + timedelta(minutes=30), is_available=1)
+        db_session.add(tail)
+        db_session.commit()
+        # as if the pre-check had run before the first booking committed
+        monkeypatch.setattr(appointments_router, "patient_has_overlap", lambda *a, **kw: False)
+
+        assert self._book(client, auth_headers, other).status_code == 409
+        response = client.post(
+            "/appointments",
+            json={"doctor_id": other.doctor_id, "slot_id": other.id, "duration_minutes": 60},
+            headers=auth_headers,
+        )
+        assert response.status_code == 409
+        for slot in (other, tail):
+            db_session.refresh(slot)
+            assert (slot.booked_count, slot.is_available) == (0, 1)
+
+    def test_probe_uses_patient_index(self, db_session, test_user):
+        """Test the overlap probe is a range scan of the patient interval index."""
+        from datetime import datetime, timedelta
+        from sqlalchemy import text
+        from app.services.booking import _patient_overlap
+
+        start = datetime(2030, 1, 1, 9)
+        q = db_session.query(_patient_overlap(test_user.id, start, start + timedelta(minutes=30)))
+        plan = " ".join(
+            row[-1] for row in db_session.execute(
+                text("EXPLAIN QUERY PLAN " + str(q.statement.compile(compile_kwargs={"literal_binds": True})))
+            )
+        )
+        assert "ix_appointments_patient_end_start" in plan
+
+
+class TestAppointmentSeries:
+    """Tests for booking a recurring series in one request."""
+
+    def _weekly_slots(self, db_session, doctor_profile, weeks, skip=()):
+        from app.models.appointment_slot import AppointmentSlot
+        from datetime import datetime, timedelta
+
+        first = (datetime.utcnow() + timedelta(days=2)).replace(hour=9, minute=0, second=0, microsecond=0)
+        for i in range(weeks):
+            if i in skip:
+                continue
+            start = first + timedelta(weeks=i)
+            db_session.add(AppointmentSlot(doctor_id=doctor_profile.id, start_at=start, end_at=start + timedelta(minutes=45), is_available=1))
+        db_session.commit()
+        return first
+
+    def _post(self, client, headers, doctor_profile, first, count, mode="all"):
+        return client.post(
+            "/appointments/series",
+            json={"doctor_id": doctor_profile.id, "start_at": first.isoformat(), "count": count, "mode": mode},
+            headers=headers,
+        )
+
+    def test_books_whole_series(self, client, auth_headers, doctor_profile, test_user, db_session):
+        """Test every weekly occurrence is booked and its slot claimed."""
+        from app.models.appointment_slot import AppointmentSlot
+        from app.models.notification import Notification
+
+        first = self._weekly_slots(db_session, doctor_profile, 10)
+
+        response = self._post(client, auth_headers, doctor_profile, first, 10)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["missing"] == []
+        assert len(data["appointments"]) == 10
+        assert all(a["status"] == "PENDING" and a["end_at"] for a in data["appointments"])
+        assert db_session.query(AppointmentSlot).filter(AppointmentSlot.is_available == 1).count() == 0
+        assert db_session.query(Notification).filter(Notification.user_id == test_user.id).count() == 1
+
+    def test_all_or_nothing(self, client, auth_headers, doctor_profile, db_session):
+        """Test a missing occurrence books nothing and is reported."""
+        from app.models.appointment import Appointment
+        from app.models.appointment_slot import AppointmentSlot
+        from datetime import timedelta
+
+        first = self._weekly_slots(db_session, doctor_profile, 4, skip={2})
+
+        response = self._post(client, auth_headers, doctor_profile, first, 4)
+        assert response.status_code == 409
+        assert response.json()["detail"]["missing"] == [(first + timedelta(weeks=2)).isoformat()]
+        assert db_session.query(Appointment).count() == 0
+        assert db_session.query(AppointmentSlot).filter(AppointmentSlot.is_available == 1).count() == 3
+
+    def test_best_effort_reports_missing(self, client, auth_headers, doctor_profile, db_session):
+        """Test best-effort mode books the free occurrences and lists the rest."""
+        from datetime import datetime, timedelta
+
+        first = self._weekly_slots(db_session, doctor_profile, 4, skip={1})
+
+        response = self._post(client, auth_headers, doctor_profile, first, 4, mode="best_effort")
+        assert response.status_code == 200
+        data = response.json()
+        assert [datetime.fromisoformat(a["start_at"]) for a in data["appointments"]] == [first + timedelta(weeks=w) for w in (0, 2, 3)]
+        assert data["missing"] == [(first + timedelta(weeks=1)).isoformat()]
+
+    def test_skips_patient_clash(self, client, auth_headers, doctor_profile, db_session):
+        """Test an occurrence clashing with the patient's bookings counts as missing."""
+        first = self._weekly_slots(db_session, doctor_profile, 3)
+        single = self._post(client, auth_headers, doctor_profile, first, 2)
+        assert single.status_code == 200
+
+        response = self._post(client, auth_headers, doctor_profile, first, 3, mode="best_effort")
+        assert response.status_code == 200
+        assert len(response.json()["appointments"]) == 1
+
+    def test_validation(self, client, auth_headers, doctor_profile):
+        """Test past starts, unknown doctors and bad counts are rejected."""
+        from datetime import datetime, timedelta
+
+        past = datetime.utcnow() - timedelta(days=1)
+        assert self._post(client, auth_headers, doctor_profile, past, 3).status_code == 400
+        future = datetime.utcnow() + timedelta(days=1)
+        assert self._post(client, auth_headers, doctor_profile, future, 1).status_code == 422
+        response = client.post("/appointments/series", json={"doctor_id": 999, "start_at": future.isoformat(), "count": 3}, headers=auth_headers)
+        assert response.status_code == 404
+
+
+class TestSlotCapacity:
+    """Tests for group slots booked by several patients."""
+
+    def _patients(self, db_session, n):
+        from app.models.user import User
+        from app.core.security import hash_password, create_access_token
+
+        headers = []
+        for i in range(n):
+            user = User(email=f"group{i}@example.com", username=f"group{i}", password_hash=hash_password("pw123456"), role="USER")
+            db_session.add(user)
+            db_session.commit()
+            headers.append({"Authorization": f"Bearer {create_access_token(str(user.id))}"})
+        return headers
+
+    def _group_slot(self, client, doctor_auth_headers, capacity):
+        from datetime import datetime, timedelta
+
+        start = (datetime.utcnow() + timedelta(days=3)).replace(hour=10, minute=0, second=0, microsecond=0)
+        response = client.post("/doctor/slots", json={
+            "start_at": start.isoformat(), "end_at": (start + timedelta(hours=1)).isoformat(), "capacity": capacity,
+        }, headers=doctor_auth_headers)
+        assert response.status_code == 200
+        return response.json()
+
+    def _book(self, client, headers, slot):
+        return client.post("/appointments", json={"doctor_id": slot["doctor_id"], "slot_id": slot["id"]}, headers=headers)
+
+    def test_fills_up_to_capacity(self, client, doctor_auth_headers, doctor_profile, db_session):
+        """Test a group slot takes one booking per place, then refuses."""
+        from app.models.appointment_slot import AppointmentSlot
+
+        slot = self._group_slot(client, doctor_auth_headers, 3)
+        assert (slot["capacity"], slot["booked_count"], slot["is_available"]) == (3, 0, 1)
+        patients = self._patients(db_session, 4)
+
+        for headers in patients[:2]:
+            assert self._book(client, headers, slot).status_code == 200
+        listed = client.get(f"/doctors/{doctor_profile.id}/slots").json()
+        assert [(s["id"], s["booked_count"]) for s in listed] == [(slot["id"], 2)]
+
+        assert self._book(client, patients[2], slot).status_code == 200
+        assert self._book(client, patients[3], slot).status_code == 409
+
+        row = db_session.get(AppointmentSlot, slot["id"])
+        db_session.refresh(row)
+        assert (row.booked_count, row.is_available) == (3, 0)
+        assert client.get(f"/doctors/{doctor_profile.id}/slots").json() == []
+
+    def test_cancel_gives_place_back(self, client, doctor_auth_headers, doctor_profile, db_session):
+        """Test canceling one booking of a full group slot reopens one place."""
+        slot = self._group_slot(client, doctor_auth_headers, 2)
+        patients = self._patients(db_session, 3)
+        booked = [self._book(client, headers, slot).json() for headers in patients[:2]]
+
+        response = client.post(f"/appointments/{booked[0]['id']}/cancel", headers=patients[0])
+        assert response.status_code == 200
+        month = booked[0]["start_at"][:7]
+        days = client.get(f"/doctors/{doctor_profile.id}/calendar", params={"month": month}).json()["days"]
+        assert [(d["available"], d["booked"]) for d in days] == [(1, 1)]
+
+        assert self._book(client, patients[2], slot).status_code == 200
+        assert self._book(client, patients[0], slot).status_code == 409
+
+    def test_single_place_slot_unchanged(self, client, auth_headers, appointment_slot, doctor_profile, db_session):
+        """Test an ordinary slot still closes on its first booking."""
+        assert self._book(client, auth_headers, {"id": appointment_slot.id, "doctor_id": doctor_profile.id}).status_code == 200
+        db_session.refresh(appointment_slot)
+        assert (appointment_slot.capacity, appointment_slot.booked_count, appointment_slot.is_available) == (1, 1, 0)
+
+    def test_reopen_partly_booked_group_slot(self, client, doctor_auth_headers, doctor_profile, db_session):
+        """Test a blocked group slot with free places can be reopened, a full one cannot."""
+        from datetime import datetime, timedelta
+
+        slot = self._group_slot(client, doctor_auth_headers, 2)
+        patients = self._patients(db_session, 2)
+        assert self._book(client, patients[0], slot).status_code == 200
+
+        start = datetime.fromisoformat(slot["start_at"])
+        window = {"from": start.isoformat(), "to": (start + timedelta(hours=1)).isoformat()}
+        client.patch("/doctor/slots/availability", params=window, json={"is_available": 0}, headers=doctor_auth_headers)
+        response = client.patch("/doctor/slots/availability", params=window, json={"is_available": 1}, headers=doctor_auth_headers)
+        assert response.json()["updated"] == 1
+
+        assert self._book(client, patients[1], slot).status_code == 200
+        client.patch("/doctor/slots/availability", params=window, json={"is_available": 0}, headers=doctor_auth_headers)
+        response = client.patch("/doctor/slots/availability", params=window, json={"is_available": 1}, headers=doctor_auth_headers)
+        assert response.json()["updated"] == 0
+
+    def test_cancel_keeps_blocked_slot_closed(self, client, doctor_auth_headers, doctor_profile, db_session):
+        """Test a place freed on a blocked group slot does not reopen it."""
+        from datetime import datetime, timedelta
+        from app.models.appointment_slot import AppointmentSlot
+
+        slot = self._group_slot(client, doctor_auth_headers, 3)
+        patients = self._patients(db_session, 3)
+        booked = [self._book(client, headers, slot).json() for headers in patients[:2]]
+
+        start = datetime.fromisoformat(slot["start_at"])
+        window = {"from": start.isoformat(), "to": (start + timedelta(hours=1)).isoformat()}
+        client.patch("/doctor/slots/availability", params=window, json={"is_available": 0}, headers=doctor_auth_headers)
+        assert client.post(f"/appointments/{booked[0]['id']}/cancel", headers=patients[0]).status_code == 200
+
+        row = db_session.get(AppointmentSlot, slot["id"])
+        db_session.refresh(row)
+        assert (row.booked_count, row.blocked, row.is_available) == (1, 1, 0)
+        assert self._book(client, patients[2], slot).status_code == 409
+
+        response = client.patch("/doctor/slots/availability", params=window, json={"is_available": 1}, headers=doctor_auth_headers)
+        assert response.json()["updated"] == 1
+        assert self._book(client, patients[2], slot).status_code == 200
+
+
+class TestContiguousBooking:
+    """Tests for booking a run of back-to-back slots with duration_minutes."""
+
+    def _day(self, db_session, doctor_profile, count, skip=(), minutes=30):
+        from app.models.appointment_slot import AppointmentSlot
+        from datetime import datetime, timedelta
+
+        first = (datetime.utcnow() + timedelta(days=2)).replace(hour=9, minute=0, second=0, microsecond=0)
+        slots = []
+        for i in range(count):
+            start = first + timedelta(minutes=minutes * i)
+            slot = AppointmentSlot(doctor_id=doctor_profile.id, start_at=start, end_at=start + timedelta(minutes=minutes), is_available=1)
+            if i not in skip:
+                db_session.add(slot)
+            slots.append(slot)
+        db_session.commit()
+        return slots
+
+    def _book(self, client, headers, slot, minutes):
+        return client.post(
+            "/appointments",
+            json={"doctor_id": slot.doctor_id, "slot_id": slot.id, "duration_minutes": minutes},
+            headers=headers,
+        )
+
+    def test_claims_whole_run(self, client, auth_headers, doctor_profile, db_session):
+        """Test a 90 minute booking takes three adjacent 30 minute slots."""
+        slots = self._day(db_session, doctor_profile, 4)
+
+        response = self._book(client, auth_headers, slots[0], 90)
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["slot_id"], data["end_at"]) == (slots[0].id, slots[2].end_at.isoformat())
+
+        db_session.expire_all()
+        assert [s.is_available for s in slots] == [0, 0, 0, 1]
+
+    def test_gap_or_booked_slot_breaks_run(self, client, auth_headers, doctor_profile, db_session):
+        """Test a missing or taken slot inside the run books nothing."""
+        from app.models.appointment import Appointment
+
+        slots = self._day(db_session, doctor_profile, 6, skip={1})
+        assert self._book(client, auth_headers, slots[0], 60).status_code == 409
+
+        slots[4].is_available = 0
+        db_session.commit()
+        response = self._book(client, auth_headers, slots[2], 90)
+        assert response.status_code == 409
+        assert response.json()["detail"] == "No contiguous free slots for this duration"
+
+        db_session.expire_all()
+        assert db_session.query(Appointment).count() == 0
+        assert [slots[i].is_available for i in (0, 2, 3, 5)] == [1, 1, 1, 1]
+
+    def test_run_past_last_slot_rejected(self, client, auth_headers, doctor_profile, db_session):
+        """Test a duration longer than the remaining slots is refused."""
+        slots = self._day(db_session, doctor_profile, 2)
+        assert self._book(client, auth_headers, slots[0], 90).status_code == 409
+
+    def test_cancel_releases_whole_run(self, client, auth_headers, doctor_profile, db_session):
+        """Test canceling a multi-slot booking frees every slot of its run."""
+        slots = self._day(db_session, doctor_profile, 3)
+        appt = self._book(client, auth_headers, slots[0], 90).json()
+
+        assert client.post(f"/appointments/{appt['id']}/cancel", headers=auth_headers).status_code == 200
+        db_session.expire_all()
+        assert [s.is_available for s in slots] == [1, 1, 1]
+
+    def test_run_blocks_patient_overlap(self, client, auth_headers, doctor_profile, db_session):
+        """Test the whole run counts for the patient's double-booking guard."""
+        slots = self._day(db_session, doctor_profile, 3)
+        assert self._book(client, auth_headers, slots[0], 90).status_code == 200
+
+        response = client.post("/appointments", json={"doctor_id": doctor_profile.id, "slot_id": slots[2].id}, headers=auth_headers)
+        assert response.status_code == 409
+        assert response.json()["detail"] == "You already have an appointment at this time"
+
+    def test_reschedule_keeps_run_length(self, client, auth_headers, doctor_profile, db_session):
+        """Test a multi-slot booking moves to a run of the same length."""
+        slots = self._day(db_session, doctor_profile, 5)
+        appt = self._book(client, auth_headers, slots[0], 60).json()
+
+        response = client.post(f"/appointments/{appt['id']}/reschedule?new_slot_id={slots[4].id}", headers=auth_headers)
+        assert response.status_code == 409
+
+        response = client.post(f"/appointments/{appt['id']}/reschedule?new_slot_id={slots[3].id}", headers=auth_headers)
+        assert response.status_code == 200
+        assert (response.json()["start_at"], response.json()["end_at"]) == (slots[3].start_at.isoformat(), slots[4].end_at.isoformat())
+        db_session.expire_all()
+        assert [s.is_available for s in slots] == [1, 1, 1, 0, 0]
+
+    def test_run_slots_cannot_be_deleted(self, client, auth_headers, doctor_auth_headers, doctor_profile, db_session):
+        """Test every slot of a run counts as booked for the doctor's deletes."""
+        from datetime import timedelta
+
+        slots = self._day(db_session, doctor_profile, 5)
+        assert self._book(client, auth_headers, slots[0], 120).status_code == 200
+
+        response = client.delete(f"/doctor/slots/{slots[3].id}", headers=doctor_auth_headers)
+        assert response.status_code == 409
+
+        window = {"from": slots[2].start_at.isoformat(), "to": (slots[4].end_at + timedelta(minutes=1)).isoformat()}
+        response = client.delete("/doctor/slots", params=window, headers=doctor_auth_headers)
+        assert response.json()["deleted"] == 1
+        assert [c["slot_id"] for c in response.json()["conflicts"]] == [slots[2].id, slots[3].id]
+
+    def test_short_duration_books_single_slot(self, client, auth_headers, doctor_profile, db_session):
+        """Test a duration within the slot books just that slot."""
+        slots = self._day(db_session, doctor_profile, 2)
+        response = self._book(client, auth_headers, slots[0], 20)
+        assert response.status_code == 200
+        assert response.json()["end_at"] == slots[0].end_at.isoformat()
+        db_session.expire_all()
+        assert [s.is_available for s in slots] == [0, 1]
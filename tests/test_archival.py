@@ -0,0 +1,97 @@
+"""
+Unit tests for archiving past slots and finished appointments.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+from app.models.archive import AppointmentArchive, AppointmentSlotArchive
+from app.services.archival import archive_expired
+
+
+def _slot(db_session, doctor_profile, days_from_now):
+    start = datetime.utcnow().replace(microsecond=0) + timedelta(days=days_from_now)
+    slot = AppointmentSlot(doctor_id=doctor_profile.id, start_at=start, end_at=start + timedelta(minutes=30), is_available=0)
+    db_session.add(slot)
+    db_session.commit()
+    return slot
+
+
+def _appointment(db_session, doctor_profile, test_user, slot, status):
+    appt = Appointment(doctor_id=doctor_profile.id, patient_user_id=test_user.id, slot_id=slot.id, status=status, notes="")
+    db_session.add(appt)
+    db_session.commit()
+    return appt
+
+
+class TestArchiveExpired:
+    """Tests for the archival job."""
+
+    def test_moves_finished_appointments_and_their_slots(self, db_session, doctor_profile, test_user):
+        """Test old finished appointments and unreferenced past slots move to the archive."""
+        old = [_slot(db_session, doctor_profile, -100 + i) for i in range(3)]
+        done = _appointment(db_session, doctor_profile, test_user, old[0], "COMPLETED")
+        canceled = _appointment(db_session, doctor_profile, test_user, old[1], "CANCELED")
+        stale = _appointment(db_session, doctor_profile, test_user, old[2], "CONFIRMED")
+        recent = _slot(db_session, doctor_profile, -1)
+        _appointment(db_session, doctor_profile, test_user, recent, "COMPLETED")
+        future = _slot(db_session, doctor_profile, 5)
+        newest = _appointment(db_session, doctor_profile, test_user, future, "PENDING")
+        done_id, canceled_id, stale_id, newest_id = done.id, canceled.id, stale.id, newest.id
+        old_ids = [s.id for s in old]
+
+        moved = archive_expired(db_session, batch_size=1)
+        assert moved == {"appointments": 2, "slots": 2}
+
+        hot_appts = {a.id for a in db_session.query(Appointment).all()}
+        assert done_id not in hot_appts and canceled_id not in hot_appts
+        assert stale_id in hot_appts and newest_id in hot_appts
+        assert {a.id for a in db_session.query(AppointmentArchive).all()} == {done_id, canceled_id}
+
+        hot_slots = {s.id for s in db_session.query(AppointmentSlot).all()}
+        assert hot_slots == {old_ids[2], recent.id, future.id}
+        assert {s.id for s in db_session.query(AppointmentSlotArchive).all()} == {old_ids[0], old_ids[1]}
+
+    def test_deleted_newest_id_not_reused(self, db_session, doctor_profile):
+        """Test an id already in the archive is never handed out again after the newest hot row goes."""
+        old = _slot(db_session, doctor_profile, -100)
+        newest = _slot(db_session, doctor_profile, 3)
+        old_id, newest_id = old.id, newest.id
+        assert archive_expired(db_session)["slots"] == 1
+
+        db_session.delete(newest)
+        db_session.commit()
+        again_id = _slot(db_session, doctor_profile, -90).id
+        assert again_id > newest_id
+
+        assert archive_expired(db_session)["slots"] == 1
+        assert {s.id for s in db_session.query(AppointmentSlotArchive).all()} == {old_id, again_id}
+
+    def test_newest_row_archived(self, db_session, doctor_profile):
+        """Test the row with the highest id is archived like any other."""
+        only_id = _slot(db_session, doctor_profile, -100).id
+
+        assert archive_expired(db_session) == {"appointments": 0, "slots": 1}
+        assert db_session.query(AppointmentSlot).filter(AppointmentSlot.id == only_id).count() == 0
+
+
+class TestHistoryReadsArchive:
+    """Tests for history endpoints over hot and archived rows."""
+
+    def test_history_and_detail(self, client, auth_headers, db_session, doctor_profile, test_user):
+        """Test archived appointments are still listed and retrievable."""
+        archived = _appointment(db_session, doctor_profile, test_user, _slot(db_session, doctor_profile, -100), "COMPLETED")
+        hot = _appointment(db_session, doctor_profile, test_user, _slot(db_session, doctor_profile, -1), "CANCELED")
+        _appointment(db_session, doctor_profile, test_user, _slot(db_session, doctor_profile, 3), "PENDING")
+        archived_id, hot_id = archived.id, hot.id
+        assert archive_expired(db_session)["appointments"] == 1
+
+        response = client.get("/appointments/history", headers=auth_headers)
+        assert response.status_code == 200
+        assert [a["id"] for a in response.json()] == [hot_id, archived_id]
+        assert response.json()[1]["status"] == "COMPLETED"
+
+        response = client.get(f"/appointments/{archived_id}", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["id"] == archived_id
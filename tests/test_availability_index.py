@@ -0,0 +1,94 @@
+"""
+Unit tests for the in-memory per-doctor availability index.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.services.availability_index import DoctorAvailabilityIndex, availability_index
+
+
+@pytest.fixture
+def index_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "availability_index_enabled", True)
+
+
+def _rows(base, spans):
+    return [
+        (i + 1, base + timedelta(hours=s), base + timedelta(hours=e), avail)
+        for i, (s, e, avail) in enumerate(spans)
+    ]
+
+
+class TestDoctorAvailabilityIndex:
+    """Tests for the bisect-based index structure."""
+
+    def test_overlaps(self):
+        """Test overlap detection at slot boundaries."""
+        base = datetime(2030, 1, 1, 8)
+        idx = DoctorAvailabilityIndex(_rows(base, [(0, 1, 1), (2, 3, 0)]))
+
+        assert idx.overlaps(base + timedelta(minutes=30), base + timedelta(minutes=90))
+        assert idx.overlaps(base + timedelta(hours=2, minutes=30), base + timedelta(hours=4))
+        assert not idx.overlaps(base + timedelta(hours=1), base + timedelta(hours=2))
+        assert not idx.overlaps(base + timedelta(hours=3), base + timedelta(hours=5))
+        assert not DoctorAvailabilityIndex([]).overlaps(base, base + timedelta(hours=1))
+
+    def test_overlaps_with_legacy_overlapping_slots(self):
+        """Test a long slot hidden behind later starts is still detected."""
+        base = datetime(2030, 1, 1, 8)
+        idx = DoctorAvailabilityIndex(_rows(base, [(0, 10, 1), (1, 2, 1)]))
+
+        assert idx.overlaps(base + timedelta(hours=5), base + timedelta(hours=6))
+
+    def test_available_after(self):
+        """Test listing skips booked slots and respects bounds and limit."""
+        base = datetime(2030, 1, 1, 8)
+        idx = DoctorAvailabilityIndex(_rows(base, [(0, 1, 1), (1, 2, 0), (2, 3, 1), (3, 4, 1)]))
+
+        assert [r[0] for r in idx.available_after()] == [1, 3, 4]
+        assert [r[0] for r in idx.available_after(base)] == [1, 3, 4]
+        assert [r[0] for r in idx.available_after(base + timedelta(minutes=30))] == [3, 4]
+        assert [r[0] for r in idx.available_after(base, until=base + timedelta(hours=3))] == [1, 3]
+        assert [r[0] for r in idx.available_after(base, limit=2)] == [1, 3]
+
+
+class TestIndexedEndpoints:
+    """Tests for endpoints served from the index."""
+
+    def test_create_slot_overlap_from_index(self, client, doctor_auth_headers, doctor_profile, appointment_slot, index_enabled):
+        """Test overlap check is answered by the index."""
+        response = client.post("/doctor/slots", json={
+            "start_at": appointment_slot.start_at.isoformat(),
+            "end_at": appointment_slot.end_at.isoformat(),
+        }, headers=doctor_auth_headers)
+        assert response.status_code == 409
+
+    def test_index_invalidated_on_commit(self, client, doctor_auth_headers, auth_headers, doctor_profile, appointment_slot, index_enabled):
+        """Test committed slot changes reach the index."""
+        url = f"/doctors/{doctor_profile.id}/slots"
+        assert [s["id"] for s in client.get(url).json()] == [appointment_slot.id]
+
+        start = appointment_slot.end_at + timedelta(hours=1)
+        created = client.post("/doctor/slots", json={
+            "start_at": start.isoformat(),
+            "end_at": (start + timedelta(hours=1)).isoformat(),
+        }, headers=doctor_auth_headers).json()
+        assert [s["id"] for s in client.get(url).json()] == [appointment_slot.id, created["id"]]
+
+        client.post("/appointments", json={
+            "doctor_id": doctor_profile.id,
+            "slot_id": appointment_slot.id,
+        }, headers=auth_headers)
+        assert [s["id"] for s in client.get(url).json()] == [created["id"]]
+
+    def test_index_not_cached_inside_dirty_transaction(self, db_session, doctor_profile, appointment_slot):
+        """Test an index loaded over uncommitted writes is not kept."""
+        appointment_slot.is_available = 0
+        db_session.flush()
+
+        idx = availability_index.get(db_session, doctor_profile.id)
+        assert idx.available_after() == []
+        db_session.rollback()
+
+        assert [r[0] for r in availability_index.get(db_session, doctor_profile.id).available_after()] == [appointment_slot.id]
@@ -0,0 +1,202 @@
+"""
+Unit tests for availability rules and rolling-horizon slot materialization.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+
+def _rule_payload(weekday, **kw):
+    payload = {
+        "weekday": weekday,
+        "start_time": "09:00:00",
+        "end_time": "11:00:00",
+        "slot_minutes": 30,
+    }
+    payload.update(kw)
+    return payload
+
+
+class TestAvailabilityRules:
+    """Tests for doctor availability rule management."""
+
+    def test_create_rule_materializes_horizon(self, client, doctor_auth_headers, doctor_profile, db_session):
+        """Test creating a rule writes slots only up to the horizon."""
+        from app.config import settings
+        from app.models.appointment_slot import AppointmentSlot
+
+        weekday = (datetime.utcnow() + timedelta(days=2)).weekday()
+        response = client.post("/doctor/availability-rules", json=_rule_payload(weekday), headers=doctor_auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["doctor_id"] == doctor_profile.id
+        assert data["materialized_until"] is not None
+
+        slots = db_session.query(AppointmentSlot).filter(AppointmentSlot.doctor_id == doctor_profile.id).all()
+        weeks = settings.slot_horizon_days // 7
+        assert weeks * 4 <= len(slots) <= (weeks + 1) * 4
+        horizon = datetime.fromisoformat(data["materialized_until"])
+        assert all(s.start_at < horizon for s in slots)
+        assert all(s.start_at.weekday() == weekday for s in slots)
+
+    def test_create_rule_invalid_times(self, client, doctor_auth_headers, doctor_profile):
+        """Test rule with end before start fails."""
+        response = client.post(
+            "/doctor/availability-rules",
+            json=_rule_payload(0, start_time="11:00:00", end_time="09:00:00"),
+            headers=doctor_auth_headers,
+        )
+        assert response.status_code == 400
+
+    def test_create_rule_overlap(self, client, doctor_auth_headers, doctor_profile):
+        """Test overlapping rules on the same weekday are rejected."""
+        client.post("/doctor/availability-rules", json=_rule_payload(1), headers=doctor_auth_headers)
+        response = client.post(
+            "/doctor/availability-rules",
+            json=_rule_payload(1, start_time="10:00:00", end_time="12:00:00"),
+            headers=doctor_auth_headers,
+        )
+        assert response.status_code == 409
+
+    def test_create_rule_skips_existing_slots(self, client, doctor_auth_headers, doctor_profile, db_session):
+        """Test materialization does not duplicate manually created slots."""
+        from app.models.appointment_slot import AppointmentSlot
+
+        day = (datetime.utcnow() + timedelta(days=3)).date()
+        manual = AppointmentSlot(
+            doctor_id=doctor_profile.id,
+            start_at=datetime.combine(day, datetime.min.time()).replace(hour=9, minute=15),
+            end_at=datetime.combine(day, datetime.min.time()).replace(hour=9, minute=45),
+            is_available=1,
+        )
+        db_session.add(manual)
+        db_session.commit()
+
+        client.post("/doctor/availability-rules", json=_rule_payload(day.weekday()), headers=doctor_auth_headers)
+
+        same_day = (
+            db_session.query(AppointmentSlot)
+            .filter(
+                AppointmentSlot.doctor_id == doctor_profile.id,
+                AppointmentSlot.start_at >= datetime.combine(day, datetime.min.time()),
+                AppointmentSlot.start_at < datetime.combine(day, datetime.min.time()) + timedelta(days=1),
+            )
+            .order_by(AppointmentSlot.start_at)
+            .all()
+        )
+        # 09:00 and 09:30 collide with the manual 09:15 slot
+        assert [s.start_at.strftime("%H:%M") for s in same_day] == ["09:15", "10:00", "10:30"]
+
+    def test_list_and_delete_rule(self, client, doctor_auth_headers, doctor_profile):
+        """Test listing and deleting rules."""
+        created = client.post("/doctor/availability-rules", json=_rule_payload(4), headers=doctor_auth_headers).json()
+
+        response = client.get("/doctor/availability-rules", headers=doctor_auth_headers)
+        assert response.status_code == 200
+        assert [r["id"] for r in response.json()] == [created["id"]]
+
+        response = client.delete(f"/doctor/availability-rules/{created['id']}", headers=doctor_auth_headers)
+        assert response.status_code == 200
+        assert client.get("/doctor/availability-rules", headers=doctor_auth_headers).json() == []
+
+    def test_delete_rule_not_found(self, client, doctor_auth_headers, doctor_profile):
+        """Test deleting a non-existent rule."""
+        response = client.delete("/doctor/availability-rules/9999", headers=doctor_auth_headers)
+        assert response.status_code == 404
+
+    def test_create_rule_unauthorized(self, client, auth_headers):
+        """Test patients cannot create rules."""
+        response = client.post("/doctor/availability-rules", json=_rule_payload(0), headers=auth_headers)
+        assert response.status_code == 403
+
+
+class TestSlotHorizon:
+    """Tests for horizon extension and rule-based listing."""
+
+    def test_extend_horizons_is_incremental(self, db_session, doctor_profile):
+        """Test extending the horizon only writes the newly covered days."""
+        from datetime import time
+        from app.models.availability_rule import AvailabilityRule
+        from app.models.appointment_slot import AppointmentSlot
+        from app.services.slot_horizon import extend_horizons
+
+        now = datetime.utcnow()
+        rule = AvailabilityRule(
+            doctor_id=doctor_profile.id,
+            weekday=now.weekday(),
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            slot_minutes=60,
+            valid_from=now.date(),
+        )
+        db_session.add(rule)
+        db_session.commit()
+
+        first = extend_horizons(db_session, now=now)
+        assert first >= 1
+        assert extend_horizons(db_session, now=now) == 0
+
+        assert extend_horizons(db_session, now=now + timedelta(days=7)) == 1
+        total = db_session.query(AppointmentSlot).filter(AppointmentSlot.doctor_id == doctor_profile.id).count()
+        assert total == first + 1
+
+    def test_public_listing_beyond_horizon(self, client, doctor_auth_headers, doctor_profile):
+        """Test slots past the horizon are computed from rules without an id."""
+        from app.config import settings
+
+        weekday = (datetime.utcnow() + timedelta(days=1)).weekday()
+        client.post(
+            "/doctor/availability-rules",
+            json=_rule_payload(weekday, end_time="10:00:00", slot_minutes=60),
+            headers=doctor_auth_headers,
+        )
+
+        to_dt = (datetime.utcnow() + timedelta(days=settings.slot_horizon_days + 21)).isoformat()
+        response = client.get(f"/doctors/{doctor_profile.id}/slots?to_dt={to_dt}")
+        assert response.status_code == 200
+        data = response.json()
+        concrete = [s for s in data if s["id"] is not None]
+        virtual = [s for s in data if s["id"] is None]
+        assert concrete and virtual
+        assert max(s["start_at"] for s in concrete) < min(s["start_at"] for s in virtual)
+        assert [s["start_at"] for s in data] == sorted(s["start_at"] for s in data)
+
+    def test_virtual_slots_skip_booked_manual_slot(self, client, doctor_auth_headers, doctor_profile, db_session):
+        """Test a rule slot past the horizon is not listed over a booked manual slot."""
+        from app.config import settings
+        from app.models.appointment_slot import AppointmentSlot
+
+        weekday = (datetime.utcnow() + timedelta(days=1)).weekday()
+        client.post(
+            "/doctor/availability-rules",
+            json=_rule_payload(weekday, end_time="10:00:00", slot_minutes=60),
+            headers=doctor_auth_headers,
+        )
+        to_dt = (datetime.utcnow() + timedelta(days=settings.slot_horizon_days + 21)).isoformat()
+        virtual = [s for s in client.get(f"/doctors/{doctor_profile.id}/slots?to_dt={to_dt}").json() if s["id"] is None]
+        start = datetime.fromisoformat(virtual[0]["start_at"]) + timedelta(minutes=30)
+
+        db_session.add(AppointmentSlot(
+            doctor_id=doctor_profile.id, start_at=start, end_at=start + timedelta(minutes=30), is_available=0, booked_count=1,
+        ))
+        db_session.commit()
+
+        listed = [s["start_at"] for s in client.get(f"/doctors/{doctor_profile.id}/slots?to_dt={to_dt}").json() if s["id"] is None]
+        assert virtual[0]["start_at"] not in listed
+        assert [s["start_at"] for s in virtual[1:]] == listed
+
+    def test_scheduler_runs_due_tasks(self):
+        """Test the scheduler runs tasks that are due and records errors."""
+        from app.services.scheduler import Scheduler
+
+        calls = []
+        sched = Scheduler()
+        sched.add("ok", 3600, lambda: calls.append(1) or len(calls))
+        sched.add("boom", 3600, lambda: 1 / 0)
+
+        sched.run_due()
+        sched.run_due()
+
+        tasks = {t.name: t for t in sched.tasks()}
+        assert calls == [1]
+        assert tasks["ok"].last_result == 1
+        assert "ZeroDivisionError" in tasks["boom"].last_error
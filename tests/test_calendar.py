@@ -0,0 +1,113 @@
+"""
+Unit tests for the doctor month calendar.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.models.appointment_slot import AppointmentSlot
+from app.services.cache import TTLCache
+from app.services.slot_calendar import calendar_cache
+
+
+def _slot(doctor_profile, start, available=1):
+    return AppointmentSlot(
+        doctor_id=doctor_profile.id,
+        start_at=start,
+        end_at=start + timedelta(minutes=30),
+        is_available=available,
+    )
+
+
+class TestMonthCalendar:
+    """Tests for GET /doctors/{id}/calendar."""
+
+    def test_per_day_counts(self, client, db_session, doctor_profile):
+        """Test available and booked slots are counted per day of the month."""
+        db_session.add_all([
+            _slot(doctor_profile, datetime(2030, 3, 4, 9)),
+            _slot(doctor_profile, datetime(2030, 3, 4, 10)),
+            _slot(doctor_profile, datetime(2030, 3, 4, 11), available=0),
+            _slot(doctor_profile, datetime(2030, 3, 31, 23, 30), available=0),
+            _slot(doctor_profile, datetime(2030, 4, 1, 9)),
+            _slot(doctor_profile, datetime(2030, 2, 28, 9)),
+        ])
+        db_session.commit()
+
+        response = client.get(f"/doctors/{doctor_profile.id}/calendar?month=2030-03")
+        assert response.status_code == 200
+        assert response.json() == {
+            "doctor_id": doctor_profile.id,
+            "month": "2030-03",
+            "days": [
+                {"date": "2030-03-04", "available": 2, "booked": 1, "blocked": 0},
+                {"date": "2030-03-31", "available": 0, "booked": 1, "blocked": 0},
+            ],
+        }
+
+    def test_blocked_places_counted_apart(self, client, db_session, doctor_profile):
+        """Test the free places of blocked slots are reported as blocked, not booked."""
+        db_session.add_all([
+            AppointmentSlot(
+                doctor_id=doctor_profile.id, start_at=datetime(2030, 3, 5, 9), end_at=datetime(2030, 3, 5, 10),
+                is_available=0, blocked=1, capacity=3, booked_count=1,
+            ),
+            AppointmentSlot(
+                doctor_id=doctor_profile.id, start_at=datetime(2030, 3, 5, 10), end_at=datetime(2030, 3, 5, 10, 30),
+                is_available=0, blocked=1,
+            ),
+            _slot(doctor_profile, datetime(2030, 3, 5, 11)),
+        ])
+        db_session.commit()
+
+        days = client.get(f"/doctors/{doctor_profile.id}/calendar?month=2030-03").json()["days"]
+        assert days == [{"date": "2030-03-05", "available": 1, "booked": 1, "blocked": 3}]
+
+    def test_invalid_month(self, client, doctor_profile):
+        """Test a malformed month is rejected."""
+        response = client.get(f"/doctors/{doctor_profile.id}/calendar?month=2030-13")
+        assert response.status_code == 422
+
+    def test_booking_invalidates_month(self, client, db_session, auth_headers, doctor_profile, appointment_slot):
+        """Test a booking in the month refreshes the cached counts."""
+        month = appointment_slot.start_at.strftime("%Y-%m")
+        url = f"/doctors/{doctor_profile.id}/calendar?month={month}"
+        day = appointment_slot.start_at.date().isoformat()
+
+        assert client.get(url).json()["days"] == [{"date": day, "available": 1, "booked": 0, "blocked": 0}]
+        assert (doctor_profile.id, appointment_slot.start_at.year, appointment_slot.start_at.month) in calendar_cache._data
+
+        client.post("/appointments", json={
+            "doctor_id": doctor_profile.id,
+            "slot_id": appointment_slot.id,
+        }, headers=auth_headers)
+        assert client.get(url).json()["days"] == [{"date": day, "available": 0, "booked": 1, "blocked": 0}]
+
+    def test_other_month_stays_cached(self, client, db_session, doctor_profile):
+        """Test a change in one month leaves other months' entries alone."""
+        db_session.add(_slot(doctor_profile, datetime(2030, 5, 2, 9)))
+        db_session.commit()
+        client.get(f"/doctors/{doctor_profile.id}/calendar?month=2030-05")
+
+        db_session.add(_slot(doctor_profile, datetime(2030, 6, 2, 9)))
+        db_session.commit()
+        assert (doctor_profile.id, 2030, 5) in calendar_cache._data
+
+
+class TestTTLCache:
+    """Tests for the TTL cache."""
+
+    def test_expiry_and_eviction(self, monkeypatch):
+        """Test entries expire after the TTL and the oldest is evicted first."""
+        import app.services.cache as cache_module
+
+        now = [100.0]
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+        cache = TTLCache(ttl_seconds=10, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+        now[0] += 11
+        assert cache.get("c") is None
@@ -0,0 +1,146 @@
+"""
+Unit tests for chunked account and doctor deletion.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+from app.models.doctor_profile import DoctorProfile
+from app.models.favorite import Favorite
+from app.models.notification import Notification
+from app.models.review import Review
+from app.models.user import User
+from app.services.deletion import delete_doctor, delete_user
+from app.services.jobs import run_one
+
+
+def _booked_slots(db_session, doctor_profile, test_user, n, status="CONFIRMED"):
+    first = (datetime.utcnow() + timedelta(days=2)).replace(hour=9, minute=0, second=0, microsecond=0)
+    slots = []
+    for i in range(n):
+        start = first + timedelta(hours=i)
+        slot = AppointmentSlot(doctor_id=doctor_profile.id, start_at=start, end_at=start + timedelta(minutes=30), is_available=0, booked_count=1)
+        db_session.add(slot)
+        db_session.flush()
+        db_session.add(Appointment(doctor_id=doctor_profile.id, patient_user_id=test_user.id, slot_id=slot.id, status=status, notes=""))
+        slots.append(slot)
+    db_session.add(Review(user_id=test_user.id, doctor_id=doctor_profile.id, rating=5))
+    db_session.add(Favorite(user_id=test_user.id, doctor_id=doctor_profile.id))
+    db_session.add(Notification(user_id=test_user.id, message="hello"))
+    db_session.commit()
+    return [s.id for s in slots]
+
+
+class TestDeleteUser:
+    """Tests for deleting a patient account."""
+
+    def test_removes_rows_in_chunks_and_frees_slots(self, db_session, doctor_profile, doctor_user, test_user):
+        """Test dependent rows go chunk by chunk and booked slots reopen."""
+        slot_ids = _booked_slots(db_session, doctor_profile, test_user, 5)
+        user_id = test_user.id
+        steps = []
+
+        result = delete_user(db_session, user_id, chunk_size=2, progress=steps.append)
+        assert result["rows"]["canceled_appointments"] == 5
+        assert result["rows"]["appointments"] == 5
+        assert result["rows"]["users"] == 1
+        assert [s["step"] for s in steps].count("appointments") == 3
+        assert steps[-1]["rows"] == result["rows"]
+
+        db_session.expire_all()
+        assert db_session.get(User, user_id) is None
+        for model in (Appointment, Review, Favorite):
+            assert db_session.query(model).count() == 0
+        assert db_session.query(Notification).filter(Notification.user_id == user_id).count() == 0
+        slots = db_session.query(AppointmentSlot).filter(AppointmentSlot.id.in_(slot_ids)).all()
+        assert {(s.is_available, s.booked_count) for s in slots} == {(1, 0)}
+        assert db_session.query(Notification).filter(Notification.user_id == doctor_user.id).count() == 5
+
+    def test_doctor_account_takes_profile(self, db_session, doctor_profile, doctor_user, test_user):
+        """Test deleting a doctor's account removes the profile and its schedule first."""
+        _booked_slots(db_session, doctor_profile, test_user, 2)
+        doctor_id = doctor_profile.id
+
+        result = delete_user(db_session, doctor_user.id)
+        assert result["rows"]["doctor_profiles"] == 1
+        assert result["rows"]["appointment_slots"] == 2
+
+        db_session.expire_all()
+        assert db_session.get(DoctorProfile, doctor_id) is None
+        assert db_session.query(AppointmentSlot).count() == 0
+        assert db_session.get(User, test_user.id) is not None
+
+
+class TestDeleteDoctor:
+    """Tests for deleting a doctor profile."""
+
+    def test_cancels_and_removes_schedule(self, db_session, doctor_profile, doctor_user, test_user):
+        """Test the schedule and bookings go, patients are told, the account stays."""
+        _booked_slots(db_session, doctor_profile, test_user, 3, status="PENDING")
+        free = AppointmentSlot(
+            doctor_id=doctor_profile.id,
+            start_at=datetime.utcnow() + timedelta(days=5),
+            end_at=datetime.utcnow() + timedelta(days=5, minutes=30),
+            is_available=1,
+        )
+        db_session.add(free)
+        db_session.commit()
+        doctor_id = doctor_profile.id
+
+        result = delete_doctor(db_session, doctor_id, chunk_size=2)
+        assert result["rows"]["blocked_slots"] == 1
+        assert result["rows"]["canceled_appointments"] == 3
+        assert result["rows"]["appointment_slots"] == 4
+
+        db_session.expire_all()
+        assert db_session.get(DoctorProfile, doctor_id) is None
+        for model in (Appointment, AppointmentSlot, Review, Favorite):
+            assert db_session.query(model).count() == 0
+        assert db_session.get(User, doctor_user.id) is not None
+        canceled = "Appointment canceled: the doctor is no longer available"
+        assert db_session.query(Notification).filter(Notification.user_id == test_user.id, Notification.message == canceled).count() == 3
+
+
+class TestAdminDeletion:
+    """Tests for the admin deletion endpoints."""
+
+    def test_inline_reports_rows(self, client, admin_auth_headers, doctor_profile, test_user, db_session):
+        """Test a small account is deleted within the request."""
+        _booked_slots(db_session, doctor_profile, test_user, 2)
+
+        response = client.delete(f"/admin/users/{test_user.id}", headers=admin_auth_headers)
+        assert response.status_code == 200
+        assert response.json()["ok"] is True
+        assert response.json()["rows"]["appointments"] == 2
+
+    def test_heavy_user_queued_as_job(self, client, admin_auth_headers, doctor_profile, test_user, db_session, monkeypatch):
+        """Test a heavy deletion is queued and its progress and result are reported."""
+        from app.config import settings
+
+        _booked_slots(db_session, doctor_profile, test_user, 3)
+        monkeypatch.setattr(settings, "deletion_inline_limit", 2)
+        user_id = test_user.id
+
+        response = client.delete(f"/admin/users/{user_id}", headers=admin_auth_headers)
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert client.get(f"/admin/jobs/{job_id}", headers=admin_auth_headers).json()["status"] == "QUEUED"
+
+        assert run_one(db_session, "w1") is True
+        job = client.get(f"/admin/jobs/{job_id}", headers=admin_auth_headers).json()
+        assert job["status"] == "DONE"
+        assert job["progress"]["step"] == "users"
+        assert job["result"]["rows"]["appointments"] == 3
+        db_session.expire_all()
+        assert db_session.get(User, user_id) is None
+
+    def test_doctor_background_flag(self, client, admin_auth_headers, doctor_profile):
+        """Test background=true queues even a small doctor deletion."""
+        response = client.delete(f"/admin/doctors/{doctor_profile.id}?background=true", headers=admin_auth_headers)
+        assert response.status_code == 202
+        assert response.json()["status"] == "QUEUED"
+
+    def test_job_not_found(self, client, admin_auth_headers):
+        """Test an unknown job id is a 404."""
+        assert client.get("/admin/jobs/999", headers=admin_auth_headers).status_code == 404
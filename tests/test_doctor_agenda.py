@@ -0,0 +1,100 @@
+"""
+Unit tests for the doctor agenda.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+from app.services.agenda import agenda_cache
+
+
+def _slots(db_session, doctor_profile, starts):
+    slots = [
+        AppointmentSlot(doctor_id=doctor_profile.id, start_at=s, end_at=s + timedelta(minutes=30), is_available=1)
+        for s in starts
+    ]
+    db_session.add_all(slots)
+    db_session.commit()
+    return slots
+
+
+class TestDoctorAgenda:
+    """Tests for GET /doctor/agenda."""
+
+    def test_day_agenda_with_patient_names(self, client, doctor_auth_headers, doctor_profile, test_user, db_session):
+        """Test a day lists its slots with the booking and patient name on each."""
+        day = datetime(2030, 5, 6)
+        free, booked, _ = _slots(db_session, doctor_profile, [day + timedelta(hours=9), day + timedelta(hours=10), day + timedelta(days=1, hours=9)])
+        booked.is_available = 0
+        appt = Appointment(doctor_id=doctor_profile.id, patient_user_id=test_user.id, slot_id=booked.id, status="CONFIRMED", notes="")
+        db_session.add(appt)
+        db_session.commit()
+
+        response = client.get("/doctor/agenda?day=2030-05-06", headers=doctor_auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["start"] == "2030-05-06T00:00:00" and data["end"] == "2030-05-07T00:00:00"
+        assert [e["slot_id"] for e in data["entries"]] == [free.id, booked.id]
+        assert data["entries"][0]["appointment"] is None
+        assert data["entries"][1]["appointment"] == {
+            "id": appt.id,
+            "status": "CONFIRMED",
+            "patient_user_id": test_user.id,
+            "patient_name": test_user.username,
+        }
+
+    def test_multi_slot_booking_on_every_slot(self, client, doctor_auth_headers, doctor_profile, test_user, db_session):
+        """Test each slot of a run booked as one appointment shows that appointment."""
+        day = datetime(2030, 5, 6)
+        first, second, after = _slots(db_session, doctor_profile, [day + timedelta(hours=9, minutes=m) for m in (0, 30, 60)])
+        first.is_available = second.is_available = 0
+        appt = Appointment(
+            doctor_id=doctor_profile.id, patient_user_id=test_user.id, slot_id=first.id, status="CONFIRMED", notes="",
+            start_at=first.start_at, end_at=second.end_at,
+        )
+        db_session.add(appt)
+        db_session.commit()
+
+        entries = client.get("/doctor/agenda?day=2030-05-06", headers=doctor_auth_headers).json()["entries"]
+        assert [(e["slot_id"], (e["appointment"] or {}).get("id")) for e in entries] == [
+            (first.id, appt.id), (second.id, appt.id), (after.id, None),
+        ]
+
+    def test_week_agenda(self, client, doctor_auth_headers, doctor_profile, db_session):
+        """Test an ISO week covers Monday to Sunday."""
+        # 2030-W19 runs from Monday 2030-05-06 to Sunday 2030-05-12
+        inside = _slots(db_session, doctor_profile, [datetime(2030, 5, 6, 9), datetime(2030, 5, 12, 23)])
+        _slots(db_session, doctor_profile, [datetime(2030, 5, 13, 9)])
+
+        data = client.get("/doctor/agenda?week=2030-W19", headers=doctor_auth_headers).json()
+        assert [e["slot_id"] for e in data["entries"]] == [s.id for s in inside]
+
+    def test_bad_params(self, client, doctor_auth_headers, doctor_profile):
+        """Test malformed or conflicting windows are rejected."""
+        assert client.get("/doctor/agenda?week=2030-19", headers=doctor_auth_headers).status_code == 422
+        assert client.get("/doctor/agenda?week=2030-W19&day=2030-05-06", headers=doctor_auth_headers).status_code == 400
+
+    def test_cache_invalidated_by_booking_in_window(self, client, auth_headers, doctor_auth_headers, doctor_profile, db_session):
+        """Test a booking refreshes the cached day and leaves other days cached."""
+        day = (datetime.utcnow() + timedelta(days=3)).replace(hour=9, minute=0, second=0, microsecond=0)
+        slot, later = _slots(db_session, doctor_profile, [day, day + timedelta(days=2)])
+        url = f"/doctor/agenda?day={day.date().isoformat()}"
+        other_url = f"/doctor/agenda?day={later.start_at.date().isoformat()}"
+
+        assert client.get(url, headers=doctor_auth_headers).json()["entries"][0]["appointment"] is None
+        client.get(other_url, headers=doctor_auth_headers)
+        assert len(agenda_cache) == 2
+
+        client.post("/appointments", json={"doctor_id": doctor_profile.id, "slot_id": slot.id}, headers=auth_headers)
+        assert len(agenda_cache) == 1
+        entry = client.get(url, headers=doctor_auth_headers).json()["entries"][0]
+        assert entry["appointment"]["status"] == "PENDING"
+
+        appt_id = entry["appointment"]["id"]
+        client.post(f"/doctor/appointments/{appt_id}/confirm", headers=doctor_auth_headers)
+        assert client.get(url, headers=doctor_auth_headers).json()["entries"][0]["appointment"]["status"] == "CONFIRMED"
+
+        client.post("/doctor/appointments/bulk", json={"ids": [appt_id], "action": "cancel"}, headers=doctor_auth_headers)
+        entry = client.get(url, headers=doctor_auth_headers).json()["entries"][0]
+        assert entry["appointment"] is None and entry["is_available"] == 1
@@ -226,3 +226,233 @@ class TestDoctorUpcomingAppointments:
 
         response = client.get("/doctor/appointments/upcoming", headers=doctor_auth_headers)
         assert response.status_code == 200
+
+    def test_upcoming_bounded_by_to(self, client, doctor_auth_headers, appointment, appointment_slot, db_session):
+        """Test the optional upper bound on upcoming appointments."""
+        appointment.status = "CONFIRMED"
+        db_session.commit()
+
+        url = "/doctor/appointments/upcoming"
+        before = appointment_slot.start_at.isoformat()
+        after = (appointment_slot.start_at + timedelta(minutes=1)).isoformat()
+        assert client.get(url, params={"to": before}, headers=doctor_auth_headers).json() == []
+        assert [a["id"] for a in client.get(url, params={"to": after}, headers=doctor_auth_headers).json()] == [appointment.id]
+
+
+class TestDoctorBulkActions:
+    """Tests for bulk confirm/cancel/complete."""
+
+    def _appointments(self, db_session, doctor_profile, test_user, statuses):
+        from app.models.appointment import Appointment
+        from app.models.appointment_slot import AppointmentSlot
+
+        base = datetime.utcnow().replace(microsecond=0) + timedelta(days=2)
+        appts = []
+        for i, status in enumerate(statuses):
+            slot = AppointmentSlot(
+                doctor_id=doctor_profile.id,
+                start_at=base + timedelta(hours=i),
+                end_at=base + timedelta(hours=i, minutes=30),
+                is_available=0,
+            )
+            db_session.add(slot)
+            db_session.flush()
+            appts.append(Appointment(doctor_id=doctor_profile.id, patient_user_id=test_user.id, slot_id=slot.id, status=status, notes=""))
+        db_session.add_all(appts)
+        db_session.commit()
+        return appts
+
+    def test_bulk_confirm_reports_each_item(self, client, doctor_auth_headers, doctor_profile, test_user, db_session):
+        """Test eligible rows transition and the rest are reported."""
+        from app.models.notification import Notification
+
+        pending, other_pending, confirmed = self._appointments(db_session, doctor_profile, test_user, ["PENDING", "PENDING", "CONFIRMED"])
+        ids = [pending.id, confirmed.id, 99999, other_pending.id]
+
+        response = client.post("/doctor/appointments/bulk", json={"ids": ids, "action": "confirm"}, headers=doctor_auth_headers)
+        assert response.status_code == 200
+        assert response.json() == [
+            {"id": pending.id, "ok": True, "status": "CONFIRMED", "detail": None},
+            {"id": confirmed.id, "ok": False, "status": "CONFIRMED", "detail": "Only PENDING can be confirmed"},
+            {"id": 99999, "ok": False, "status": None, "detail": "Appointment not found"},
+            {"id": other_pending.id, "ok": True, "status": "CONFIRMED", "detail": None},
+        ]
+        db_session.expire_all()
+        assert {a.status for a in (pending, other_pending)} == {"CONFIRMED"}
+        assert db_session.query(Notification).filter(Notification.message == "Appointment confirmed").count() == 4
+
+    def test_bulk_cancel_frees_slots(self, client, doctor_auth_headers, doctor_profile, test_user, db_session):
+        """Test cancelling in bulk marks slots available again."""
+        from app.models.appointment_slot import AppointmentSlot
+
+        appts = self._appointments(db_session, doctor_profile, test_user, ["PENDING", "CONFIRMED", "COMPLETED"])
+        response = client.post(
+            "/doctor/appointments/bulk",
+            json={"ids": [a.id for a in appts], "action": "cancel"},
+            headers=doctor_auth_headers,
+        )
+        assert [r["ok"] for r in response.json()] == [True, True, False]
+
+        db_session.expire_all()
+        assert [a.canceled_by for a in appts[:2]] == ["DOCTOR", "DOCTOR"]
+        slots = {s.id: s.is_available for s in db_session.query(AppointmentSlot).all()}
+        assert [slots[a.slot_id] for a in appts] == [1, 1, 0]
+
+    def test_bulk_other_doctor_forbidden(self, client, doctor_auth_headers, doctor_profile, db_session, test_user, specialty):
+        """Test appointments of another doctor are reported as forbidden and left alone."""
+        from app.models.user import User
+        from app.models.doctor_profile import DoctorProfile
+
+        user = User(email="doc2@example.com", username="doc2", password_hash="x", role="DOCTOR")
+        db_session.add(user)
+        db_session.commit()
+        other = DoctorProfile(user_id=user.id, full_name="Dr. Two", bio="", clinic_name="", address="", phone="", specialty_id=specialty.id, is_active=1)
+        db_session.add(other)
+        db_session.commit()
+        (appt,) = self._appointments(db_session, other, test_user, ["PENDING"])
+
+        response = client.post("/doctor/appointments/bulk", json={"ids": [appt.id], "action": "confirm"}, headers=doctor_auth_headers)
+        assert response.json() == [{"id": appt.id, "ok": False, "status": None, "detail": "Forbidden"}]
+        db_session.refresh(appt)
+        assert appt.status == "PENDING"
+
+    def test_bulk_validation(self, client, doctor_auth_headers, doctor_profile):
+        """Test empty id lists and unknown actions are rejected."""
+        assert client.post("/doctor/appointments/bulk", json={"ids": [], "action": "confirm"}, headers=doctor_auth_headers).status_code == 422
+        assert client.post("/doctor/appointments/bulk", json={"ids": [1], "action": "reject"}, headers=doctor_auth_headers).status_code == 422
+
+
+class TestDoctorRescheduleDay:
+    """Tests for moving a canceled day's appointments to free slots."""
+
+    def _day(self):
+        return (datetime.utcnow() + timedelta(days=3)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def _slot(self, db_session, doctor_id, start, available=1):
+        from app.models.appointment_slot import AppointmentSlot
+
+        slot = AppointmentSlot(doctor_id=doctor_id, start_at=start, end_at=start + timedelta(minutes=30), is_available=available)
+        db_session.add(slot)
+        db_session.flush()
+        return slot
+
+    def _booked(self, db_session, doctor_id, patient_id, start, status="CONFIRMED"):
+        from app.models.appointment import Appointment
+
+        slot = self._slot(db_session, doctor_id, start, available=0)
+        appt = Appointment(doctor_id=doctor_id, patient_user_id=patient_id, slot_id=slot.id, status=status, notes="")
+        db_session.add(appt)
+        db_session.commit()
+        return appt
+
+    def _colleague(self, db_session, specialty):
+        from app.models.doctor_profile import DoctorProfile
+        from app.models.user import User
+
+        user = User(email="colleague@example.com", username="colleague", password_hash="x", role="DOCTOR")
+        db_session.add(user)
+        db_session.flush()
+        prof = DoctorProfile(user_id=user.id, full_name="Dr. Colleague", specialty_id=specialty.id, is_active=1)
+        db_session.add(prof)
+        db_session.commit()
+        return prof
+
+    def _post(self, client, headers, day, fallback=False):
+        return client.post(
+            "/doctor/appointments/reschedule-day",
+            json={"day": day.date().isoformat(), "fallback": fallback},
+            headers=headers,
+        )
+
+    def test_moves_in_original_order_and_cancels_rest(self, client, doctor_auth_headers, doctor_profile, test_user, db_session):
+        """Test appointments take the next free slots by original time; the rest are canceled."""
+        from app.models.appointment_slot import AppointmentSlot
+        from app.models.notification import Notification
+
+        day = self._day()
+        first = self._booked(db_session, doctor_profile.id, test_user.id, day + timedelta(hours=9))
+        second = self._booked(db_session, doctor_profile.id, test_user.id, day + timedelta(hours=10), status="PENDING")
+        third = self._booked(db_session, doctor_profile.id, test_user.id, day + timedelta(hours=11))
+        same_day_free = self._slot(db_session, doctor_profile.id, day + timedelta(hours=15))
+        early = self._slot(db_session, doctor_profile.id, day + timedelta(days=1, hours=9))
+        late = self._slot(db_session, doctor_profile.id, day + timedelta(days=1, hours=9, minutes=30))
+        db_session.commit()
+        ids = (first.id, second.id, third.id, same_day_free.id, early.id, late.id)
+
+        response = self._post(client, doctor_auth_headers, day)
+        assert response.status_code == 200
+        data = response.json()
+        assert [(m["appointment_id"], m["to_slot_id"]) for m in data["moved"]] == [(ids[0], ids[4]), (ids[1], ids[5])]
+        assert data["canceled"] == [ids[2]]
+        assert data["blocked_slots"] == 4
+
+        db_session.expire_all()
+        assert (first.status, first.slot_id, first.start_at) == ("CONFIRMED", ids[4], day + timedelta(days=1, hours=9))
+        assert (second.status, second.end_at) == ("PENDING", day + timedelta(days=1, hours=10))
+        assert (third.status, third.canceled_by) == ("CANCELED", "DOCTOR")
+        assert db_session.get(AppointmentSlot, ids[3]).is_available == 0
+        assert {db_session.get(AppointmentSlot, i).is_available for i in ids[4:]} == {0}
+        assert db_session.query(Notification).filter(Notification.user_id == test_user.id).count() == 3
+
+    def test_falls_back_to_same_specialty(self, client, doctor_auth_headers, doctor_profile, specialty, test_user, db_session):
+        """Test an appointment the doctor has no slot for moves to a colleague, as PENDING."""
+        day = self._day()
+        appt = self._booked(db_session, doctor_profile.id, test_user.id, day + timedelta(hours=11))
+        colleague = self._colleague(db_session, specialty)
+        self._slot(db_session, colleague.id, day + timedelta(hours=8))
+        same_time = self._slot(db_session, colleague.id, day + timedelta(hours=11))
+        db_session.commit()
+        same_time_id = same_time.id
+
+        assert self._post(client, doctor_auth_headers, day).json()["canceled"] == [appt.id]
+
+        appt = self._booked(db_session, doctor_profile.id, test_user.id, day + timedelta(hours=10, minutes=30))
+        data = self._post(client, doctor_auth_headers, day, fallback=True).json()
+        assert data["moved"][0]["to_slot_id"] == same_time_id
+        assert data["moved"][0]["doctor_id"] == colleague.id
+
+        db_session.expire_all()
+        assert (appt.doctor_id, appt.status) == (colleague.id, "PENDING")
+
+    def test_skips_slots_clashing_with_patient(self, client, doctor_auth_headers, doctor_profile, specialty, test_user, db_session):
+        """Test a patient is not moved onto a time they are already booked at."""
+        day = self._day()
+        appt = self._booked(db_session, doctor_profile.id, test_user.id, day + timedelta(hours=9))
+        colleague = self._colleague(db_session, specialty)
+        self._booked(db_session, colleague.id, test_user.id, day + timedelta(days=1, hours=9))
+        self._slot(db_session, doctor_profile.id, day + timedelta(days=1, hours=9))
+        later = self._slot(db_session, doctor_profile.id, day + timedelta(days=1, hours=10))
+        db_session.commit()
+
+        data = self._post(client, doctor_auth_headers, day).json()
+        assert data["moved"][0]["to_slot_id"] == later.id
+
+    def test_multi_slot_booking_moves_to_run(self, client, doctor_auth_headers, doctor_profile, test_user, db_session):
+        """Test a booking spanning several slots moves to a run of the same length or is canceled."""
+        from app.models.appointment_slot import AppointmentSlot
+
+        day = self._day()
+        long = self._booked(db_session, doctor_profile.id, test_user.id, day + timedelta(hours=9))
+        long.end_at = long.start_at + timedelta(minutes=90)
+        longer = self._booked(db_session, doctor_profile.id, test_user.id, day + timedelta(hours=13))
+        longer.end_at = longer.start_at + timedelta(minutes=90)
+        next_day = day + timedelta(days=1)
+        self._slot(db_session, doctor_profile.id, next_day + timedelta(hours=9))
+        self._slot(db_session, doctor_profile.id, next_day + timedelta(hours=9, minutes=30))
+        run = [self._slot(db_session, doctor_profile.id, next_day + timedelta(hours=11, minutes=30 * i)) for i in range(3)]
+        db_session.commit()
+        run_ids = [s.id for s in run]
+        long_id, longer_id = long.id, longer.id
+
+        data = self._post(client, doctor_auth_headers, day).json()
+        assert [(m["appointment_id"], m["to_slot_id"]) for m in data["moved"]] == [(long_id, run_ids[0])]
+        assert data["canceled"] == [longer_id]
+
+        db_session.expire_all()
+        assert (long.start_at, long.end_at) == (next_day + timedelta(hours=11), next_day + timedelta(hours=12, minutes=30))
+        assert {db_session.get(AppointmentSlot, i).is_available for i in run_ids} == {0}
+
+    def test_past_day_rejected(self, client, doctor_auth_headers, doctor_profile):
+        """Test a day in the past cannot be canceled."""
+        response = self._post(client, doctor_auth_headers, datetime.utcnow() - timedelta(days=2))
+        assert response.status_code == 400
@@ -0,0 +1,139 @@
+"""
+Unit tests for Idempotency-Key handling on appointment POSTs.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.core import idempotency
+from app.core.idempotency import purge_expired, request_hash
+from app.models.appointment import Appointment
+from app.models.idempotency_key import IdempotencyKey
+from app.models.notification import Notification
+
+
+def _book(client, headers, slot, key, notes=None):
+    body = {"doctor_id": slot.doctor_id, "slot_id": slot.id}
+    if notes is not None:
+        body["notes"] = notes
+    return client.post("/appointments", json=body, headers={**headers, "Idempotency-Key": key})
+
+
+class TestIdempotencyKey:
+    """Tests for replaying and guarding keyed requests."""
+
+    def test_retry_replays_stored_response(self, client, auth_headers, appointment_slot, db_session):
+        """Test a retried booking returns the first response without running again."""
+        first = _book(client, auth_headers, appointment_slot, "k-1")
+        notifications = db_session.query(Notification).count()
+
+        second = _book(client, auth_headers, appointment_slot, "k-1")
+        assert second.status_code == 200
+        assert second.json() == first.json()
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert "Idempotent-Replayed" not in first.headers
+        assert db_session.query(Appointment).count() == 1
+        assert db_session.query(Notification).count() == notifications
+
+    def test_error_responses_are_replayed(self, client, auth_headers, appointment_slot, db_session):
+        """Test a stored 4xx is returned again for the same key."""
+        appointment_slot.is_available = 0
+        db_session.commit()
+
+        assert _book(client, auth_headers, appointment_slot, "k-2").status_code == 409
+        appointment_slot.is_available = 1
+        db_session.commit()
+
+        response = _book(client, auth_headers, appointment_slot, "k-2")
+        assert response.status_code == 409
+        assert response.headers["Idempotent-Replayed"] == "true"
+
+    def test_cancel_retry(self, client, auth_headers, appointment):
+        """Test a retried cancel does not fail on the already-canceled state."""
+        headers = {**auth_headers, "Idempotency-Key": "cancel-1"}
+        assert client.post(f"/appointments/{appointment.id}/cancel", headers=headers).status_code == 200
+        assert client.post(f"/appointments/{appointment.id}/cancel", headers=headers).status_code == 200
+        assert client.post(f"/appointments/{appointment.id}/cancel", headers=auth_headers).status_code == 409
+
+    def test_key_reused_for_different_request(self, client, auth_headers, appointment_slot):
+        """Test a key cannot be replayed against a different payload."""
+        _book(client, auth_headers, appointment_slot, "k-3")
+        response = _book(client, auth_headers, appointment_slot, "k-3", notes="changed")
+        assert response.status_code == 422
+
+    def test_key_reused_with_different_query(self, client, auth_headers, appointment, doctor_profile, db_session):
+        """Test a key cannot be replayed against a different query string."""
+        from app.models.appointment_slot import AppointmentSlot
+
+        slots = []
+        for hours in (30, 32):
+            start = datetime.utcnow() + timedelta(hours=hours)
+            slots.append(AppointmentSlot(doctor_id=doctor_profile.id, start_at=start, end_at=start + timedelta(hours=1), is_available=1))
+        db_session.add_all(slots)
+        db_session.commit()
+        headers = {**auth_headers, "Idempotency-Key": "move-1"}
+
+        path = f"/appointments/{appointment.id}/reschedule"
+        assert client.post(f"{path}?new_slot_id={slots[0].id}", headers=headers).status_code == 200
+        response = client.post(f"{path}?new_slot_id={slots[1].id}", headers=headers)
+        assert response.status_code == 422
+        assert "Idempotent-Replayed" not in response.headers
+        db_session.refresh(appointment)
+        assert appointment.slot_id == slots[0].id
+
+    def test_keys_are_per_user(self, client, auth_headers, doctor_auth_headers, appointment_slot):
+        """Test another user's key with the same value is not replayed."""
+        _book(client, auth_headers, appointment_slot, "shared")
+        response = _book(client, doctor_auth_headers, appointment_slot, "shared")
+        assert response.status_code == 403
+        assert "Idempotent-Replayed" not in response.headers
+
+    def test_duplicate_waits_for_first(self, client, auth_headers, appointment_slot, test_user, db_session, monkeypatch):
+        """Test a duplicate arriving mid-flight waits and then gets the first response."""
+        path = "/appointments"
+        body = f'{{"doctor_id":{appointment_slot.doctor_id},"slot_id":{appointment_slot.id}}}'.encode()
+        now = datetime.utcnow()
+        db_session.add(IdempotencyKey(
+            user_id=test_user.id, key="k-4", request_hash=request_hash("POST", path, body),
+            created_at=now, expires_at=now + timedelta(minutes=1),
+        ))
+        db_session.commit()
+
+        async def first_request_finishes(seconds):
+            db_session.query(IdempotencyKey).update({
+                IdempotencyKey.status_code: 201,
+                IdempotencyKey.media_type: "application/json",
+                IdempotencyKey.body: b'{"from": "first"}',
+            })
+            db_session.commit()
+
+        monkeypatch.setattr(idempotency.asyncio, "sleep", first_request_finishes)
+        response = client.post(path, content=body, headers={**auth_headers, "Idempotency-Key": "k-4", "Content-Type": "application/json"})
+        assert response.status_code == 201
+        assert response.json() == {"from": "first"}
+        db_session.refresh(appointment_slot)
+        assert appointment_slot.is_available == 1
+
+    def test_duplicate_gives_up_after_wait(self, client, auth_headers, test_user, db_session, monkeypatch):
+        """Test a duplicate of a request that never finishes gets 409."""
+        monkeypatch.setattr(settings, "idempotency_wait_seconds", 0)
+        now = datetime.utcnow()
+        db_session.add(IdempotencyKey(
+            user_id=test_user.id, key="k-5", request_hash=request_hash("POST", "/appointments", b""),
+            created_at=now, expires_at=now + timedelta(minutes=1),
+        ))
+        db_session.commit()
+
+        response = client.post("/appointments", content=b"", headers={**auth_headers, "Idempotency-Key": "k-5"})
+        assert response.status_code == 409
+        assert "in progress" in response.json()["detail"]
+
+    def test_purge_expired(self, db_session, test_user):
+        """Test expired keys are evicted."""
+        now = datetime.utcnow()
+        for key, expires in (("old", now - timedelta(seconds=1)), ("new", now + timedelta(hours=1))):
+            db_session.add(IdempotencyKey(user_id=test_user.id, key=key, request_hash="x", created_at=now, expires_at=expires))
+        db_session.commit()
+
+        assert purge_expired(db_session, now) == 1
+        assert [k.key for k in db_session.query(IdempotencyKey).all()] == ["new"]
@@ -0,0 +1,137 @@
+"""
+Unit tests for the durable job queue.
+"""
+import json
+import time
+import pytest
+from datetime import datetime, timedelta
+
+from app.models.job import Job
+from app.services import jobs
+from app.services.jobs import WorkerPool, backoff, claim, enqueue, handler, run_one
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def calls():
+    seen = []
+
+    @handler("test_ok")
+    def ok(db, payload):
+        seen.append(payload)
+        return {"echo": payload.get("n")}
+
+    @handler("test_fail")
+    def fail(db, payload):
+        raise RuntimeError("boom")
+
+    yield seen
+    jobs.handlers.pop("test_ok", None)
+    jobs.handlers.pop("test_fail", None)
+
+
+class TestJobQueue:
+    """Tests for enqueue, claim and completion."""
+
+    def test_runs_job_and_stores_result(self, db_session, calls):
+        """Test a queued job is run once and its result kept."""
+        job = enqueue(db_session, "test_ok", {"n": 7})
+        db_session.commit()
+
+        assert run_one(db_session, "w1") is True
+        assert run_one(db_session, "w1") is False
+        db_session.refresh(job)
+        assert job.status == "DONE"
+        assert json.loads(job.result) == {"echo": 7}
+        assert job.attempts == 1 and job.locked_by is None
+        assert calls == [{"n": 7}]
+
+    def test_priority_then_age(self, db_session, calls):
+        """Test higher priority runs first, then older jobs."""
+        low = enqueue(db_session, "test_ok", {"n": 1})
+        high = enqueue(db_session, "test_ok", {"n": 2}, priority=5)
+        later = enqueue(db_session, "test_ok", {"n": 3}, run_after=datetime.utcnow() + timedelta(hours=1), priority=9)
+        db_session.commit()
+
+        assert claim(db_session, "w1") == high.id
+        assert claim(db_session, "w1") == low.id
+        assert claim(db_session, "w1") is None
+
+    def test_retry_with_backoff_then_fail(self, db_session, calls):
+        """Test a failing job is retried later and marked FAILED after max attempts."""
+        job = enqueue(db_session, "test_fail", max_attempts=2)
+        db_session.commit()
+
+        before = datetime.utcnow()
+        run_one(db_session, "w1")
+        db_session.refresh(job)
+        assert job.status == "QUEUED"
+        assert "boom" in job.last_error
+        assert job.run_after >= before + backoff(1)
+
+        job.run_after = datetime.utcnow()
+        db_session.commit()
+        run_one(db_session, "w1")
+        db_session.refresh(job)
+        assert job.status == "FAILED"
+        assert job.attempts == 2 and job.finished_at is not None
+
+    def test_expired_lease_is_reclaimed(self, db_session, calls):
+        """Test a job left RUNNING by a dead worker is picked up again after its lease."""
+        job = enqueue(db_session, "test_ok")
+        db_session.commit()
+        assert claim(db_session, "dead") == job.id
+
+        assert claim(db_session, "w2") is None
+        assert claim(db_session, "w2", now=datetime.utcnow() + timedelta(hours=1)) == job.id
+
+    def test_unknown_kind_rejected(self, db_session):
+        """Test only registered kinds can be queued."""
+        with pytest.raises(ValueError):
+            enqueue(db_session, "nope")
+
+    def test_backoff_grows_and_caps(self):
+        """Test backoff doubles per attempt up to the cap."""
+        assert backoff(2) == 2 * backoff(1)
+        assert backoff(50) == timedelta(seconds=jobs.MAX_BACKOFF_SECONDS)
+
+
+class TestWorkerPool:
+    """Tests for the thread worker pool."""
+
+    def test_thread_pool_drains_queue(self, db_session, calls):
+        """Test pool threads pick up queued jobs."""
+        for n in range(3):
+            enqueue(db_session, "test_ok", {"n": n})
+        db_session.commit()
+
+        pool = WorkerPool(1, "thread", poll_seconds=0.01, session_factory=TestingSessionLocal)
+        pool.start()
+        try:
+            deadline = time.monotonic() + 5
+            while len(calls) < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            pool.stop()
+        assert sorted(c["n"] for c in calls) == [0, 1, 2]
+
+
+class TestAdminJobs:
+    """Tests for the admin queue listing."""
+
+    def test_depth_and_failures(self, client, admin_auth_headers, db_session, calls):
+        """Test queue depth per status and recent failures are reported."""
+        enqueue(db_session, "test_ok")
+        enqueue(db_session, "test_fail", max_attempts=1)
+        db_session.commit()
+        run_one(db_session, "w1")
+        run_one(db_session, "w1")
+        enqueue(db_session, "test_ok")
+        db_session.commit()
+
+        response = client.get("/admin/jobs", headers=admin_auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["depth"] == {"DONE": 1, "FAILED": 1, "QUEUED": 1}
+        assert [f["kind"] for f in data["failures"]] == ["test_fail"]
+        assert data["workers"]["size"] == 0
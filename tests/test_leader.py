@@ -0,0 +1,95 @@
+"""
+Unit tests for leader election between app processes.
+"""
+from datetime import datetime, timedelta
+
+from app.models.leader_lease import LeaderLease
+from app.services.leader import LeaderElection
+from app.services.scheduler import Scheduler
+from tests.conftest import TestingSessionLocal
+
+
+def election(lease_seconds=15):
+    return LeaderElection("test", lease_seconds, session_factory=TestingSessionLocal)
+
+
+class TestLeaderElection:
+    """Tests for acquiring, renewing and taking over the lease."""
+
+    def test_single_leader(self, db_session):
+        """Test only the first of two processes gets the lease."""
+        a, b = election(), election()
+
+        assert a.try_acquire(db_session) is True
+        assert b.try_acquire(db_session) is False
+        assert a.is_leader() and not b.is_leader()
+        assert db_session.get(LeaderLease, "test").holder == a.holder_id
+
+    def test_renewal_keeps_term(self, db_session):
+        """Test the holder extends its lease without starting a new term."""
+        a = election()
+        t0 = datetime.utcnow()
+        a.try_acquire(db_session, now=t0)
+        a.try_acquire(db_session, now=t0 + timedelta(seconds=5))
+
+        lease = db_session.get(LeaderLease, "test", populate_existing=True)
+        assert lease.acquired_at == t0
+        assert lease.expires_at == t0 + timedelta(seconds=20)
+
+    def test_takeover_after_expiry(self, db_session):
+        """Test another process becomes leader once the lease has expired."""
+        a, b = election(), election()
+        t0 = datetime.utcnow()
+        a.try_acquire(db_session, now=t0)
+
+        assert b.try_acquire(db_session, now=t0 + timedelta(seconds=10)) is False
+        assert b.try_acquire(db_session, now=t0 + timedelta(seconds=16)) is True
+        assert a.try_acquire(db_session, now=t0 + timedelta(seconds=17)) is False
+        assert not a.is_leader()
+        assert db_session.get(LeaderLease, "test", populate_existing=True).holder == b.holder_id
+
+    def test_release_hands_over_immediately(self, db_session):
+        """Test a released lease can be taken without waiting for expiry."""
+        a, b = election(), election()
+        a.try_acquire(db_session)
+        a.release(db_session)
+
+        assert not a.is_leader()
+        assert b.try_acquire(db_session, now=datetime.utcnow() + timedelta(seconds=1)) is True
+
+    def test_scheduler_runs_only_on_leader(self, db_session):
+        """Test a gated scheduler skips its tasks while not leader."""
+        a, b = election(), election()
+        runs = []
+        follower = Scheduler(gate=b.is_leader)
+        follower.add("t", 60, lambda: runs.append(1))
+
+        a.try_acquire(db_session)
+        b.try_acquire(db_session)
+        follower.run_due()
+        assert runs == []
+
+        a.release(db_session)
+        b.try_acquire(db_session, now=datetime.utcnow() + timedelta(seconds=1))
+        follower.run_due()
+        assert runs == [1]
+
+
+class TestLeaderEndpoint:
+    """Tests for GET /admin/leader."""
+
+    def test_admin_sees_lease(self, client, admin_auth_headers, db_session):
+        """Test the endpoint reports the lease holder and this worker."""
+        from app.services.leader import leader
+
+        response = client.get("/admin/leader", headers=admin_auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["name"] == leader.name
+        assert data["this_worker"] == leader.holder_id
+        assert data["holder"] is None and data["is_leader"] is False
+
+    def test_requires_admin(self, client, auth_headers):
+        """Test regular users cannot see election state."""
+        response = client.get("/admin/leader", headers=auth_headers)
+        assert response.status_code == 403
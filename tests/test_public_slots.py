@@ -42,3 +42,99 @@ class TestPublicSlots:
         data = response.json()
         # The unavailable slot should not appear
         assert all(s["is_available"] == 1 for s in data)
+
+
+class TestPublicSlotsWindow:
+    """Tests for from/to/limit bounds on slot listing."""
+
+    def _add_slots(self, db_session, doctor_profile, offsets_hours, available=1):
+        from app.models.appointment_slot import AppointmentSlot
+
+        base = datetime.utcnow().replace(microsecond=0)
+        slots = [
+            AppointmentSlot(
+                doctor_id=doctor_profile.id,
+                start_at=base + timedelta(hours=h),
+                end_at=base + timedelta(hours=h, minutes=30),
+                is_available=available,
+            )
+            for h in offsets_hours
+        ]
+        db_session.add_all(slots)
+        db_session.commit()
+        return slots
+
+    def test_past_slots_hidden_by_default(self, client, doctor_profile, db_session):
+        """Test the lower bound defaults to now."""
+        past, future = self._add_slots(db_session, doctor_profile, [-48, 24])
+
+        response = client.get(f"/doctors/{doctor_profile.id}/slots")
+        assert response.status_code == 200
+        assert [s["id"] for s in response.json()] == [future.id]
+
+    def test_from_to_bounds(self, client, doctor_profile, db_session):
+        """Test only slots starting inside [from, to) are returned."""
+        slots = self._add_slots(db_session, doctor_profile, [1, 5, 10, 20])
+
+        params = {
+            "from": slots[1].start_at.isoformat(),
+            "to": slots[3].start_at.isoformat(),
+        }
+        response = client.get(f"/doctors/{doctor_profile.id}/slots", params=params)
+        assert response.status_code == 200
+        assert [s["id"] for s in response.json()] == [slots[1].id, slots[2].id]
+
+    def test_limit(self, client, doctor_profile, db_session):
+        """Test limit returns the earliest slots."""
+        slots = self._add_slots(db_session, doctor_profile, [3, 1, 2])
+
+        response = client.get(f"/doctors/{doctor_profile.id}/slots?limit=2")
+        assert response.status_code == 200
+        assert [s["id"] for s in response.json()] == [slots[1].id, slots[2].id]
+
+    def test_limit_too_large(self, client, doctor_profile):
+        """Test the limit is capped."""
+        response = client.get(f"/doctors/{doctor_profile.id}/slots?limit=100000")
+        assert response.status_code == 422
+
+    def test_window_too_wide(self, client, doctor_profile):
+        """Test the window is capped."""
+        start = datetime.utcnow()
+        params = {"from": start.isoformat(), "to": (start + timedelta(days=3650)).isoformat()}
+        response = client.get(f"/doctors/{doctor_profile.id}/slots", params=params)
+        assert response.status_code == 422
+        assert "Window" in response.json()["detail"]
+
+    def test_to_before_from(self, client, doctor_profile):
+        """Test an empty window is rejected."""
+        start = datetime.utcnow()
+        params = {"from": start.isoformat(), "to": (start - timedelta(days=1)).isoformat()}
+        response = client.get(f"/doctors/{doctor_profile.id}/slots", params=params)
+        assert response.status_code == 422
+
+    def test_listing_uses_composite_index(self, db_session, doctor_profile):
+        """Test the listing query is a bounded range scan of the composite index."""
+        from sqlalchemy import text
+        from app.services.slot_queries import available_slots
+        from app.models.appointment_slot import AppointmentSlot
+
+        start = datetime.utcnow()
+        q = (
+            db_session.query(AppointmentSlot)
+            .filter(
+                AppointmentSlot.doctor_id == doctor_profile.id,
+                AppointmentSlot.is_available == 1,
+                AppointmentSlot.start_at >= start,
+                AppointmentSlot.start_at < start + timedelta(days=7),
+            )
+            .order_by(AppointmentSlot.start_at.asc())
+            .limit(10)
+        )
+        plan = " ".join(
+            row[-1] for row in db_session.execute(
+                text("EXPLAIN QUERY PLAN " + str(q.statement.compile(compile_kwargs={"literal_binds": True})))
+            )
+        )
+        assert "ix_appointment_slots_doctor_available_start" in plan
+        assert "TEMP B-TREE" not in plan
+        assert available_slots(db_session, doctor_profile.id, start, start + timedelta(days=7), 10) == []
@@ -0,0 +1,105 @@
+"""
+Unit tests for the appointment reminder wheel.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+from app.models.notification import Notification
+from app.services import schedule_events
+from app.services.reminders import ReminderWheel
+from tests.conftest import TestingSessionLocal
+
+T0 = datetime.utcnow().replace(microsecond=0)
+
+
+def _appointment(db_session, doctor_profile, test_user, hours, status="CONFIRMED"):
+    start = T0 + timedelta(hours=hours)
+    slot = AppointmentSlot(doctor_id=doctor_profile.id, start_at=start, end_at=start + timedelta(minutes=30), is_available=0)
+    db_session.add(slot)
+    db_session.flush()
+    appt = Appointment(doctor_id=doctor_profile.id, patient_user_id=test_user.id, slot_id=slot.id, status=status, notes="")
+    db_session.add(appt)
+    db_session.commit()
+    return appt
+
+
+def _messages(db_session):
+    return [n.message for n in db_session.query(Notification).order_by(Notification.id)]
+
+
+@pytest.fixture
+def wheel():
+    w = ReminderWheel(window_hours=48, tick_seconds=30, session_factory=TestingSessionLocal)
+    schedule_events.subscribe(w.on_change)
+    yield w
+    schedule_events._listeners.remove(w.on_change)
+
+
+class TestReminderWheel:
+    """Tests for loading, updating and firing reminders."""
+
+    def test_day_then_hour_reminder_once(self, db_session, doctor_profile, test_user, wheel):
+        """Test both reminders fire at their time and only once."""
+        appt = _appointment(db_session, doctor_profile, test_user, 30)
+
+        assert wheel.tick(db_session, now=T0) == 0
+        assert wheel.describe()["queued"] == 2
+        assert wheel.tick(db_session, now=T0 + timedelta(hours=6, minutes=1)) == 1
+        assert wheel.tick(db_session, now=T0 + timedelta(hours=6, minutes=2)) == 0
+        assert wheel.tick(db_session, now=T0 + timedelta(hours=29)) == 1
+
+        db_session.refresh(appt)
+        assert appt.reminders_sent == 3
+        messages = _messages(db_session)
+        assert len(messages) == 2
+        assert "tomorrow" in messages[0] and "in 1 hour" in messages[1]
+
+    def test_late_booking_skips_day_reminder(self, db_session, doctor_profile, test_user, wheel):
+        """Test an appointment confirmed 3h ahead only gets the 1-hour reminder."""
+        _appointment(db_session, doctor_profile, test_user, 3)
+
+        assert wheel.tick(db_session, now=T0) == 0
+        assert wheel.describe()["queued"] == 1
+        assert wheel.tick(db_session, now=T0 + timedelta(hours=2)) == 1
+        assert "in 1 hour" in _messages(db_session)[0]
+
+    def test_follows_confirm_and_cancel(self, db_session, doctor_profile, test_user, wheel):
+        """Test changes committed after startup are picked up without a rescan."""
+        wheel.tick(db_session, now=T0)
+        appt = _appointment(db_session, doctor_profile, test_user, 5, status="PENDING")
+        wheel.tick(db_session, now=T0)
+        assert wheel.describe()["queued"] == 0
+
+        appt.status = "CONFIRMED"
+        db_session.commit()
+        wheel.tick(db_session, now=T0)
+        assert wheel.describe()["queued"] == 1
+
+        appt.status = "CANCELED"
+        db_session.commit()
+        assert wheel.tick(db_session, now=T0 + timedelta(hours=4, minutes=30)) == 0
+        assert _messages(db_session) == []
+
+    def test_loads_appointments_entering_window(self, db_session, doctor_profile, test_user):
+        """Test appointments beyond the window are loaded once it reaches them."""
+        w = ReminderWheel(window_hours=26, tick_seconds=30, session_factory=TestingSessionLocal)
+        _appointment(db_session, doctor_profile, test_user, 40)
+
+        w.tick(db_session, now=T0)
+        assert w.describe()["queued"] == 0
+        w.tick(db_session, now=T0 + timedelta(hours=15))
+        assert w.describe()["queued"] == 2
+        assert w.tick(db_session, now=T0 + timedelta(hours=16, minutes=1)) == 1
+
+    def test_two_processes_send_once(self, db_session, doctor_profile, test_user, wheel):
+        """Test two wheels holding the same appointment remind the patient once."""
+        other = ReminderWheel(window_hours=48, tick_seconds=30, session_factory=TestingSessionLocal)
+        _appointment(db_session, doctor_profile, test_user, 2)
+        wheel.tick(db_session, now=T0)
+        other.tick(db_session, now=T0)
+
+        later = T0 + timedelta(hours=1, minutes=5)
+        assert wheel.tick(db_session, now=later) + other.tick(db_session, now=later) == 1
+        assert len(_messages(db_session)) == 1
@@ -101,6 +101,16 @@ class TestStartup:
         with patch.dict(os.environ, {"AUTO_SEED": "no"}):
             run_auto_seed()
 
+    def test_run_auto_seed_off_by_default(self):
+        """Test auto seed does nothing unless AUTO_SEED is set."""
+        from app.startup import run_auto_seed
+
+        env = {k: v for k, v in os.environ.items() if k != "AUTO_SEED"}
+        with patch.dict(os.environ, env, clear=True):
+            with patch('app.startup.SessionLocal') as mock_session_local:
+                run_auto_seed()
+                mock_session_local.assert_not_called()
+
     def test_run_auto_seed_enabled(self):
         """Test auto seed runs when enabled."""
         from app.startup import run_auto_seed
@@ -145,3 +155,12 @@ class TestStartup:
                         run_auto_seed()
                         mock_seed_admin.assert_not_called()
                         mock_seed_specialties.assert_not_called()
+
+    def test_lifespan_runs_auto_seed(self):
+        """Test the app seeds the database on startup."""
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        with patch('app.main.run_auto_seed') as mock_run_auto_seed:
+            with TestClient(app):
+                mock_run_auto_seed.assert_called_once_with()
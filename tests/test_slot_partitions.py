@@ -0,0 +1,86 @@
+"""
+Unit tests for slot partition helpers.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.services.slot_partitions import (
+    create_partition_sql,
+    detach_partition_sql,
+    ensure_partitions,
+    is_partitioned,
+    month_starts,
+    partition_name,
+    split_default_sql,
+)
+
+
+class TestPartitionHelpers:
+    """Tests for month arithmetic and generated DDL."""
+
+    def test_month_starts(self):
+        """Test every month intersecting the window is listed, across a year boundary."""
+        months = month_starts(datetime(2030, 11, 15, 10), datetime(2031, 2, 1))
+        assert months == [datetime(2030, 11, 1), datetime(2030, 12, 1), datetime(2031, 1, 1)]
+        assert month_starts(datetime(2030, 3, 1), datetime(2030, 3, 1)) == []
+
+    def test_ddl(self):
+        """Test partition DDL bounds a month half-open."""
+        month = datetime(2030, 12, 1)
+        assert partition_name(month) == "appointment_slots_2030_12"
+        assert create_partition_sql(month).endswith("FOR VALUES FROM ('2030-12-01') TO ('2031-01-01')")
+        assert detach_partition_sql(month) == "ALTER TABLE appointment_slots DETACH PARTITION appointment_slots_2030_12"
+
+    def test_split_default(self):
+        """Test stranded default-partition rows move into the new month before re-attaching."""
+        stmts = split_default_sql(datetime(2030, 12, 1))
+        assert stmts[0] == "ALTER TABLE appointment_slots DETACH PARTITION appointment_slots_default"
+        assert stmts[1] == create_partition_sql(datetime(2030, 12, 1))
+        bounds = "start_at >= '2030-12-01' AND start_at < '2031-01-01'"
+        assert stmts[2].startswith("INSERT INTO appointment_slots SELECT * FROM appointment_slots_default")
+        assert stmts[2].endswith(bounds)
+        assert stmts[3] == f"DELETE FROM appointment_slots_default WHERE {bounds}"
+        assert stmts[4] == "ALTER TABLE appointment_slots ATTACH PARTITION appointment_slots_default DEFAULT"
+
+    def test_noop_on_sqlite(self, db_session):
+        """Test partition maintenance does nothing on SQLite."""
+        assert not is_partitioned(db_session)
+        assert ensure_partitions(db_session, datetime(2030, 1, 1), datetime(2030, 6, 1)) == 0
+
+
+class TestWindowedSlotListings:
+    """Tests for from/to on doctor and admin slot listings."""
+
+    def _add_slots(self, db_session, doctor_profile, offsets_days):
+        from app.models.appointment_slot import AppointmentSlot
+
+        base = datetime.utcnow().replace(microsecond=0)
+        slots = [
+            AppointmentSlot(
+                doctor_id=doctor_profile.id,
+                start_at=base + timedelta(days=d),
+                end_at=base + timedelta(days=d, minutes=30),
+                is_available=1,
+            )
+            for d in offsets_days
+        ]
+        db_session.add_all(slots)
+        db_session.commit()
+        return slots
+
+    def test_doctor_listing_window(self, client, doctor_auth_headers, doctor_profile, db_session):
+        """Test the doctor's own listing honours from/to and still lists everything without them."""
+        slots = self._add_slots(db_session, doctor_profile, [1, 10, 40])
+        params = {"from": slots[1].start_at.isoformat(), "to": slots[2].start_at.isoformat()}
+
+        response = client.get("/doctor/slots", params=params, headers=doctor_auth_headers)
+        assert [s["id"] for s in response.json()] == [slots[1].id]
+        assert len(client.get("/doctor/slots", headers=doctor_auth_headers).json()) == 3
+
+    def test_admin_listing_window(self, client, admin_auth_headers, doctor_profile, db_session):
+        """Test the admin listing honours from/to."""
+        slots = self._add_slots(db_session, doctor_profile, [1, 10, 40])
+        params = {"from": slots[0].start_at.isoformat(), "to": slots[2].start_at.isoformat()}
+
+        response = client.get(f"/admin/doctors/{doctor_profile.id}/slots", params=params, headers=admin_auth_headers)
+        assert [s["id"] for s in response.json()] == [slots[0].id, slots[1].id]
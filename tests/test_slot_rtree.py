@@ -0,0 +1,87 @@
+"""
+Unit tests for the SQLite R*Tree slot interval index.
+"""
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+from app.config import settings
+from app.models.appointment_slot import AppointmentSlot
+from app.services import slot_rtree
+from app.services.slot_queries import has_overlap, slots_starting_between
+
+
+def _rtree_rows(db_session):
+    return db_session.execute(
+        text(f"SELECT id, doctor_min, start_epoch, end_epoch FROM {slot_rtree.TABLE} ORDER BY id")
+    ).all()
+
+
+class TestSlotRtree:
+    """Tests for R*Tree maintenance and queries."""
+
+    def test_enabled_on_sqlite(self, db_session):
+        """Test the R*Tree is created alongside appointment_slots."""
+        assert slot_rtree.enabled(db_session)
+
+    def test_triggers_keep_rtree_in_sync(self, db_session, doctor_profile):
+        """Test inserts, updates and deletes are mirrored."""
+        start = datetime(2030, 1, 1, 9)
+        slot = AppointmentSlot(doctor_id=doctor_profile.id, start_at=start, end_at=start + timedelta(hours=1), is_available=1)
+        db_session.add(slot)
+        db_session.commit()
+
+        rows = _rtree_rows(db_session)
+        assert len(rows) == 1
+        assert rows[0].id == slot.id
+        assert rows[0].doctor_min == doctor_profile.id
+        assert rows[0].start_epoch <= slot_rtree.epoch(start) <= rows[0].end_epoch
+
+        slot.start_at = start + timedelta(days=1)
+        slot.end_at = start + timedelta(days=1, hours=1)
+        db_session.commit()
+        assert _rtree_rows(db_session)[0].start_epoch >= slot_rtree.epoch(start + timedelta(hours=23))
+
+        db_session.delete(slot)
+        db_session.commit()
+        assert _rtree_rows(db_session) == []
+
+    def test_overlap_matches_exact_predicate(self, db_session, doctor_profile):
+        """Test coarse R*Tree filtering never changes the exact answer."""
+        start = datetime(2030, 1, 1, 9)
+        db_session.add(AppointmentSlot(
+            doctor_id=doctor_profile.id,
+            start_at=start,
+            end_at=start + timedelta(minutes=30),
+            is_available=1,
+        ))
+        db_session.commit()
+
+        assert has_overlap(db_session, doctor_profile.id, start + timedelta(minutes=29, seconds=59), start + timedelta(hours=1))
+        assert not has_overlap(db_session, doctor_profile.id, start + timedelta(minutes=30), start + timedelta(hours=1))
+        assert not has_overlap(db_session, doctor_profile.id, start - timedelta(hours=1), start)
+        assert not has_overlap(db_session, doctor_profile.id + 1, start, start + timedelta(hours=1))
+
+    def test_large_doctor_ids_stay_apart(self, db_session):
+        """Test doctors whose ids share a float32 box are told apart by the exact predicate."""
+        start = datetime(2030, 1, 1, 9)
+        db_session.add(AppointmentSlot(doctor_id=2**24 + 1, start_at=start, end_at=start + timedelta(minutes=30), is_available=1))
+        db_session.commit()
+
+        assert has_overlap(db_session, 2**24 + 1, start, start + timedelta(hours=1))
+        assert not has_overlap(db_session, 2**24, start, start + timedelta(hours=1))
+
+    def test_window_query_uses_rtree(self, db_session, doctor_profile):
+        """Test window queries are planned through the virtual table."""
+        start = datetime(2030, 1, 1)
+        q = slots_starting_between(db_session, doctor_profile.id, start, start + timedelta(days=1))
+        plan = db_session.execute(
+            text("EXPLAIN QUERY PLAN " + str(q.statement.compile(compile_kwargs={"literal_binds": True})))
+        ).all()
+        assert any("VIRTUAL TABLE INDEX" in row[-1] for row in plan)
+
+    def test_disabled_falls_back_to_btree(self, db_session, doctor_profile, appointment_slot, monkeypatch):
+        """Test queries still work with the R*Tree switched off."""
+        monkeypatch.setattr(settings, "slot_rtree_enabled", False)
+        assert not slot_rtree.enabled(db_session)
+        assert has_overlap(db_session, doctor_profile.id, appointment_slot.start_at, appointment_slot.end_at)
@@ -0,0 +1,127 @@
+"""
+Unit tests for cross-doctor slot search.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.models.user import User
+from app.models.doctor_profile import DoctorProfile
+from app.models.specialty import Specialty
+from app.models.appointment_slot import AppointmentSlot
+
+
+def _make_doctor(db_session, name, specialty_id, is_active=1):
+    user = User(email=f"{name}@example.com", username=name, password_hash="x", role="DOCTOR")
+    db_session.add(user)
+    db_session.commit()
+    prof = DoctorProfile(
+        user_id=user.id,
+        full_name=f"Dr. {name}",
+        bio="",
+        clinic_name=f"{name} clinic",
+        address="",
+        phone="",
+        specialty_id=specialty_id,
+        is_active=is_active,
+    )
+    db_session.add(prof)
+    db_session.commit()
+    return prof
+
+
+def _add_slots(db_session, doctor, offsets_hours, available=1):
+    base = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+    slots = [
+        AppointmentSlot(
+            doctor_id=doctor.id,
+            start_at=base + timedelta(hours=h),
+            end_at=base + timedelta(hours=h, minutes=30),
+            is_available=available,
+        )
+        for h in offsets_hours
+    ]
+    db_session.add_all(slots)
+    db_session.commit()
+    return slots
+
+
+class TestSlotSearch:
+    """Tests for GET /slots/search."""
+
+    def test_merges_doctors_in_time_order(self, client, db_session, specialty):
+        """Test earliest slots across doctors come back in start order."""
+        a = _make_doctor(db_session, "alpha", specialty.id)
+        b = _make_doctor(db_session, "beta", specialty.id)
+        a_slots = _add_slots(db_session, a, [1, 4, 7])
+        b_slots = _add_slots(db_session, b, [2, 3, 8])
+
+        response = client.get(f"/slots/search?specialty_id={specialty.id}&limit=4")
+        assert response.status_code == 200
+        data = response.json()
+        assert [s["id"] for s in data] == [a_slots[0].id, b_slots[0].id, b_slots[1].id, a_slots[1].id]
+        assert data[0]["doctor"]["full_name"] == "Dr. alpha"
+        assert data[1]["doctor"]["id"] == b.id
+
+    def test_excludes_inactive_other_specialty_and_booked(self, client, db_session, specialty):
+        """Test only available slots of active doctors of the specialty are returned."""
+        other = Specialty(name="Dermatology")
+        db_session.add(other)
+        db_session.commit()
+
+        active = _make_doctor(db_session, "active", specialty.id)
+        inactive = _make_doctor(db_session, "inactive", specialty.id, is_active=0)
+        elsewhere = _make_doctor(db_session, "elsewhere", other.id)
+        wanted = _add_slots(db_session, active, [5])
+        _add_slots(db_session, active, [1], available=0)
+        _add_slots(db_session, inactive, [1])
+        _add_slots(db_session, elsewhere, [1])
+
+        response = client.get(f"/slots/search?specialty_id={specialty.id}")
+        assert response.status_code == 200
+        assert [s["id"] for s in response.json()] == [wanted[0].id]
+
+    def test_window(self, client, db_session, specialty):
+        """Test from/to bound the search."""
+        doc = _make_doctor(db_session, "window", specialty.id)
+        slots = _add_slots(db_session, doc, [1, 10, 30])
+
+        params = {
+            "specialty_id": specialty.id,
+            "from": slots[1].start_at.isoformat(),
+            "to": slots[2].start_at.isoformat(),
+        }
+        response = client.get("/slots/search", params=params)
+        assert [s["id"] for s in response.json()] == [slots[1].id]
+
+    def test_unknown_specialty(self, client):
+        """Test searching an unknown specialty."""
+        response = client.get("/slots/search?specialty_id=9999")
+        assert response.status_code == 404
+
+    def test_no_doctors(self, client, specialty):
+        """Test a specialty without doctors returns an empty list."""
+        response = client.get(f"/slots/search?specialty_id={specialty.id}")
+        assert response.status_code == 200
+        assert response.json() == []
+
+
+class TestMergedStream:
+    """Tests for the k-way merge service."""
+
+    def test_pages_through_streams(self, db_session, specialty):
+        """Test streams keep paging until the limit is reached."""
+        from app.services.slot_search import merged_slot_stream, earliest_slots
+
+        a = _make_doctor(db_session, "pa", specialty.id)
+        b = _make_doctor(db_session, "pb", specialty.id)
+        _add_slots(db_session, a, range(0, 20, 2))
+        _add_slots(db_session, b, range(1, 20, 2))
+
+        start = datetime.utcnow()
+        end = start + timedelta(days=7)
+        rows = list(merged_slot_stream(db_session, [a.id, b.id], start, end, page_size=3))
+        assert len(rows) == 20
+        assert [r.start_at for r in rows] == sorted(r.start_at for r in rows)
+        assert [r.doctor_id for r in rows[:4]] == [a.id, b.id, a.id, b.id]
+
+        assert len(earliest_slots(db_session, [a.id, b.id], start, end, 5)) == 5
@@ -235,3 +235,101 @@ class TestDoctorProfileMissing:
 
         response = client.delete("/doctor/slots/1", headers=headers)
         assert response.status_code == 404
+
+
+class TestDoctorSlotRanges:
+    """Tests for range delete and availability updates."""
+
+    def _add_slots(self, db_session, doctor_profile, offsets_hours):
+        from app.models.appointment_slot import AppointmentSlot
+
+        base = datetime.utcnow().replace(microsecond=0) + timedelta(days=3)
+        slots = [
+            AppointmentSlot(
+                doctor_id=doctor_profile.id,
+                start_at=base + timedelta(hours=h),
+                end_at=base + timedelta(hours=h, minutes=30),
+                is_available=1,
+            )
+            for h in offsets_hours
+        ]
+        db_session.add_all(slots)
+        db_session.commit()
+        return slots
+
+    def _window(self, first, last):
+        return {"from": first.start_at.isoformat(), "to": (last.start_at + timedelta(minutes=1)).isoformat()}
+
+    def test_delete_range(self, client, doctor_auth_headers, doctor_profile, db_session):
+        """Test only slots starting inside the window are deleted."""
+        slots = self._add_slots(db_session, doctor_profile, [0, 1, 2, 3])
+
+        response = client.delete("/doctor/slots", params=self._window(slots[1], slots[2]), headers=doctor_auth_headers)
+        assert response.status_code == 200
+        assert response.json() == {"ok": True, "deleted": 2, "conflicts": []}
+
+        remaining = client.get("/doctor/slots", headers=doctor_auth_headers).json()
+        assert [s["id"] for s in remaining] == [slots[0].id, slots[3].id]
+
+    def test_delete_range_reports_booked_slots(self, client, doctor_auth_headers, doctor_profile, appointment_slot, appointment, db_session):
+        """Test slots with appointments are kept and reported."""
+        extra = self._add_slots(db_session, doctor_profile, [0])[0]
+        first, last = sorted([appointment_slot, extra], key=lambda s: s.start_at)
+
+        response = client.delete("/doctor/slots", params=self._window(first, last), headers=doctor_auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["deleted"] == 1
+        assert [(c["slot_id"], c["appointment_id"], c["status"]) for c in data["conflicts"]] == [
+            (appointment_slot.id, appointment.id, "PENDING")
+        ]
+
+        remaining = client.get("/doctor/slots", headers=doctor_auth_headers).json()
+        assert [s["id"] for s in remaining] == [appointment_slot.id]
+
+    def test_block_and_unblock_range(self, client, doctor_auth_headers, doctor_profile, db_session):
+        """Test a window is blocked and reopened in one call each."""
+        slots = self._add_slots(db_session, doctor_profile, [0, 1, 2])
+        params = self._window(slots[0], slots[1])
+        public = f"/doctors/{doctor_profile.id}/slots"
+
+        response = client.patch("/doctor/slots/availability", params=params, json={"is_available": 0}, headers=doctor_auth_headers)
+        assert response.json() == {"ok": True, "updated": 2, "conflicts": []}
+        assert [s["id"] for s in client.get(public).json()] == [slots[2].id]
+
+        response = client.patch("/doctor/slots/availability", params=params, json={"is_available": 1}, headers=doctor_auth_headers)
+        assert response.json()["updated"] == 2
+        assert len(client.get(public).json()) == 3
+
+    def test_unblock_skips_booked_slots(self, client, doctor_auth_headers, appointment_slot, appointment, db_session):
+        """Test reopening a window leaves slots held by active appointments booked."""
+        appointment_slot.is_available = 0
+        db_session.commit()
+
+        response = client.patch(
+            "/doctor/slots/availability",
+            params=self._window(appointment_slot, appointment_slot),
+            json={"is_available": 1},
+            headers=doctor_auth_headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["updated"] == 0
+        assert [c["appointment_id"] for c in response.json()["conflicts"]] == [appointment.id]
+
+        db_session.refresh(appointment_slot)
+        assert appointment_slot.is_available == 0
+
+    def test_range_requires_window(self, client, doctor_auth_headers, doctor_profile):
+        """Test from and to are required and ordered."""
+        assert client.delete("/doctor/slots", headers=doctor_auth_headers).status_code == 422
+
+        start = datetime.utcnow()
+        params = {"from": start.isoformat(), "to": (start - timedelta(hours=1)).isoformat()}
+        response = client.patch("/doctor/slots/availability", params=params, json={"is_available": 0}, headers=doctor_auth_headers)
+        assert response.status_code == 422
+
+    def test_range_forbidden_for_patient(self, client, auth_headers):
+        """Test patients cannot use range operations."""
+        start = datetime.utcnow()
+        params = {"from": start.isoformat(), "to": (start + timedelta(days=1)).isoformat()}
+        assert client.delete("/doctor/slots", params=params, headers=auth_headers).status_code == 403
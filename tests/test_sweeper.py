@@ -0,0 +1,79 @@
+"""
+Unit tests for the past-appointment sweeper.
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+from app.models.notification import Notification
+from app.services.sweeper import sweep_past_appointments
+
+
+def _appointment(db_session, doctor_profile, test_user, hours_from_now, status="CONFIRMED"):
+    start = datetime.utcnow().replace(microsecond=0) + timedelta(hours=hours_from_now)
+    slot = AppointmentSlot(doctor_id=doctor_profile.id, start_at=start, end_at=start + timedelta(minutes=30), is_available=0)
+    db_session.add(slot)
+    db_session.flush()
+    appt = Appointment(doctor_id=doctor_profile.id, patient_user_id=test_user.id, slot_id=slot.id, status=status, notes="")
+    db_session.add(appt)
+    db_session.commit()
+    return appt
+
+
+class TestSweeper:
+    """Tests for sweeping ended CONFIRMED appointments."""
+
+    def test_completes_ended_confirmed_in_batches(self, db_session, doctor_profile, test_user):
+        """Test only ended CONFIRMED appointments transition, batch by batch."""
+        ended = [_appointment(db_session, doctor_profile, test_user, -5 - i) for i in range(5)]
+        running = _appointment(db_session, doctor_profile, test_user, 0)
+        pending = _appointment(db_session, doctor_profile, test_user, -10, status="PENDING")
+        future = _appointment(db_session, doctor_profile, test_user, 5)
+
+        metrics = sweep_past_appointments(db_session, batch_size=2)
+        assert metrics["policy"] == "COMPLETED"
+        assert metrics["transitioned"] == 5
+        assert metrics["batches"] == 3
+        assert metrics["notifications"] == 10
+
+        db_session.expire_all()
+        assert {a.status for a in ended} == {"COMPLETED"}
+        assert [running.status, pending.status, future.status] == ["CONFIRMED", "PENDING", "CONFIRMED"]
+        assert db_session.query(Notification).filter(Notification.user_id == test_user.id).count() == 5
+
+    def test_no_show_policy(self, db_session, doctor_profile, test_user):
+        """Test the NO_SHOW policy and its notification."""
+        appt = _appointment(db_session, doctor_profile, test_user, -3)
+
+        assert sweep_past_appointments(db_session, policy="NO_SHOW")["transitioned"] == 1
+        db_session.refresh(appt)
+        assert appt.status == "NO_SHOW"
+        assert db_session.query(Notification).filter(Notification.message == "Appointment marked as no-show").count() == 2
+
+    def test_nothing_to_do(self, db_session):
+        """Test an empty sweep reports zero work."""
+        metrics = sweep_past_appointments(db_session)
+        assert (metrics["batches"], metrics["transitioned"]) == (0, 0)
+
+    def test_no_show_in_history(self, client, auth_headers, db_session, doctor_profile, test_user):
+        """Test swept no-shows show up in the patient's history."""
+        appt = _appointment(db_session, doctor_profile, test_user, -3)
+        sweep_past_appointments(db_session, policy="NO_SHOW")
+
+        assert [a["id"] for a in client.get("/appointments/history", headers=auth_headers).json()] == [appt.id]
+
+
+class TestAdminTasks:
+    """Tests for the scheduler task listing."""
+
+    def test_lists_tasks_with_last_result(self, client, admin_auth_headers, monkeypatch):
+        """Test registered tasks and their last metrics are reported."""
+        from app.services.scheduler import scheduler
+
+        task = next(t for t in scheduler.tasks() if t.name == "sweep_past_appointments")
+        monkeypatch.setattr(task, "last_result", {"transitioned": 3})
+        response = client.get("/admin/tasks", headers=admin_auth_headers)
+        assert response.status_code == 200
+        item = next(t for t in response.json() if t["name"] == "sweep_past_appointments")
+        assert item["last_result"] == {"transitioned": 3}
@@ -0,0 +1,301 @@
+"""
+Unit tests for the waitlist and the matching of freed slots.
+"""
+import random
+import pytest
+from datetime import datetime, timedelta
+
+from app.core.security import hash_password, create_access_token
+from app.models.appointment import Appointment
+from app.models.appointment_slot import AppointmentSlot
+from app.models.notification import Notification
+from app.models.user import User
+from app.models.waitlist import WaitlistEntry
+from app.services.waitlist import DoctorWaitlistIndex, expire_waitlist
+
+
+@pytest.fixture
+def waiting_user(db_session):
+    """Create a second patient for the waitlist."""
+    user = User(email="waiting@example.com", username="waiting", password_hash=hash_password("password123"), role="USER")
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+@pytest.fixture
+def waiting_headers(waiting_user):
+    """Get authorization headers for the waiting patient."""
+    return {"Authorization": f"Bearer {create_access_token(str(waiting_user.id))}"}
+
+
+def _join(client, headers, doctor_id, start, end):
+    response = client.post(
+        "/waitlist",
+        json={"doctor_id": doctor_id, "window_start": start.isoformat(), "window_end": end.isoformat()},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _window_around(slot, hours=2):
+    return slot.start_at - timedelta(hours=hours), slot.end_at + timedelta(hours=hours)
+
+
+class TestWaitlistIndex:
+    """Tests for the per-doctor interval index."""
+
+    def test_matches_brute_force(self):
+        """Test first_fit returns the first entry by window start whose window holds the slot."""
+        rng = random.Random(7)
+        base = datetime(2030, 1, 1)
+        rows = []
+        for i in range(1, 400):
+            start = base + timedelta(hours=rng.randint(0, 500))
+            rows.append((i, start, start + timedelta(hours=rng.randint(1, 48))))
+        rows.sort(key=lambda r: (r[1], r[0]))
+        idx = DoctorWaitlistIndex(rows, max_id=399)
+
+        removed = set(rng.sample(range(1, 400), 100))
+        for entry_id in removed:
+            idx.remove(entry_id)
+        live = [r for r in rows if r[0] not in removed]
+
+        for _ in range(300):
+            s = base + timedelta(hours=rng.randint(0, 540))
+            e = s + timedelta(minutes=30)
+            expected = next((r[0] for r in live if r[1] <= s and r[2] >= e), None)
+            hit = idx.first_fit(s, e)
+            assert (hit[1] if hit else None) == expected
+
+    def test_pending_entries_match_brute_force(self):
+        """Test candidates merge tree and pending entries in window-start order, before and after merging."""
+        rng = random.Random(11)
+        base = datetime(2030, 1, 1)
+        rows = []
+        for i in range(1, 300):
+            start = base + timedelta(hours=rng.randint(0, 500))
+            rows.append((i, start, start + timedelta(hours=rng.randint(1, 48))))
+        tree_rows = sorted(rows[:200], key=lambda r: (r[1], r[0]))
+        idx = DoctorWaitlistIndex(tree_rows, max_id=200)
+        idx.add(rows[200:], max_id=299)
+
+        removed = set(rng.sample(range(1, 300), 60))
+        for entry_id in removed:
+            idx.remove(entry_id)
+        live = sorted((r for r in rows if r[0] not in removed), key=lambda r: (r[1], r[0]))
+
+        for index in (idx, idx.merged()):
+            assert len(index) == len(live)
+            for _ in range(200):
+                s = base + timedelta(hours=rng.randint(0, 540))
+                e = s + timedelta(minutes=30)
+                expected = [r[0] for r in live if r[1] <= s and r[2] >= e]
+                assert list(index.candidates(s, e)) == expected
+
+    def test_empty_index(self):
+        """Test an empty index finds nothing."""
+        now = datetime.utcnow()
+        assert DoctorWaitlistIndex([], 0).first_fit(now, now + timedelta(minutes=30)) is None
+
+
+class TestWaitlistMatching:
+    """Tests for offering freed slots to waiting patients."""
+
+    def test_join_validation(self, client, waiting_headers, doctor_profile):
+        """Test a window must be ordered, in the future, and for an existing doctor."""
+        now = datetime.utcnow()
+        body = {"doctor_id": doctor_profile.id, "window_start": (now + timedelta(hours=2)).isoformat(), "window_end": (now + timedelta(hours=1)).isoformat()}
+        assert client.post("/waitlist", json=body, headers=waiting_headers).status_code == 400
+        body = {"doctor_id": doctor_profile.id, "window_start": (now - timedelta(hours=3)).isoformat(), "window_end": (now - timedelta(hours=1)).isoformat()}
+        assert client.post("/waitlist", json=body, headers=waiting_headers).status_code == 400
+        body["doctor_id"] = 999
+        assert client.post("/waitlist", json=body, headers=waiting_headers).status_code == 404
+
+    def test_patient_cancel_offers_slot(self, client, auth_headers, waiting_headers, waiting_user, appointment, appointment_slot, db_session):
+        """Test a canceled slot is held for the waiting patient instead of freed."""
+        entry = _join(client, waiting_headers, appointment.doctor_id, *_window_around(appointment_slot))
+
+        assert client.post(f"/appointments/{appointment.id}/cancel", headers=auth_headers).status_code == 200
+
+        db_session.expire_all()
+        assert appointment_slot.is_available == 0
+        row = db_session.get(WaitlistEntry, entry["id"])
+        assert row.status == "OFFERED" and row.slot_id == appointment_slot.id
+        assert row.hold_expires_at > datetime.utcnow()
+        assert db_session.query(Notification).filter(Notification.user_id == waiting_user.id).count() == 1
+
+        # the held slot cannot be booked by anyone else
+        other = client.post("/appointments", json={"doctor_id": appointment.doctor_id, "slot_id": appointment_slot.id}, headers=auth_headers)
+        assert other.status_code == 409
+
+    def test_accept_books_held_slot(self, client, auth_headers, waiting_headers, waiting_user, appointment, appointment_slot, db_session):
+        """Test accepting an offer books the held slot."""
+        entry = _join(client, waiting_headers, appointment.doctor_id, *_window_around(appointment_slot))
+        client.post(f"/appointments/{appointment.id}/cancel", headers=auth_headers)
+
+        response = client.post(f"/waitlist/{entry['id']}/accept", headers=waiting_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["slot_id"] == appointment_slot.id
+        assert data["patient_user_id"] == waiting_user.id and data["status"] == "PENDING"
+
+        mine = client.get("/waitlist/mine", headers=waiting_headers).json()
+        assert mine[0]["status"] == "BOOKED" and mine[0]["appointment_id"] == data["id"]
+        assert client.post(f"/waitlist/{entry['id']}/accept", headers=waiting_headers).status_code == 409
+
+    def test_decline_passes_to_next_entry(self, client, auth_headers, waiting_headers, appointment, appointment_slot, db_session):
+        """Test a declined offer goes to the next compatible entry, then frees the slot."""
+        first = _join(client, waiting_headers, appointment.doctor_id, *_window_around(appointment_slot, hours=3))
+        narrow = _join(client, waiting_headers, appointment.doctor_id, *_window_around(appointment_slot, hours=1))
+        client.post(f"/appointments/{appointment.id}/cancel", headers=auth_headers)
+
+        assert client.post(f"/waitlist/{first['id']}/decline", headers=waiting_headers).json()["status"] == "DECLINED"
+        db_session.expire_all()
+        assert db_session.get(WaitlistEntry, narrow["id"]).status == "OFFERED"
+
+        assert client.post(f"/waitlist/{narrow['id']}/decline", headers=waiting_headers).status_code == 200
+        db_session.expire_all()
+        assert appointment_slot.is_available == 1
+
+    def test_window_must_contain_slot(self, client, auth_headers, waiting_headers, appointment, appointment_slot, db_session):
+        """Test entries whose window does not hold the slot are not offered it."""
+        start = appointment_slot.start_at + timedelta(minutes=10)
+        entry = _join(client, waiting_headers, appointment.doctor_id, start, start + timedelta(hours=4))
+        client.post(f"/appointments/{appointment.id}/cancel", headers=auth_headers)
+
+        db_session.expire_all()
+        assert db_session.get(WaitlistEntry, entry["id"]).status == "WAITING"
+        assert appointment_slot.is_available == 1
+
+    def test_skips_patient_with_overlap(self, client, auth_headers, waiting_headers, waiting_user, appointment, appointment_slot, doctor_profile, db_session):
+        """Test a waiting patient already booked at that time is passed over."""
+        busy = AppointmentSlot(doctor_id=doctor_profile.id, start_at=appointment_slot.start_at, end_at=appointment_slot.end_at, is_available=0)
+        db_session.add(busy)
+        db_session.flush()
+        db_session.add(Appointment(doctor_id=doctor_profile.id, patient_user_id=waiting_user.id, slot_id=busy.id, status="CONFIRMED", notes=""))
+        db_session.commit()
+        entry = _join(client, waiting_headers, appointment.doctor_id, *_window_around(appointment_slot))
+
+        client.post(f"/appointments/{appointment.id}/cancel", headers=auth_headers)
+        db_session.expire_all()
+        assert db_session.get(WaitlistEntry, entry["id"]).status == "WAITING"
+
+    def test_doctor_cancel_offers_slot(self, client, doctor_auth_headers, waiting_headers, appointment, appointment_slot, db_session):
+        """Test a doctor's cancellation feeds the waitlist too."""
+        entry = _join(client, waiting_headers, appointment.doctor_id, *_window_around(appointment_slot))
+        assert client.post(f"/doctor/appointments/{appointment.id}/cancel", headers=doctor_auth_headers).status_code == 200
+
+        db_session.expire_all()
+        assert db_session.get(WaitlistEntry, entry["id"]).status == "OFFERED"
+
+    def test_canceled_day_drops_hold(self, client, auth_headers, doctor_auth_headers, waiting_headers, waiting_user, appointment, appointment_slot, db_session):
+        """Test a hold on a day the doctor cancels ends without freeing or re-offering the slot."""
+        entry = _join(client, waiting_headers, appointment.doctor_id, *_window_around(appointment_slot))
+        other = _join(client, waiting_headers, appointment.doctor_id, *_window_around(appointment_slot, hours=1))
+        client.post(f"/appointments/{appointment.id}/cancel", headers=auth_headers)
+
+        response = client.post(
+            "/doctor/appointments/reschedule-day",
+            json={"day": appointment_slot.start_at.date().isoformat()},
+            headers=doctor_auth_headers,
+        )
+        assert response.status_code == 200
+
+        db_session.expire_all()
+        assert db_session.get(WaitlistEntry, entry["id"]).status == "CANCELED"
+        assert db_session.get(WaitlistEntry, other["id"]).status == "WAITING"
+        assert appointment_slot.is_available == 0
+        assert client.post(f"/waitlist/{entry['id']}/accept", headers=waiting_headers).status_code == 409
+        assert db_session.query(Notification).filter(Notification.user_id == waiting_user.id).count() == 2
+
+    def test_new_entries_join_index_without_rebuild(self, client, waiting_headers, doctor_profile, db_session, monkeypatch):
+        """Test joins are added to the cached index, which is merged only past the pending limit."""
+        from app.services import waitlist
+
+        monkeypatch.setattr(waitlist, "PENDING_LIMIT", 2)
+        start = datetime.utcnow() + timedelta(days=2)
+        _join(client, waiting_headers, doctor_profile.id, start, start + timedelta(hours=1))
+        idx = waitlist.waitlist_index.get(db_session, doctor_profile.id)
+
+        for i in range(2):
+            _join(client, waiting_headers, doctor_profile.id, start + timedelta(hours=i + 1), start + timedelta(hours=i + 2))
+            assert waitlist.waitlist_index.get(db_session, doctor_profile.id) is idx
+        assert len(idx.pending) == 2
+
+        _join(client, waiting_headers, doctor_profile.id, start + timedelta(hours=3), start + timedelta(hours=4))
+        merged = waitlist.waitlist_index.get(db_session, doctor_profile.id)
+        assert merged is not idx and merged.pending == [] and len(merged) == 4
+
+    def test_held_slot_cannot_be_deleted(self, client, auth_headers, doctor_auth_headers, waiting_headers, appointment, appointment_slot, doctor_profile, db_session):
+        """Test a slot freed by a reschedule and held for the waitlist survives single and range deletes."""
+        later = AppointmentSlot(
+            doctor_id=doctor_profile.id,
+            start_at=appointment_slot.start_at + timedelta(days=1),
+            end_at=appointment_slot.end_at + timedelta(days=1),
+            is_available=1,
+        )
+        db_session.add(later)
+        db_session.commit()
+        entry = _join(client, waiting_headers, appointment.doctor_id, *_window_around(appointment_slot))
+        response = client.post(f"/appointments/{appointment.id}/reschedule?new_slot_id={later.id}", headers=auth_headers)
+        assert response.status_code == 200
+        assert db_session.get(WaitlistEntry, entry["id"]).status == "OFFERED"
+
+        assert client.delete(f"/doctor/slots/{appointment_slot.id}", headers=doctor_auth_headers).status_code == 409
+        window = {"from": appointment_slot.start_at.isoformat(), "to": appointment_slot.end_at.isoformat()}
+        assert client.delete("/doctor/slots", params=window, headers=doctor_auth_headers).json()["deleted"] == 0
+        assert client.post(f"/waitlist/{entry['id']}/accept", headers=waiting_headers).status_code == 200
+
+    def test_accept_without_slot(self, client, auth_headers, waiting_headers, appointment, appointment_slot, db_session):
+        """Test accepting a hold whose slot is gone is a conflict, not a server error."""
+        entry = _join(client, waiting_headers, appointment.doctor_id, *_window_around(appointment_slot))
+        client.post(f"/appointments/{appointment.id}/cancel", headers=auth_headers)
+        db_session.delete(appointment)
+        db_session.delete(appointment_slot)
+        db_session.commit()
+
+        response = client.post(f"/waitlist/{entry['id']}/accept", headers=waiting_headers)
+        assert response.status_code == 409
+
+    def test_leave_waitlist(self, client, auth_headers, waiting_headers, appointment, appointment_slot, db_session):
+        """Test a canceled entry is no longer matched."""
+        entry = _join(client, waiting_headers, appointment.doctor_id, *_window_around(appointment_slot))
+        assert client.delete(f"/waitlist/{entry['id']}", headers=waiting_headers).status_code == 200
+        client.post(f"/appointments/{appointment.id}/cancel", headers=auth_headers)
+
+        db_session.expire_all()
+        assert db_session.get(WaitlistEntry, entry["id"]).status == "CANCELED"
+        assert appointment_slot.is_available == 1
+
+    def test_other_patient_cannot_accept(self, client, auth_headers, waiting_headers, appointment, appointment_slot):
+        """Test an offer belongs to its patient."""
+        entry = _join(client, waiting_headers, appointment.doctor_id, *_window_around(appointment_slot))
+        client.post(f"/appointments/{appointment.id}/cancel", headers=auth_headers)
+        assert client.post(f"/waitlist/{entry['id']}/accept", headers=auth_headers).status_code == 403
+
+
+class TestWaitlistExpiry:
+    """Tests for expiring holds and windows."""
+
+    def test_expired_hold_is_released(self, client, auth_headers, waiting_headers, appointment, appointment_slot, db_session):
+        """Test an unanswered offer expires and frees the slot."""
+        entry = _join(client, waiting_headers, appointment.doctor_id, *_window_around(appointment_slot))
+        client.post(f"/appointments/{appointment.id}/cancel", headers=auth_headers)
+
+        metrics = expire_waitlist(db_session, now=datetime.utcnow() + timedelta(hours=1))
+        assert metrics["holds_expired"] == 1
+        db_session.expire_all()
+        assert db_session.get(WaitlistEntry, entry["id"]).status == "EXPIRED"
+        assert appointment_slot.is_available == 1
+        assert client.post(f"/waitlist/{entry['id']}/accept", headers=waiting_headers).status_code == 409
+
+    def test_passed_windows_expire(self, client, waiting_headers, doctor_profile, db_session):
+        """Test waiting entries whose window has ended are expired."""
+        now = datetime.utcnow()
+        entry = _join(client, waiting_headers, doctor_profile.id, now, now + timedelta(hours=1))
+        assert expire_waitlist(db_session, now=now + timedelta(hours=2))["entries_expired"] == 1
+        db_session.expire_all()
+        assert db_session.get(WaitlistEntry, entry["id"]).status == "EXPIRED"